@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Register background job handlers
+        import api.tasks  # noqa: F401
+
+        # Re-price EIBOR-linked bank products when new fixings arrive
+        from api.services import BankPricingService
+        BankPricingService.connect_signals()
@@ -2,8 +2,20 @@
 Custom pagination classes for the API
 """
 
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from urllib import parse
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.exceptions import ValidationError
+from api.search import is_rank_requested
 
 
 class StandardPagination(PageNumberPagination):
@@ -27,4 +39,156 @@ class StandardPagination(PageNumberPagination):
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'results': data
-        })
\ No newline at end of file
+        })
+
+
+def estimate_count(queryset) -> int:
+    """
+    Cheap row count estimate from PostgreSQL statistics.
+
+    Unfiltered querysets read pg_class.reltuples for the table. Filtered
+    querysets use the planner's row estimate for the query. Other
+    databases (SQLite in dev) fall back to an exact COUNT(*).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 until the table has been analyzed
+            if row and row[0] >= 0:
+                return row[0]
+            return queryset.count()
+
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over (created_at, id), newest first.
+
+    Each page is an index range scan that starts after the last row of
+    the previous page, so deep pages cost the same as the first one.
+    Forward-only - the `next` link carries an opaque cursor. Cursors only
+    encode this ordering, so relevance ranking (?search_rank=true) must
+    use page-number pagination instead.
+
+    Query params:
+    - pagination=cursor: Opt in when no cursor is given yet
+    - cursor: Cursor from a previous `next` link
+    - page_size: Items per page (default: 20, max: 100)
+    - count: 'none' (default), 'estimated' or 'exact'
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_modes = ('none', 'estimated', 'exact')
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+    rank_conflict_message = 'Cursor pagination cannot be combined with search_rank=true'
+
+    @classmethod
+    def is_requested(cls, request) -> bool:
+        """True when the client asked for keyset pagination"""
+        params = request.query_params
+        return params.get('pagination') == 'cursor' or cls.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if is_rank_requested(request):
+            raise ValidationError(self.rank_conflict_message)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count_mode = self.get_count_mode(request)
+        self.count = self.get_count(queryset)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = self.filter_after(queryset, cursor)
+
+        # Fetch one extra row to know whether there is a next page
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'countIsEstimate': self.count_mode == 'estimated',
+            'pageSize': self.page_size,
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data
+        })
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_count_mode(self, request) -> str:
+        mode = request.query_params.get(self.count_query_param, 'none')
+        return mode if mode in self.count_modes else 'none'
+
+    def get_count(self, queryset):
+        if self.count_mode == 'exact':
+            return queryset.count()
+        if self.count_mode == 'estimated':
+            return estimate_count(queryset)
+        return None
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'pagination')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(last.created_at, last.id))
+
+    @staticmethod
+    def filter_after(queryset, cursor):
+        """Rows after a decoded (created_at, id) cursor in newest-first order"""
+        created_at, pk = cursor
+        # Leading created_at <= bound keeps this an index range scan
+        return queryset.filter(
+            Q(created_at__lte=created_at) &
+            (Q(created_at__lt=created_at) | Q(id__lt=pk))
+        )
+
+    def encode_cursor(self, created_at, pk) -> str:
+        raw = parse.urlencode({'t': created_at.isoformat(), 'id': pk})
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(raw, keep_blank_values=True)
+            created_at = parse_datetime(tokens['t'][0])
+            pk = int(tokens['id'][0])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
@@ -0,0 +1,152 @@
+"""
+Search for the leads, clients and cases list endpoints.
+
+Name, email and case number terms use icontains, which on PostgreSQL
+compiles to UPPER(col::text) LIKE UPPER('%term%') and is served by the
+pg_trgm GIN indexes on UPPER(col) (migration 0018). Phone terms match the
+normalized phone_digits column, so "+971 50-123" and "97150123" find the
+same rows, through its own trigram index. Digit runs shorter than
+MIN_PHONE_DIGITS fall back to icontains on the raw phone column.
+
+Ranking mode (?search_rank=true) orders results by trigram similarity on
+PostgreSQL. Other backends (SQLite in dev) fall back to an
+exact > prefix > contains tier so the mode still works everywhere.
+"""
+
+from django.db import connection
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from core.models import normalize_phone
+
+# Trigram indexes need three characters - shorter digit runs match the raw phone
+MIN_PHONE_DIGITS = 3
+
+
+class SearchSpec:
+    """
+    Describes how one model is searched.
+
+    text_fields are matched with icontains, phone_field with the normalized
+    digits of the term (or raw_phone_field with the term itself when it has
+    too few digits). related is an optional (fk_field, SearchSpec) pair,
+    matched through an id subquery rather than a join. rank_fields default
+    to text_fields and may span relations.
+    """
+
+    def __init__(self, text_fields, phone_field=None, raw_phone_field=None, related=None, rank_fields=None):
+        self.text_fields = tuple(text_fields)
+        self.phone_field = phone_field
+        self.raw_phone_field = raw_phone_field
+        self.related = related
+        self.rank_fields = tuple(rank_fields or text_fields)
+
+
+LEAD_SEARCH = SearchSpec(
+    text_fields=('first_name', 'last_name', 'email'),
+    phone_field='phone_digits',
+    raw_phone_field='phone',
+)
+
+CLIENT_SEARCH = SearchSpec(
+    text_fields=('first_name', 'last_name', 'email'),
+    phone_field='phone_digits',
+    raw_phone_field='phone',
+)
+
+CASE_SEARCH = SearchSpec(
+    text_fields=('case_id',),
+    related=('client', CLIENT_SEARCH),
+    rank_fields=('case_id', 'client__first_name', 'client__last_name'),
+)
+
+
+def is_rank_requested(request) -> bool:
+    return request.query_params.get('search_rank', '').lower() == 'true'
+
+
+def apply_search(queryset, term: str, spec: SearchSpec, rank: bool = False):
+    """
+    Filter a queryset by a free-text search term.
+
+    Args:
+        queryset: Queryset of the model described by spec
+        term: Raw search term from the request
+        spec: SearchSpec for the model
+        rank: Order by relevance (annotated as search_rank) instead of keeping
+            the queryset's ordering
+
+    Returns:
+        Filtered (and optionally ranked) queryset
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    queryset = queryset.filter(_match(queryset.model, term, spec))
+    if rank:
+        queryset = queryset.annotate(search_rank=_rank(term, spec)).order_by(
+            '-search_rank', '-created_at', '-id'
+        )
+    return queryset
+
+
+def _phone_term(term: str, spec: SearchSpec):
+    """Digits to match against phone_field, or None when the term isn't phone-like"""
+    if not spec.phone_field:
+        return None
+    digits = normalize_phone(term)
+    return digits if len(digits) >= MIN_PHONE_DIGITS else None
+
+
+def _match(model, term: str, spec: SearchSpec) -> Q:
+    condition = Q()
+    for field in spec.text_fields:
+        condition |= Q(**{f'{field}__icontains': term})
+
+    digits = _phone_term(term, spec)
+    if digits:
+        condition |= Q(**{f'{spec.phone_field}__contains': digits})
+    elif spec.raw_phone_field and normalize_phone(term):
+        condition |= Q(**{f'{spec.raw_phone_field}__icontains': term})
+
+    if spec.related:
+        fk_field, related_spec = spec.related
+        related_model = model._meta.get_field(fk_field).related_model
+        related_ids = related_model.objects.filter(
+            _match(related_model, term, related_spec)
+        ).values('id')
+        condition |= Q(**{f'{fk_field}_id__in': related_ids})
+
+    return condition
+
+
+def _rank(term: str, spec: SearchSpec):
+    digits = _phone_term(term, spec)
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        scores = [TrigramSimilarity(field, term) for field in spec.rank_fields]
+        if digits:
+            scores.append(TrigramSimilarity(spec.phone_field, digits))
+        if len(scores) == 1:
+            return scores[0]
+        # GREATEST ignores NULLs on PostgreSQL (e.g. a lead without email)
+        return Greatest(*scores, output_field=FloatField())
+
+    exact = Q()
+    prefix = Q()
+    for field in spec.rank_fields:
+        exact |= Q(**{f'{field}__iexact': term})
+        prefix |= Q(**{f'{field}__istartswith': term})
+    if digits:
+        exact |= Q(**{spec.phone_field: digits})
+        prefix |= Q(**{f'{spec.phone_field}__startswith': digits})
+
+    return Case(
+        When(exact, then=Value(3)),
+        When(prefix, then=Value(2)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
@@ -0,0 +1,45 @@
+"""
+Analytics Serializers
+"""
+
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+from core.models import Case, DropOffRollup, FunnelRollup
+
+DAILY_DEFAULT_DAYS = 30
+DAILY_MAX_DAYS = 731
+
+
+class FunnelQuerySerializer(serializers.Serializer):
+    """Query params for the funnel endpoint"""
+
+    dimension = serializers.ChoiceField(choices=FunnelRollup.DIMENSION_CHOICES, default='channel')
+
+
+class DropOffQuerySerializer(serializers.Serializer):
+    """Query params for the drop-off endpoint"""
+
+    outcome = serializers.ChoiceField(choices=DropOffRollup.OUTCOME_CHOICES, required=False)
+    stage = serializers.ChoiceField(choices=Case.STAGE_CHOICES, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=500, default=50)
+
+
+class DailyMetricsQuerySerializer(serializers.Serializer):
+    """Query params for the daily metrics endpoint"""
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    sub_source = serializers.ListField(child=serializers.CharField(allow_blank=True), required=False)
+    group = serializers.ChoiceField(choices=['day', 'sub_source'], default='day')
+
+    def validate(self, attrs):
+        attrs.setdefault('date_to', timezone.localdate())
+        attrs.setdefault('date_from', attrs['date_to'] - timedelta(days=DAILY_DEFAULT_DAYS - 1))
+        span = (attrs['date_to'] - attrs['date_from']).days + 1
+        if span < 1:
+            raise serializers.ValidationError('date_from must not be after date_to')
+        if span > DAILY_MAX_DAYS:
+            raise serializers.ValidationError(f'Ranges are limited to {DAILY_MAX_DAYS} days')
+        return attrs
@@ -3,8 +3,9 @@ Case Serializers
 """
 
 from rest_framework import serializers
-from core.models import Case, BankForm, BankProduct, Client, CallLog, Note, CaseStageChange
-from api.serializers.common import CallLogSerializer, NoteSerializer, LogCallSerializer, AddNoteSerializer
+from core.cache import reference_cache
+from core.models import Case, BankForm, BankProduct, Client, CaseStageChange
+from api.serializers.common import ActivitySerializerMixin
 
 
 class CaseStageChangeSerializer(serializers.ModelSerializer):
@@ -98,17 +99,55 @@ class CaseListSerializer(serializers.ModelSerializer):
         products = list(obj.bank_products.all())
         if products:
             return products[0].bank_icon
-        # Fallback lookup by bank_name (still N+1 but rare case)
+        # Fallback to the cached bank name -> icon map
         if obj.bank_name:
-            bank_product = BankProduct.objects.filter(bank_name=obj.bank_name).first()
-            if bank_product:
-                return bank_product.bank_icon
+            return reference_cache.get('bank_icons').get(obj.bank_name)
         return None
 
 
-class CaseDetailSerializer(serializers.ModelSerializer):
+class CaseBoardQuerySerializer(serializers.Serializer):
+    """Query params for the case board endpoint"""
+
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    stage = serializers.ChoiceField(choices=Case.STAGE_CHOICES, required=False)
+
+
+class CaseBoardClientSerializer(serializers.Serializer):
+    """Client name on a board card"""
+
+    id = serializers.IntegerField()
+    firstName = serializers.CharField(source='first_name')
+    lastName = serializers.CharField(source='last_name')
+
+
+class CaseBoardCardSerializer(serializers.Serializer):
+    """Board card - serializes CaseBoardService card dicts"""
+
+    id = serializers.IntegerField()
+    caseId = serializers.CharField(source='case_id')
+    client = CaseBoardClientSerializer()
+    loanAmount = serializers.DecimalField(source='loan_amount', max_digits=12, decimal_places=2)
+    stage = serializers.CharField()
+    createdAt = serializers.DateTimeField(source='created_at')
+    bankName = serializers.CharField(source='bank_name', allow_null=True)
+    bankIcon = serializers.CharField(source='bank_icon', allow_null=True)
+
+
+class CaseBoardColumnSerializer(serializers.Serializer):
+    """Board column - per-stage totals and the first cards"""
+
+    stage = serializers.CharField()
+    count = serializers.IntegerField()
+    loanAmount = serializers.DecimalField(source='loan_amount', max_digits=16, decimal_places=2)
+    cards = CaseBoardCardSerializer(many=True)
+    next = serializers.CharField(allow_null=True)
+
+
+class CaseDetailSerializer(ActivitySerializerMixin, serializers.ModelSerializer):
     """Serializer for Case detail view - full data with activity"""
 
+    activity_entity_type = 'case'
+
     caseId = serializers.CharField(source='case_id')
     caseType = serializers.CharField(source='case_type')
     serviceType = serializers.CharField(source='service_type')
@@ -151,31 +190,14 @@ class CaseDetailSerializer(serializers.ModelSerializer):
             'callLogs', 'notes', 'stageChanges'
         ]
 
-    def _get_prefetched_call_logs(self, obj):
-        """Get call logs from prefetched context or fallback to query"""
-        prefetched = self.context.get('prefetched_call_logs')
-        if prefetched is not None:
-            return prefetched.get(obj.id, [])
-        return list(CallLog.objects.filter(entity_type='case', entity_id=obj.id))
-
-    def _get_prefetched_notes(self, obj):
-        """Get notes from prefetched context or fallback to query"""
-        prefetched = self.context.get('prefetched_notes')
-        if prefetched is not None:
-            return prefetched.get(obj.id, [])
-        return list(Note.objects.filter(entity_type='case', entity_id=obj.id))
-
     def get_callLogs(self, obj):
-        call_logs = self._get_prefetched_call_logs(obj)
-        return CallLogSerializer(call_logs, many=True).data
+        return self._get_activities(obj, 'call_logs')
 
     def get_notes(self, obj):
-        notes = self._get_prefetched_notes(obj)
-        return NoteSerializer(notes, many=True).data
+        return self._get_activities(obj, 'notes')
 
     def get_stageChanges(self, obj):
-        """Uses prefetched stage_changes"""
-        return CaseStageChangeSerializer(obj.stage_changes.all(), many=True).data
+        return self._get_activities(obj, 'status_changes')
 
 
 class CaseCreateSerializer(serializers.ModelSerializer):
@@ -3,8 +3,24 @@ Client Serializers
 """
 
 from rest_framework import serializers
-from core.models import Client, Document, CallLog, Note, ClientStatusChange, Campaign, BankProduct, SubSource
-from api.serializers.common import CallLogSerializer, NoteSerializer, LogCallSerializer, AddNoteSerializer
+from core.cache import reference_cache
+from core.models import Client, Document, ClientStatusChange, Campaign, SubSource
+from api.serializers.common import ActivitySerializerMixin
+
+
+def serialize_case_summaries(cases) -> list:
+    """Case chips shown on client rows - bank icons come from the cached icon map"""
+    bank_icons = reference_cache.get('bank_icons')
+    return [
+        {
+            'id': case.id,
+            'caseId': case.case_id,
+            'stage': case.stage,
+            'bankName': case.bank_name,
+            'bankIcon': bank_icons.get(case.bank_name)
+        }
+        for case in cases
+    ]
 
 
 class ClientStatusChangeSerializer(serializers.ModelSerializer):
@@ -28,9 +44,11 @@ class DocumentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class ClientListSerializer(serializers.ModelSerializer):
+class ClientListSerializer(ActivitySerializerMixin, serializers.ModelSerializer):
     """Serializer for Client list view - minimal data for fast loading"""
 
+    activity_entity_type = 'client'
+
     firstName = serializers.CharField(source='first_name')
     lastName = serializers.CharField(source='last_name')
     eligibilityStatus = serializers.CharField(source='eligibility_status', read_only=True)
@@ -78,56 +96,18 @@ class ClientListSerializer(serializers.ModelSerializer):
         cases = list(obj.cases.all())
         if not cases:
             return None
-
-        # Get all unique bank names and fetch icons in one query
-        bank_names = [c.bank_name for c in cases if c.bank_name]
-        bank_icons = {}
-        if bank_names:
-            products = BankProduct.objects.filter(bank_name__in=bank_names).values('bank_name', 'bank_icon')
-            bank_icons = {p['bank_name']: p['bank_icon'] for p in products}
-
-        result = []
-        for case in cases:
-            result.append({
-                'id': case.id,
-                'caseId': case.case_id,
-                'stage': case.stage,
-                'bankName': case.bank_name,
-                'bankIcon': bank_icons.get(case.bank_name)
-            })
-        return result
-
-    def _get_prefetched_call_logs(self, obj):
-        """Get call logs from prefetched context or fallback to query"""
-        prefetched = self.context.get('prefetched_call_logs')
-        if prefetched is not None:
-            return prefetched.get(obj.id, [])
-        return list(CallLog.objects.filter(entity_type='client', entity_id=obj.id))
-
-    def _get_prefetched_notes(self, obj):
-        """Get notes from prefetched context or fallback to query"""
-        prefetched = self.context.get('prefetched_notes')
-        if prefetched is not None:
-            return prefetched.get(obj.id, [])
-        return list(Note.objects.filter(entity_type='client', entity_id=obj.id))
+        return serialize_case_summaries(cases)
 
     def get_hasActivity(self, obj):
         """Returns True if any action has been taken - uses prefetched data"""
-        call_logs = self._get_prefetched_call_logs(obj)
-        if call_logs:
-            return True
-        notes = self._get_prefetched_notes(obj)
-        if notes:
-            return True
-        # Uses prefetched status_changes
-        if list(obj.status_changes.all()):
-            return True
-        return False
-
-
-class ClientDetailSerializer(serializers.ModelSerializer):
+        return any(self._get_activities(obj, kind) for kind in ('call_logs', 'notes', 'status_changes'))
+
+
+class ClientDetailSerializer(ActivitySerializerMixin, serializers.ModelSerializer):
     """Serializer for Client detail view - full data with activity"""
 
+    activity_entity_type = 'client'
+
     firstName = serializers.CharField(source='first_name')
     lastName = serializers.CharField(source='last_name')
     residencyStatus = serializers.CharField(source='residency_status')
@@ -153,6 +133,7 @@ class ClientDetailSerializer(serializers.ModelSerializer):
     notes = serializers.SerializerMethodField()
     statusChanges = serializers.SerializerMethodField()
     cases = serializers.SerializerMethodField()
+    eligibleBanks = serializers.SerializerMethodField()
 
     class Meta:
         model = Client
@@ -160,7 +141,7 @@ class ClientDetailSerializer(serializers.ModelSerializer):
             'id', 'firstName', 'lastName', 'email', 'phone',
             'residencyStatus', 'dateOfBirth', 'nationality', 'employmentStatus',
             'monthlySalary', 'monthlyLiabilities', 'loanAmount', 'estimatedPropertyValue',
-            'eligibilityStatus', 'estimatedDbr', 'estimatedLtv', 'maxLoanAmount',
+            'eligibilityStatus', 'estimatedDbr', 'estimatedLtv', 'maxLoanAmount', 'eligibleBanks',
             'sourceId', 'sourceDisplay', 'sourceCampaign', 'status', 'statusReason',
             'createdAt', 'updatedAt',
             'documents', 'callLogs', 'notes', 'statusChanges', 'cases'
@@ -170,55 +151,25 @@ class ClientDetailSerializer(serializers.ModelSerializer):
         """Uses prefetched source_campaign"""
         return obj.source_campaign.name if obj.source_campaign else None
 
-    def _get_prefetched_call_logs(self, obj):
-        """Get call logs from prefetched context or fallback to query"""
-        prefetched = self.context.get('prefetched_call_logs')
-        if prefetched is not None:
-            return prefetched.get(obj.id, [])
-        return list(CallLog.objects.filter(entity_type='client', entity_id=obj.id))
-
-    def _get_prefetched_notes(self, obj):
-        """Get notes from prefetched context or fallback to query"""
-        prefetched = self.context.get('prefetched_notes')
-        if prefetched is not None:
-            return prefetched.get(obj.id, [])
-        return list(Note.objects.filter(entity_type='client', entity_id=obj.id))
-
     def get_callLogs(self, obj):
-        call_logs = self._get_prefetched_call_logs(obj)
-        return CallLogSerializer(call_logs, many=True).data
+        return self._get_activities(obj, 'call_logs')
 
     def get_notes(self, obj):
-        notes = self._get_prefetched_notes(obj)
-        return NoteSerializer(notes, many=True).data
+        return self._get_activities(obj, 'notes')
 
     def get_statusChanges(self, obj):
-        """Uses prefetched status_changes"""
-        return ClientStatusChangeSerializer(obj.status_changes.all(), many=True).data
+        return self._get_activities(obj, 'status_changes')
 
     def get_cases(self, obj):
         """Returns list of cases - uses prefetched cases"""
         cases = list(obj.cases.all())
         if not cases:
             return []
+        return serialize_case_summaries(cases)
 
-        # Get all unique bank names and fetch icons in one query
-        bank_names = [c.bank_name for c in cases if c.bank_name]
-        bank_icons = {}
-        if bank_names:
-            products = BankProduct.objects.filter(bank_name__in=bank_names).values('bank_name', 'bank_icon')
-            bank_icons = {p['bank_name']: p['bank_icon'] for p in products}
-
-        result = []
-        for case in cases:
-            result.append({
-                'id': case.id,
-                'caseId': case.case_id,
-                'stage': case.stage,
-                'bankName': case.bank_name,
-                'bankIcon': bank_icons.get(case.bank_name)
-            })
-        return result
+    def get_eligibleBanks(self, obj):
+        """Banks with at least one matched product - uses prefetched eligible_bank_products"""
+        return sorted({product.bank_name for product in obj.eligible_bank_products.all()})
 
 
 class ClientCreateSerializer(serializers.ModelSerializer):
@@ -4,6 +4,7 @@ Common Serializers - shared across leads, clients, and cases
 
 from rest_framework import serializers
 from core.models import CallLog, Note
+from api.services.activities import ActivityLoader
 
 
 class CallLogSerializer(serializers.ModelSerializer):
@@ -34,4 +35,50 @@ class LogCallSerializer(serializers.Serializer):
 class AddNoteSerializer(serializers.Serializer):
     """Serializer for adding a note"""
 
-    content = serializers.CharField()
\ No newline at end of file
+    content = serializers.CharField()
+
+
+class ActivitySerializerMixin:
+    """
+    Reads activity rows produced by ActivityLoader from serializer context
+    ('prefetched_call_logs', 'prefetched_notes', 'prefetched_status_changes').
+    Rows are already API-shaped, so they are returned without re-serializing.
+    Falls back to loading the single entity when used without context.
+    """
+    activity_entity_type = None  # Must be set in subclass ('lead', 'client', 'case')
+
+    def _get_activities(self, obj, kind: str) -> list:
+        prefetched = self.context.get(f'prefetched_{kind}')
+        if prefetched is None:
+            # Fallback for when serializer is used without prefetch (1 query per entity)
+            cache = self.__dict__.setdefault('_activity_fallback', {})
+            if obj.id not in cache:
+                cache[obj.id] = ActivityLoader(self.activity_entity_type).load([obj.id])
+            prefetched = cache[obj.id][kind]
+        return prefetched.get(obj.id, [])
+
+
+class ActivitySummarySerializerMixin:
+    """
+    Reads per-entity activity aggregates produced by ActivityLoader.summarize()
+    from serializer context ('activity_summary') for compact list rows.
+    Falls back to summarizing the single entity when used without context.
+    """
+    activity_entity_type = None  # Must be set in subclass ('lead', 'client', 'case')
+
+    def _get_activity_summary(self, obj) -> dict:
+        summary = self.context.get('activity_summary')
+        if summary is None:
+            # Fallback for when serializer is used without context (1 query per entity)
+            cache = self.__dict__.setdefault('_summary_fallback', {})
+            if obj.id not in cache:
+                cache[obj.id] = ActivityLoader(self.activity_entity_type).summarize([obj.id])
+            summary = cache[obj.id]
+        return summary.get(obj.id, {})
+
+    def _get_activity_count(self, obj, kind: str) -> int:
+        return self._get_activity_summary(obj).get(kind, {}).get('count', 0)
+
+    def _get_last_activity_at(self, obj):
+        timestamps = [entry['lastAt'] for entry in self._get_activity_summary(obj).values()]
+        return max(timestamps) if timestamps else None
@@ -3,8 +3,8 @@ Lead Serializers
 """
 
 from rest_framework import serializers
-from core.models import Lead, CallLog, Note, LeadStatusChange, SubSource
-from api.serializers.common import CallLogSerializer, NoteSerializer, LogCallSerializer, AddNoteSerializer
+from core.models import Lead, LeadStatusChange, SubSource
+from api.serializers.common import ActivitySerializerMixin, ActivitySummarySerializerMixin
 
 
 class StatusChangeSerializer(serializers.ModelSerializer):
@@ -16,9 +16,11 @@ class StatusChangeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'timestamp']
 
 
-class LeadListSerializer(serializers.ModelSerializer):
+class LeadListSerializer(ActivitySerializerMixin, serializers.ModelSerializer):
     """Serializer for Lead list view - includes activity data for table display"""
 
+    activity_entity_type = 'lead'
+
     firstName = serializers.CharField(source='first_name')
     lastName = serializers.CharField(source='last_name')
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
@@ -44,37 +46,16 @@ class LeadListSerializer(serializers.ModelSerializer):
 
     def get_hasActivity(self, obj):
         """Check if lead has any activity - uses prefetched data"""
-        call_logs = self._get_prefetched_call_logs(obj)
-        notes = self._get_prefetched_notes(obj)
-        return len(call_logs) > 0 or len(notes) > 0
-
-    def _get_prefetched_call_logs(self, obj):
-        """Get call logs from prefetched context or fallback to query"""
-        prefetched = self.context.get('prefetched_call_logs')
-        if prefetched is not None:
-            return prefetched.get(obj.id, [])
-        # Fallback for when serializer is used without prefetch
-        return list(CallLog.objects.filter(entity_type='lead', entity_id=obj.id))
-
-    def _get_prefetched_notes(self, obj):
-        """Get notes from prefetched context or fallback to query"""
-        prefetched = self.context.get('prefetched_notes')
-        if prefetched is not None:
-            return prefetched.get(obj.id, [])
-        # Fallback for when serializer is used without prefetch
-        return list(Note.objects.filter(entity_type='lead', entity_id=obj.id))
+        return bool(self._get_activities(obj, 'call_logs') or self._get_activities(obj, 'notes'))
 
     def get_callLogs(self, obj):
-        call_logs = self._get_prefetched_call_logs(obj)
-        return CallLogSerializer(call_logs, many=True).data
+        return self._get_activities(obj, 'call_logs')
 
     def get_notes(self, obj):
-        notes = self._get_prefetched_notes(obj)
-        return NoteSerializer(notes, many=True).data
+        return self._get_activities(obj, 'notes')
 
     def get_statusChanges(self, obj):
-        # Uses prefetched status_changes from queryset
-        return StatusChangeSerializer(obj.status_changes.all(), many=True).data
+        return self._get_activities(obj, 'status_changes')
 
     def get_convertedClientId(self, obj):
         """Get the client ID if this lead was converted - uses prefetched data"""
@@ -83,6 +64,58 @@ class LeadListSerializer(serializers.ModelSerializer):
         return clients[0].id if clients else None
 
 
+class LeadCompactListSerializer(ActivitySummarySerializerMixin, serializers.ModelSerializer):
+    """Serializer for compact Lead list view - activity counts instead of full history"""
+
+    activity_entity_type = 'lead'
+
+    firstName = serializers.CharField(source='first_name')
+    lastName = serializers.CharField(source='last_name')
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
+    sourceDisplay = serializers.CharField(source='source_display', read_only=True)
+    sourceSlaMin = serializers.SerializerMethodField()
+    hasActivity = serializers.SerializerMethodField()
+    callCount = serializers.SerializerMethodField()
+    noteCount = serializers.SerializerMethodField()
+    statusChangeCount = serializers.SerializerMethodField()
+    lastActivityAt = serializers.SerializerMethodField()
+    convertedClientId = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Lead
+        fields = [
+            'id', 'firstName', 'lastName', 'email', 'phone',
+            'sourceDisplay', 'sourceSlaMin', 'hasActivity', 'intent', 'status',
+            'createdAt', 'updatedAt', 'callCount', 'noteCount', 'statusChangeCount',
+            'lastActivityAt', 'convertedClientId'
+        ]
+
+    def get_sourceSlaMin(self, obj):
+        return obj.source.default_sla_min if obj.source else None
+
+    def get_hasActivity(self, obj):
+        """Same rule as the full list - any calls or notes"""
+        return bool(self._get_activity_count(obj, 'call_logs') or self._get_activity_count(obj, 'notes'))
+
+    def get_callCount(self, obj):
+        return self._get_activity_count(obj, 'call_logs')
+
+    def get_noteCount(self, obj):
+        return self._get_activity_count(obj, 'notes')
+
+    def get_statusChangeCount(self, obj):
+        return self._get_activity_count(obj, 'status_changes')
+
+    def get_lastActivityAt(self, obj):
+        return self._get_last_activity_at(obj)
+
+    def get_convertedClientId(self, obj):
+        """Get the client ID if this lead was converted - uses prefetched data"""
+        clients = list(obj.converted_client.all())
+        return clients[0].id if clients else None
+
+
 class LeadDetailSerializer(LeadListSerializer):
     """Serializer for Lead detail view - extends list with transcript field"""
 
@@ -135,6 +168,22 @@ class LeadUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
+class LeadIngestRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk ingest - validated without database lookups.
+    The sub-source is given by ID or by name and resolved by the service.
+    """
+
+    firstName = serializers.CharField(max_length=100)
+    lastName = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    email = serializers.EmailField(required=False, allow_null=True, allow_blank=True)
+    phone = serializers.CharField(max_length=20)
+    sourceId = serializers.UUIDField(required=False, allow_null=True)
+    source = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    intent = serializers.CharField(required=False, allow_blank=True, default='')
+    transcript = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
 class DropLeadSerializer(serializers.Serializer):
     """Serializer for dropping a lead"""
 
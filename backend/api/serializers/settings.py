@@ -233,6 +233,22 @@ class BankProductSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'createdAt', 'updatedAt']
 
 
+class MortgageQuoteSerializer(serializers.Serializer):
+    """Query params for mortgage comparisons and schedules"""
+
+    loan_amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=1)
+    term_years = serializers.IntegerField(min_value=1, max_value=30)
+    property_value = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=1, required=False)
+    granularity = serializers.ChoiceField(choices=['monthly', 'yearly'], default='monthly')
+    ids = serializers.CharField(required=False, help_text='Comma-separated product IDs')
+
+    def validate_ids(self, value):
+        try:
+            return [int(product_id) for product_id in value.split(',') if product_id.strip()]
+        except ValueError:
+            raise serializers.ValidationError('Must be comma-separated integers.')
+
+
 class EiborRateSerializer(serializers.ModelSerializer):
     """Serializer for EiborRate model"""
 
@@ -242,6 +258,15 @@ class EiborRateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class EiborSeriesQuerySerializer(serializers.Serializer):
+    """Query params for the EIBOR series endpoint"""
+
+    term = serializers.MultipleChoiceField(choices=EiborRate.TERM_CHOICES, required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    interval = serializers.ChoiceField(choices=['daily', 'weekly', 'monthly'], default='daily')
+
+
 class EiborRatesResponseSerializer(serializers.Serializer):
     """Serializer for EIBOR rates response grouped by term"""
 
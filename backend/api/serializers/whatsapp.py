@@ -3,7 +3,7 @@ WhatsApp Message Serializers
 """
 
 from rest_framework import serializers
-from core.models import WhatsAppMessage
+from core.models import WhatsAppMessage, WhatsAppConversation
 
 
 class WhatsAppMessageSerializer(serializers.ModelSerializer):
@@ -24,12 +24,50 @@ class WhatsAppMessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'createdAt']
 
 
-class SendMessageSerializer(serializers.Serializer):
-    """Serializer for sending a WhatsApp message"""
+class WhatsAppConversationSerializer(serializers.ModelSerializer):
+    """Serializer for inbox rows - expects lead/client via select_related"""
+
+    entityType = serializers.CharField(source='entity_type', read_only=True)
+    entityId = serializers.SerializerMethodField()
+    name = serializers.SerializerMethodField()
+    phone = serializers.SerializerMethodField()
+    lastMessage = serializers.CharField(source='last_message_preview', read_only=True)
+    lastMessageTime = serializers.DateTimeField(source='last_message_at', read_only=True)
+    lastMessageDirection = serializers.CharField(source='last_message_direction', read_only=True)
+    unreadCount = serializers.IntegerField(source='unread_count', read_only=True)
+
+    class Meta:
+        model = WhatsAppConversation
+        fields = [
+            'entityType',
+            'entityId',
+            'name',
+            'phone',
+            'lastMessage',
+            'lastMessageTime',
+            'lastMessageDirection',
+            'unreadCount',
+        ]
+
+    def _get_entity(self, obj):
+        return obj.lead if obj.entity_type == 'lead' else obj.client
+
+    def get_entityId(self, obj):
+        return obj.lead_id if obj.entity_type == 'lead' else obj.client_id
+
+    def get_name(self, obj):
+        entity = self._get_entity(obj)
+        return f"{entity.first_name} {entity.last_name}"
+
+    def get_phone(self, obj):
+        return self._get_entity(obj).phone
+
+
+class ThreadSerializer(serializers.Serializer):
+    """Identifies a WhatsApp thread by its lead or client"""
 
     lead_id = serializers.IntegerField(required=False)
     client_id = serializers.IntegerField(required=False)
-    content = serializers.CharField(max_length=4096)
 
     def validate(self, data):
         if not data.get('lead_id') and not data.get('client_id'):
@@ -41,3 +79,9 @@ class SendMessageSerializer(serializers.Serializer):
                 'Only one of lead_id or client_id should be provided'
             )
         return data
+
+
+class SendMessageSerializer(ThreadSerializer):
+    """Serializer for sending a WhatsApp message"""
+
+    content = serializers.CharField(max_length=4096)
@@ -1,12 +1,36 @@
 """
 Service Layer
 
-Business logic for leads, clients, and cases.
+Business logic for leads, clients, cases, and WhatsApp messaging.
 ViewSets are thin - logic lives in services.
 """
 
 from .leads import LeadService
 from .clients import ClientService
 from .cases import CaseService
+from .whatsapp import WhatsAppService
+from .placeholders import PlaceholderService
+from .lead_ingest import LeadIngestService
+from .bank_matching import BankMatchService
+from .eligibility import EligibilityService
+from .mortgage import MortgageService
+from .eibor import EiborService
+from .bank_pricing import BankPricingService
+from .case_board import CaseBoardService
+from .analytics import AnalyticsService
 
-__all__ = ['LeadService', 'ClientService', 'CaseService']
+__all__ = [
+    'LeadService',
+    'ClientService',
+    'CaseService',
+    'WhatsAppService',
+    'PlaceholderService',
+    'LeadIngestService',
+    'BankMatchService',
+    'EligibilityService',
+    'MortgageService',
+    'EiborService',
+    'BankPricingService',
+    'CaseBoardService',
+    'AnalyticsService',
+]
@@ -0,0 +1,173 @@
+"""
+Activity Loader
+
+Batched read path for entity activity shown in lists and detail panels:
+call logs, notes, and lead/client status changes or case stage changes.
+
+All sources are fetched in a single UNION ALL query of .values() rows.
+When a limit is given, a ROW_NUMBER() window keeps only the latest N
+rows of each kind per entity, so list payloads stay bounded no matter
+how much history an entity has.
+
+summarize() is the even lighter variant for compact lists: per-kind
+counts and latest timestamps, aggregated by the database.
+"""
+
+from collections import defaultdict
+
+from django.db.models import CharField, Count, F, Max, TextField, Value, Window
+from django.db.models.functions import Cast, RowNumber
+from core.models import CallLog, Note, LeadStatusChange, ClientStatusChange, CaseStageChange
+
+
+# Latest activities of each kind embedded per row in list endpoints
+ACTIVITY_LIST_LIMIT = 20
+
+# Status history table and its FK column for each entity type
+STATUS_CHANGE_SOURCES = {
+    'lead': (LeadStatusChange, 'lead_id'),
+    'client': (ClientStatusChange, 'client_id'),
+    'case': (CaseStageChange, 'case_id'),
+}
+
+ACTIVITY_KINDS = ('call_logs', 'notes', 'status_changes')
+
+
+class ActivityLoader:
+    """Loads activity rows for many entities of one type in one query."""
+
+    def __init__(self, entity_type: str, limit: int = None):
+        """
+        Args:
+            entity_type: 'lead', 'client' or 'case'
+            limit: Latest N rows of each kind per entity (None = full history)
+        """
+        self.entity_type = entity_type
+        self.limit = limit
+
+    def load(self, entity_ids: list) -> dict:
+        """
+        Load activities for the given entities.
+
+        Returns:
+            Dict with 'call_logs', 'notes' and 'status_changes', each mapping
+            entity_id -> list of API-shaped dicts, newest first
+        """
+        activities = {kind: defaultdict(list) for kind in ACTIVITY_KINDS}
+        entity_ids = list(entity_ids)
+        if not entity_ids:
+            return activities
+
+        for row in self.get_queryset(entity_ids):
+            kind = row['kind']
+            activities[kind][row['owner_id']].append(self._shape(kind, row))
+
+        return activities
+
+    def summarize(self, entity_ids: list) -> dict:
+        """
+        Aggregate activity per entity without loading any rows.
+
+        Returns:
+            Dict mapping entity_id -> {kind: {'count': int, 'lastAt': datetime}}
+            for kinds the entity has activity in
+        """
+        summary = defaultdict(dict)
+        entity_ids = list(entity_ids)
+        if not entity_ids:
+            return summary
+
+        status_model, owner_field = STATUS_CHANGE_SOURCES[self.entity_type]
+        parts = [
+            self._summary_rows(
+                CallLog.objects.filter(entity_type=self.entity_type, entity_id__in=entity_ids),
+                'call_logs', 'entity_id',
+            ),
+            self._summary_rows(
+                Note.objects.filter(entity_type=self.entity_type, entity_id__in=entity_ids),
+                'notes', 'entity_id',
+            ),
+            self._summary_rows(
+                status_model.objects.filter(**{f'{owner_field}__in': entity_ids}),
+                'status_changes', owner_field,
+            ),
+        ]
+
+        for row in parts[0].union(*parts[1:], all=True):
+            summary[row['owner_id']][row['kind']] = {'count': row['total'], 'lastAt': row['last_at']}
+
+        return summary
+
+    def _summary_rows(self, queryset, kind: str, owner_field: str):
+        """GROUP BY owner projection of (owner_id, kind, total, last_at)"""
+        return queryset.order_by().values(owner_id=F(owner_field)).annotate(
+            kind=Value(kind, output_field=CharField()),
+            total=Count('id'),
+            last_at=Max('timestamp'),
+        )
+
+    def get_queryset(self, entity_ids: list):
+        """UNION ALL of the three activity sources as uniform .values() rows"""
+        status_model, owner_field = STATUS_CHANGE_SOURCES[self.entity_type]
+        # Two distinct NULL expressions - identical ones get collapsed into a
+        # single column when Django wraps a window-filtered query
+        null_text = Cast(Value(None), output_field=TextField())
+        null_char = Cast(Value(None), output_field=CharField())
+
+        call_logs = self._rows(
+            CallLog.objects.filter(entity_type=self.entity_type, entity_id__in=entity_ids),
+            'call_logs', 'entity_id',
+            a=F('outcome'), b=F('notes'), c=null_char,
+        )
+        notes = self._rows(
+            Note.objects.filter(entity_type=self.entity_type, entity_id__in=entity_ids),
+            'notes', 'entity_id',
+            a=F('content'), b=null_text, c=null_char,
+        )
+        if self.entity_type == 'case':
+            columns = {'a': F('from_stage'), 'b': F('to_stage'), 'c': F('notes')}
+        else:
+            columns = {'a': F('type'), 'b': F('notes'), 'c': null_char}
+        status_changes = self._rows(
+            status_model.objects.filter(**{f'{owner_field}__in': entity_ids}),
+            'status_changes', owner_field,
+            **columns,
+        )
+
+        return call_logs.union(notes, status_changes, all=True).order_by('-at', '-row_id')
+
+    def _rows(self, queryset, kind: str, owner_field: str, **columns):
+        """Project one source onto (kind, row_id, owner_id, at, a, b, c)"""
+        queryset = queryset.order_by()
+        if self.limit:
+            queryset = queryset.annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=[F(owner_field)],
+                    order_by=[F('timestamp').desc(), F('id').desc()],
+                )
+            ).filter(rank__lte=self.limit)
+
+        return queryset.values(
+            kind=Value(kind, output_field=CharField()),
+            row_id=F('id'),
+            owner_id=F(owner_field),
+            at=F('timestamp'),
+            **columns,
+        )
+
+    def _shape(self, kind: str, row: dict) -> dict:
+        """Map a uniform row to the shape the API has always returned"""
+        if kind == 'call_logs':
+            return {'id': row['row_id'], 'outcome': row['a'], 'notes': row['b'], 'timestamp': row['at']}
+        if kind == 'notes':
+            return {'id': row['row_id'], 'content': row['a'], 'timestamp': row['at']}
+        if self.entity_type == 'case':
+            return {
+                'id': row['row_id'],
+                'fromStage': row['a'],
+                'toStage': row['b'],
+                'notes': row['c'],
+                'timestamp': row['at'],
+            }
+        return {'id': row['row_id'], 'type': row['a'], 'notes': row['b'], 'timestamp': row['at']}
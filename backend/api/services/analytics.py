@@ -0,0 +1,622 @@
+"""
+Analytics Service
+
+Pipeline analytics for dashboards, read from precomputed rollup tables:
+
+- funnel: lead -> client -> case -> disbursed conversion per channel,
+  sub-source or campaign (FunnelRollup)
+- stage durations: median and mean time cases spend in each stage, from a
+  per-stage histogram of completed stays (StageDurationRollup)
+- drop-offs: where and why leads, clients and cases leave the funnel
+  (DropOffRollup)
+- daily metrics: leads, calls, notes, conversions, cases opened and
+  disbursed volume per day and sub-source (DailyMetric)
+
+refresh() folds new source rows into the rollups incrementally. Each
+source table has a RollupWatermark with the last id folded in, and only
+rows after it are read. Rows younger than ANALYTICS['SETTLE_SECONDS']
+wait for the next refresh: ids are allocated before commit, so a slow
+transaction can commit a lower id after a higher one is visible.
+
+Channel, sub-source and campaign are attributed when a row is folded in.
+`manage.py refresh_analytics --rebuild` recomputes everything from history.
+Daily metrics have their own watermarks ('daily.*'), so they backfill
+from history on the first refresh after they are added.
+"""
+
+import bisect
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q, Sum
+from django.utils import timezone
+
+from core.cache import reference_cache
+from core.models import (
+    CallLog,
+    Case,
+    CaseStageChange,
+    Client,
+    ClientStatusChange,
+    DailyMetric,
+    DropOffRollup,
+    FunnelRollup,
+    Lead,
+    LeadStatusChange,
+    Note,
+    RollupWatermark,
+    StageDurationRollup,
+)
+
+DEFAULTS = {
+    'SETTLE_SECONDS': 60,  # Rows younger than this are left for the next refresh
+    'BATCH_SIZE': 5000,    # Source rows per source per transaction
+}
+
+# Upper bounds (hours) of the stage duration histogram buckets - one more
+# open-ended bucket holds longer stays
+DURATION_BUCKETS = [1, 2, 4, 6, 8, 12, 18, 24, 36, 48, 72, 96, 120, 168, 240, 336, 504, 720, 1080, 1440, 2160]
+
+REASON_MAX_LENGTH = 200
+
+FUNNEL_FIELDS = [
+    'leads', 'leads_converted', 'leads_dropped',
+    'clients', 'clients_with_case', 'clients_not_eligible', 'clients_not_proceeding',
+    'cases', 'cases_disbursed', 'cases_declined', 'cases_withdrawn', 'disbursed_amount',
+]
+
+# DailyMetric counter -> API field
+DAILY_FIELDS = {
+    'leads': 'leads',
+    'calls': 'calls',
+    'notes': 'notes',
+    'conversions': 'conversions',
+    'cases_opened': 'casesOpened',
+    'cases_disbursed': 'casesDisbursed',
+    'disbursed_amount': 'disbursedAmount',
+}
+
+# Status change type -> (FunnelRollup counter, DropOffRollup outcome or None)
+LEAD_OUTCOMES = {
+    'converted_to_client': ('leads_converted', None),
+    'dropped': ('leads_dropped', 'lead_dropped'),
+}
+CLIENT_OUTCOMES = {
+    'not_eligible': ('clients_not_eligible', 'client_not_eligible'),
+    'not_proceeding': ('clients_not_proceeding', 'client_not_proceeding'),
+}
+CASE_OUTCOMES = {
+    'disbursed': ('cases_disbursed', None),
+    'declined': ('cases_declined', 'case_declined'),
+    'withdrawn': ('cases_withdrawn', 'case_withdrawn'),
+}
+
+
+def get_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, 'ANALYTICS', {})}
+
+
+def duration_bucket(seconds: float) -> int:
+    """Histogram bucket of a stay - bucket i holds stays up to DURATION_BUCKETS[i] hours"""
+    return bisect.bisect_left(DURATION_BUCKETS, seconds / 3600)
+
+
+def histogram_median(buckets: dict):
+    """
+    Median hours from {bucket: (count, total_seconds)}, interpolated
+    linearly within the bucket holding it. None when empty.
+    """
+    total = sum(count for count, _ in buckets.values())
+    if not total:
+        return None
+    half = total / 2
+    seen = 0
+    for bucket in sorted(buckets):
+        count, seconds = buckets[bucket]
+        if count and seen + count >= half:
+            if bucket >= len(DURATION_BUCKETS):
+                # Open-ended bucket - its mean is the best estimate
+                return seconds / count / 3600
+            low = DURATION_BUCKETS[bucket - 1] if bucket else 0
+            high = DURATION_BUCKETS[bucket]
+            return low + (high - low) * (half - seen) / count
+        seen += count
+    return None
+
+
+def _reason(notes) -> str:
+    """Drop-off reason key - free-text notes with whitespace collapsed"""
+    return ' '.join((notes or '').split())[:REASON_MAX_LENGTH]
+
+
+class RollupDeltas:
+    """Counter increments for the rollup tables, accumulated over one batch"""
+
+    def __init__(self):
+        self.funnel = defaultdict(Counter)     # (dimension, key) -> {field: delta}
+        self.durations = defaultdict(Counter)  # (stage, bucket) -> {count, total_seconds}
+        self.drop_offs = defaultdict(Counter)  # (outcome, stage, reason) -> {count}
+        self.daily = defaultdict(Counter)      # (day, sub_source) -> {field: delta}
+
+    def add_funnel(self, channel, sub_source, campaign, field: str, amount=1):
+        for dimension, key in (('channel', channel), ('sub_source', sub_source), ('campaign', campaign)):
+            self.funnel[(dimension, '' if key is None else str(key))][field] += amount
+
+    def add_duration(self, stage: str, seconds: float):
+        counter = self.durations[(stage, duration_bucket(seconds))]
+        counter['count'] += 1
+        counter['total_seconds'] += int(seconds)
+
+    def add_drop_off(self, outcome: str, stage: str, notes):
+        self.drop_offs[(outcome, stage or '', _reason(notes))]['count'] += 1
+
+    def add_daily(self, timestamp, sub_source, field: str, amount=1):
+        key = (timezone.localdate(timestamp), '' if sub_source is None else str(sub_source))
+        self.daily[key][field] += amount
+
+    def apply(self):
+        _increment(FunnelRollup, ['dimension', 'key'], self.funnel)
+        _increment(StageDurationRollup, ['stage', 'bucket'], self.durations)
+        _increment(DropOffRollup, ['outcome', 'stage', 'reason'], self.drop_offs)
+        _increment(DailyMetric, ['day', 'sub_source'], self.daily)
+
+
+def _increment(model, key_fields: list, deltas: dict):
+    """Add deltas to rollup rows, creating missing ones (one SELECT, then bulk writes)"""
+    if not deltas:
+        return
+    # One lookup per key prefix: (a=.., b=.., c__in=[..]) instead of a term per key
+    prefixes = defaultdict(list)
+    for key in deltas:
+        prefixes[key[:-1]].append(key[-1])
+    lookup = Q()
+    for prefix, values in prefixes.items():
+        lookup |= Q(**dict(zip(key_fields[:-1], prefix)), **{f'{key_fields[-1]}__in': values})
+    rows = {tuple(getattr(row, field) for field in key_fields): row for row in model.objects.filter(lookup)}
+
+    created, fields = [], set()
+    for key, counter in deltas.items():
+        row = rows.get(key)
+        if row is None:
+            row = model(**dict(zip(key_fields, key)))
+            created.append(row)
+        for field, amount in counter.items():
+            setattr(row, field, getattr(row, field) + amount)
+            fields.add(field)
+    model.objects.bulk_create(created)
+    if rows:
+        model.objects.bulk_update(list(rows.values()), sorted(fields))
+
+
+# =============================================================================
+# Source folding - one function per source
+# =============================================================================
+
+def _fold_leads(rows, deltas):
+    for row in rows:
+        deltas.add_funnel(row['source__source__channel_id'], row['source_id'], None, 'leads')
+
+
+def _fold_clients(rows, deltas):
+    for row in rows:
+        deltas.add_funnel(row['source__source__channel_id'], row['source_id'], row['source_campaign_id'], 'clients')
+
+
+def _fold_cases(rows, deltas):
+    # Clients whose first case was folded in by an earlier batch
+    with_case = set(
+        Case.objects.filter(client_id__in={row['client_id'] for row in rows}, id__lt=rows[0]['id'])
+        .order_by().values_list('client_id', flat=True).distinct()
+    )
+    for row in rows:
+        attribution = (row['client__source__source__channel_id'], row['client__source_id'],
+                       row['client__source_campaign_id'])
+        deltas.add_funnel(*attribution, 'cases')
+        if row['client_id'] not in with_case:
+            with_case.add(row['client_id'])
+            deltas.add_funnel(*attribution, 'clients_with_case')
+
+
+def _fold_lead_changes(rows, deltas):
+    for row in rows:
+        if row['type'] not in LEAD_OUTCOMES:
+            continue
+        field, outcome = LEAD_OUTCOMES[row['type']]
+        deltas.add_funnel(row['lead__source__source__channel_id'], row['lead__source_id'], None, field)
+        if outcome:
+            deltas.add_drop_off(outcome, '', row['notes'])
+
+
+def _fold_client_changes(rows, deltas):
+    for row in rows:
+        if row['type'] not in CLIENT_OUTCOMES:
+            continue
+        field, outcome = CLIENT_OUTCOMES[row['type']]
+        deltas.add_funnel(row['client__source__source__channel_id'], row['client__source_id'],
+                          row['client__source_campaign_id'], field)
+        deltas.add_drop_off(outcome, '', row['notes'])
+
+
+def _fold_case_changes(rows, deltas):
+    # When each change's from_stage was entered: the case's previous change
+    # (possibly folded in earlier), else the case's creation
+    entered = {}
+    last_change = {}
+    history = (
+        CaseStageChange.objects
+        .filter(case_id__in={row['case_id'] for row in rows}, id__lte=rows[-1]['id'])
+        .order_by('case_id', 'timestamp', 'id')
+        .values_list('case_id', 'id', 'timestamp')
+    )
+    for case_id, change_id, timestamp in history:
+        entered[change_id] = last_change.get(case_id)
+        last_change[case_id] = timestamp
+
+    for row in rows:
+        if row['from_stage']:
+            since = entered.get(row['id']) or row['case__created_at']
+            deltas.add_duration(row['from_stage'], max((row['timestamp'] - since).total_seconds(), 0))
+
+        if row['to_stage'] not in CASE_OUTCOMES:
+            continue
+        attribution = (row['case__client__source__source__channel_id'], row['case__client__source_id'],
+                       row['case__client__source_campaign_id'])
+        field, outcome = CASE_OUTCOMES[row['to_stage']]
+        deltas.add_funnel(*attribution, field)
+        if row['to_stage'] == 'disbursed':
+            deltas.add_funnel(*attribution, 'disbursed_amount', row['case__loan_amount'])
+        if outcome:
+            deltas.add_drop_off(outcome, row['from_stage'], row['notes'])
+
+
+def _fold_daily_leads(rows, deltas):
+    for row in rows:
+        deltas.add_daily(row['created_at'], row['source_id'], 'leads')
+
+
+def _entity_sub_sources(rows) -> dict:
+    """(entity_type, entity_id) -> sub-source of the lead, client or case a call or note belongs to"""
+    entity_ids = defaultdict(set)
+    for row in rows:
+        entity_ids[row['entity_type']].add(row['entity_id'])
+    lookups = {'lead': (Lead, 'source_id'), 'client': (Client, 'source_id'), 'case': (Case, 'client__source_id')}
+    sub_sources = {}
+    for entity_type, ids in entity_ids.items():
+        if entity_type not in lookups:
+            continue
+        model, field = lookups[entity_type]
+        for pk, sub_source in model.objects.filter(id__in=ids).order_by().values_list('id', field):
+            sub_sources[(entity_type, pk)] = sub_source
+    return sub_sources
+
+
+def _fold_daily_activity(field: str):
+    def fold(rows, deltas):
+        sub_sources = _entity_sub_sources(rows)
+        for row in rows:
+            deltas.add_daily(row['timestamp'], sub_sources.get((row['entity_type'], row['entity_id'])), field)
+    return fold
+
+
+def _fold_daily_conversions(rows, deltas):
+    for row in rows:
+        if row['type'] == 'converted_to_client':
+            deltas.add_daily(row['timestamp'], row['lead__source_id'], 'conversions')
+
+
+def _fold_daily_cases(rows, deltas):
+    for row in rows:
+        deltas.add_daily(row['created_at'], row['client__source_id'], 'cases_opened')
+
+
+def _fold_daily_disbursals(rows, deltas):
+    for row in rows:
+        if row['to_stage'] == 'disbursed':
+            deltas.add_daily(row['timestamp'], row['case__client__source_id'], 'cases_disbursed')
+            deltas.add_daily(row['timestamp'], row['case__client__source_id'], 'disbursed_amount',
+                             row['case__loan_amount'])
+
+
+# Watermark name -> (model, timestamp field, fields the fold function reads, fold function)
+SOURCES = {
+    'analytics.leads': (
+        Lead, 'created_at', ['source_id', 'source__source__channel_id'], _fold_leads,
+    ),
+    'analytics.clients': (
+        Client, 'created_at', ['source_id', 'source__source__channel_id', 'source_campaign_id'], _fold_clients,
+    ),
+    'analytics.cases': (
+        Case, 'created_at',
+        ['client_id', 'client__source_id', 'client__source__source__channel_id', 'client__source_campaign_id'],
+        _fold_cases,
+    ),
+    'analytics.lead_status_changes': (
+        LeadStatusChange, 'timestamp', ['type', 'notes', 'lead__source_id', 'lead__source__source__channel_id'],
+        _fold_lead_changes,
+    ),
+    'analytics.client_status_changes': (
+        ClientStatusChange, 'timestamp',
+        ['type', 'notes', 'client__source_id', 'client__source__source__channel_id', 'client__source_campaign_id'],
+        _fold_client_changes,
+    ),
+    'analytics.case_stage_changes': (
+        CaseStageChange, 'timestamp',
+        ['case_id', 'from_stage', 'to_stage', 'notes', 'case__created_at', 'case__loan_amount',
+         'case__client__source_id', 'case__client__source__source__channel_id', 'case__client__source_campaign_id'],
+        _fold_case_changes,
+    ),
+    'daily.leads': (Lead, 'created_at', ['source_id'], _fold_daily_leads),
+    'daily.call_logs': (CallLog, 'timestamp', ['entity_type', 'entity_id'], _fold_daily_activity('calls')),
+    'daily.notes': (Note, 'timestamp', ['entity_type', 'entity_id'], _fold_daily_activity('notes')),
+    'daily.lead_status_changes': (LeadStatusChange, 'timestamp', ['type', 'lead__source_id'], _fold_daily_conversions),
+    'daily.cases': (Case, 'created_at', ['client__source_id'], _fold_daily_cases),
+    'daily.case_stage_changes': (
+        CaseStageChange, 'timestamp', ['to_stage', 'case__loan_amount', 'case__client__source_id'],
+        _fold_daily_disbursals,
+    ),
+}
+
+
+def _rate(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
+
+
+class AnalyticsService:
+    """Service for pipeline analytics rollups"""
+
+    @staticmethod
+    def refresh(batch_size: int = None, settle: float = None) -> dict:
+        """
+        Fold source rows added since the watermarks into the rollups.
+        Every transaction takes one batch from each source that is behind,
+        until all sources are caught up.
+
+        Args:
+            batch_size: Rows per source per transaction (default ANALYTICS['BATCH_SIZE'])
+            settle: Seconds a row must have existed (default ANALYTICS['SETTLE_SECONDS'])
+
+        Returns:
+            {watermark name: rows folded in}
+        """
+        config = get_config()
+        batch_size = batch_size or config['BATCH_SIZE']
+        settle = config['SETTLE_SECONDS'] if settle is None else settle
+
+        RollupWatermark.objects.bulk_create([RollupWatermark(name=name) for name in SOURCES], ignore_conflicts=True)
+        processed = dict.fromkeys(SOURCES, 0)
+        pending = list(SOURCES)
+        while pending:
+            cutoff = timezone.now() - timedelta(seconds=settle)
+            with transaction.atomic():
+                # Locking the watermarks serializes concurrent refreshes
+                watermarks = {
+                    watermark.name: watermark
+                    for watermark in RollupWatermark.objects.select_for_update().filter(name__in=SOURCES)
+                }
+                deltas = RollupDeltas()
+                for name in list(pending):
+                    count = AnalyticsService._fold(name, watermarks[name], deltas, batch_size, cutoff)
+                    processed[name] += count
+                    if count < batch_size:
+                        pending.remove(name)
+                deltas.apply()
+
+                now = timezone.now()
+                for watermark in watermarks.values():
+                    watermark.updated_at = now
+                RollupWatermark.objects.bulk_update(watermarks.values(), ['last_id', 'updated_at'])
+        return processed
+
+    @staticmethod
+    def _fold(name: str, watermark, deltas: RollupDeltas, batch_size: int, cutoff) -> int:
+        """Fold the next batch of one source into deltas and advance its watermark"""
+        model, time_field, fields, fold = SOURCES[name]
+        rows = list(
+            model.objects.filter(id__gt=watermark.last_id).order_by('id')
+            .values('id', time_field, *fields)[:batch_size]
+        )
+        # Stop at the first unsettled row - the watermark must not pass it
+        for index, row in enumerate(rows):
+            if row[time_field] > cutoff:
+                rows = rows[:index]
+                break
+        if rows:
+            fold(rows, deltas)
+            watermark.last_id = rows[-1]['id']
+        return len(rows)
+
+    @staticmethod
+    @transaction.atomic
+    def reset():
+        """Empty the rollups and rewind the watermarks - the next refresh recomputes from history"""
+        list(RollupWatermark.objects.select_for_update().filter(name__in=SOURCES))
+        FunnelRollup.objects.all().delete()
+        StageDurationRollup.objects.all().delete()
+        DropOffRollup.objects.all().delete()
+        DailyMetric.objects.all().delete()
+        RollupWatermark.objects.filter(name__in=SOURCES).update(last_id=0, updated_at=timezone.now())
+
+    @staticmethod
+    def refreshed_at():
+        """When the least recently refreshed source was last refreshed (None before the first refresh)"""
+        return RollupWatermark.objects.filter(name__in=SOURCES).aggregate(at=Min('updated_at'))['at']
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def funnel(dimension: str) -> dict:
+        """
+        Funnel counters and conversion rates per channel, sub-source or campaign.
+
+        Returns:
+            {'dimension', 'refreshedAt', 'rows': [...], 'totals': {...}} - rows by lead count
+        """
+        names = AnalyticsService._dimension_names(dimension)
+        rows = FunnelRollup.objects.filter(dimension=dimension).order_by('-leads', '-clients', 'key')
+        totals = Counter()
+        results = []
+        for row in rows:
+            counters = {field: getattr(row, field) for field in FUNNEL_FIELDS}
+            totals.update(counters)
+            results.append({'key': row.key or None, 'name': names.get(row.key), **AnalyticsService._funnel(counters)})
+        return {
+            'dimension': dimension,
+            'refreshedAt': AnalyticsService.refreshed_at(),
+            'rows': results,
+            'totals': AnalyticsService._funnel({field: totals[field] for field in FUNNEL_FIELDS}),
+        }
+
+    @staticmethod
+    def _funnel(counters: dict) -> dict:
+        return {
+            'leads': counters['leads'],
+            'leadsConverted': counters['leads_converted'],
+            'leadsDropped': counters['leads_dropped'],
+            'clients': counters['clients'],
+            'clientsWithCase': counters['clients_with_case'],
+            'clientsNotEligible': counters['clients_not_eligible'],
+            'clientsNotProceeding': counters['clients_not_proceeding'],
+            'cases': counters['cases'],
+            'casesDisbursed': counters['cases_disbursed'],
+            'casesDeclined': counters['cases_declined'],
+            'casesWithdrawn': counters['cases_withdrawn'],
+            'disbursedAmount': float(counters['disbursed_amount']),
+            'conversion': {
+                'leadToClient': _rate(counters['leads_converted'], counters['leads']),
+                'clientToCase': _rate(counters['clients_with_case'], counters['clients']),
+                'caseToDisbursed': _rate(counters['cases_disbursed'], counters['cases']),
+            },
+        }
+
+    @staticmethod
+    def _dimension_names(dimension: str) -> dict:
+        """Rollup key -> display name, from the reference cache"""
+        if dimension == 'channel':
+            return {channel.id: channel.name for channel in reference_cache.get('channels')}
+        if dimension == 'sub_source':
+            return {
+                str(sub_source.id): f"{sub_source.name} ({sub_source.source.name})"
+                for sub_source in reference_cache.get('sub_sources')
+            }
+        return {str(campaign.id): campaign.name for campaign in reference_cache.get('campaigns')}
+
+    @staticmethod
+    def stage_durations() -> dict:
+        """
+        Completed stays per case stage: count, median and mean hours.
+        Medians are interpolated within histogram buckets, so approximate.
+
+        Returns:
+            {'refreshedAt', 'stages': [{'stage', 'count', 'medianHours', 'meanHours'}]}
+            - every active stage, plus terminal stages cases have left
+        """
+        histograms = defaultdict(dict)
+        for row in StageDurationRollup.objects.all():
+            histograms[row.stage][row.bucket] = (row.count, row.total_seconds)
+
+        stages = []
+        for stage, _ in Case.STAGE_CHOICES:
+            if stage not in Case.ACTIVE_STAGES and stage not in histograms:
+                continue
+            buckets = histograms.get(stage, {})
+            count = sum(count for count, _ in buckets.values())
+            total_seconds = sum(seconds for _, seconds in buckets.values())
+            median = histogram_median(buckets)
+            stages.append({
+                'stage': stage,
+                'count': count,
+                'medianHours': round(median, 1) if median is not None else None,
+                'meanHours': round(total_seconds / count / 3600, 1) if count else None,
+            })
+        return {'refreshedAt': AnalyticsService.refreshed_at(), 'stages': stages}
+
+    @staticmethod
+    def drop_offs(outcome: str = None, stage: str = None, limit: int = 50) -> dict:
+        """
+        Drop-off counts per outcome and the most common (outcome, stage, reason) rows.
+
+        Returns:
+            {'refreshedAt', 'totals': {outcome: count}, 'reasons': [{'outcome', 'stage', 'reason', 'count'}]}
+        """
+        queryset = DropOffRollup.objects.all()
+        if outcome:
+            queryset = queryset.filter(outcome=outcome)
+        if stage:
+            queryset = queryset.filter(stage=stage)
+
+        rows = list(queryset.order_by('-count', 'outcome', 'stage', 'reason').values('outcome', 'stage', 'reason', 'count'))
+        totals = Counter()
+        for row in rows:
+            totals[row['outcome']] += row['count']
+        return {
+            'refreshedAt': AnalyticsService.refreshed_at(),
+            'totals': dict(totals),
+            'reasons': [
+                {'outcome': row['outcome'], 'stage': row['stage'] or None,
+                 'reason': row['reason'] or None, 'count': row['count']}
+                for row in rows[:limit]
+            ],
+        }
+
+    @staticmethod
+    def daily(start, end, sub_sources: list = None, group: str = 'day') -> dict:
+        """
+        Daily counters over a date range in one query, every day present
+        (zeros where nothing happened).
+
+        Args:
+            start: First day (inclusive)
+            end: Last day (inclusive)
+            sub_sources: Only these sub-source ids ('' for unattributed), None for all
+            group: 'day' sums all sub-sources; 'sub_source' adds a series per sub-source
+
+        Returns:
+            {'from', 'to', 'days': [{'date', <counters>}], 'totals': {...}}
+            plus 'subSources': [{'key', 'name', 'days', 'totals'}] when grouped by sub-source
+        """
+        queryset = DailyMetric.objects.filter(day__gte=start, day__lte=end)
+        if sub_sources is not None:
+            queryset = queryset.filter(sub_source__in=sub_sources)
+        sums = {field: Sum(field) for field in DAILY_FIELDS}
+        if group == 'sub_source':
+            rows = list(queryset.values('day', 'sub_source').annotate(**sums).order_by())
+        else:
+            rows = list(queryset.values('day').annotate(**sums).order_by())
+
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        result = {'from': start, 'to': end, **AnalyticsService._daily_series(days, rows)}
+        if group == 'sub_source':
+            by_sub_source = defaultdict(list)
+            for row in rows:
+                by_sub_source[row['sub_source']].append(row)
+            names = AnalyticsService._dimension_names('sub_source')
+            series = [
+                {'key': key or None, 'name': names.get(key), **AnalyticsService._daily_series(days, key_rows)}
+                for key, key_rows in by_sub_source.items()
+            ]
+            result['subSources'] = sorted(series, key=lambda item: (-item['totals']['leads'], item['key'] or ''))
+        return result
+
+    @staticmethod
+    def _daily_series(days: list, rows: list) -> dict:
+        """Dense per-day series and totals from aggregated DailyMetric rows"""
+        per_day = defaultdict(Counter)
+        for row in rows:
+            per_day[row['day']].update({field: row[field] or 0 for field in DAILY_FIELDS})
+
+        def shape(counters):
+            data = {name: counters[field] for field, name in DAILY_FIELDS.items()}
+            data['disbursedAmount'] = float(data['disbursedAmount'])
+            return data
+
+        totals = Counter()
+        for counters in per_day.values():
+            totals.update(counters)
+        return {
+            'days': [{'date': day, **shape(per_day[day])} for day in days],
+            'totals': shape(totals),
+        }
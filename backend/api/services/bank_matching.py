@@ -0,0 +1,112 @@
+"""
+Bank Match Service
+
+Ranks bank products for clients with the vectorized matcher in
+core.matching and keeps Client.eligible_bank_products in sync.
+
+The compiled catalogue comes from the reference cache ('bank_catalogue'),
+so matching a client costs one query for the client row and none for
+the products.
+"""
+
+from django.db import transaction
+
+from core.cache import reference_cache
+from core.matching import CLIENT_FIELDS, ClientFeatures, MatchResult
+from core.models import Client
+
+REMATCH_CHUNK_SIZE = 2000
+
+
+class BankMatchService:
+    """Service for matching clients to bank products"""
+
+    @staticmethod
+    def get_matches(client: Client, transaction_type: str = None, term_years: int = None,
+                    include_ineligible: bool = False, limit: int = None) -> list:
+        """
+        Rank products for one client, best first.
+
+        Args:
+            client: Client to match
+            transaction_type: Case transaction type to match, None for any
+            term_years: Requested mortgage term, None for the longest allowed
+            include_ineligible: Also return failing products with their reasons
+            limit: Maximum number of products to return
+
+        Returns:
+            List of dicts with product id, bank, rate, term, instalment,
+            DBR, LTV and the names of any failed rules
+        """
+        catalogue = reference_cache.get('bank_catalogue')
+        row = {field: getattr(client, field) for field in CLIENT_FIELDS}
+        features = ClientFeatures.from_rows([row], transaction_type=transaction_type, term_years=term_years)
+        result = catalogue.match(features)
+
+        matches = []
+        for index in result.ranked(0, include_ineligible=include_ineligible)[:limit]:
+            dbr = result.dbr[0, index]
+            ltv = result.ltv[0, index]
+            matches.append({
+                'productId': int(catalogue.ids[index]),
+                'bankName': catalogue.bank_names[index],
+                'eligible': bool(result.eligible[0, index]),
+                'failedRules': MatchResult.reason_names(int(result.reasons[0, index])),
+                'rate': round(float(catalogue.rates[index]), 3),
+                'termMonths': int(result.term_months[0, index]),
+                'monthlyPayment': round(float(result.instalment[0, index]), 2),
+                'dbr': round(float(dbr), 2) if dbr == dbr and dbr != float('inf') else None,
+                'ltv': round(float(ltv), 2) if ltv == ltv else None,
+            })
+        return matches
+
+    @staticmethod
+    def update_client_matches(client: Client):
+        """Refresh one client's eligible_bank_products after its financials change"""
+        BankMatchService.rematch_clients(Client.objects.filter(id=client.id))
+
+    @staticmethod
+    def rematch_clients(queryset=None, chunk_size: int = REMATCH_CHUNK_SIZE) -> dict:
+        """
+        Re-match clients against the current catalogue and rewrite
+        eligible_bank_products, one transaction per chunk.
+
+        Args:
+            queryset: Clients to re-match (default: all active clients)
+            chunk_size: Clients matched and written per chunk
+
+        Returns:
+            {'clients': number re-matched, 'matches': links written}
+        """
+        catalogue = reference_cache.get('bank_catalogue')
+        if queryset is None:
+            queryset = Client.objects.filter(status='active')
+        rows = queryset.order_by('id').values(*CLIENT_FIELDS).iterator(chunk_size=chunk_size)
+
+        through = Client.eligible_bank_products.through
+        totals = {'clients': 0, 'matches': 0}
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                BankMatchService._write_chunk(catalogue, chunk, through, totals)
+                chunk = []
+        if chunk:
+            BankMatchService._write_chunk(catalogue, chunk, through, totals)
+        return totals
+
+    @staticmethod
+    @transaction.atomic
+    def _write_chunk(catalogue, rows: list, through, totals: dict):
+        features = ClientFeatures.from_rows(rows)
+        result = catalogue.match(features)
+        client_index, product_index = result.eligible.nonzero()
+
+        through.objects.filter(client_id__in=features.ids.tolist()).delete()
+        through.objects.bulk_create([
+            through(client_id=int(features.ids[c]), bankproduct_id=int(catalogue.ids[p]))
+            for c, p in zip(client_index, product_index)
+        ], batch_size=5000)
+
+        totals['clients'] += len(features)
+        totals['matches'] += len(client_index)
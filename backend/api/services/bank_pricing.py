@@ -0,0 +1,100 @@
+"""
+Bank Pricing Service
+
+Keeps the stored rate fields of EIBOR-linked bank products (eibor_rate,
+interest_rate, follow_on_rate) in line with the EiborRate table.
+
+New or deleted EiborRate rows queue a re-price of every product on the
+affected tenor (a 'bank_products.reprice' job, one per tenor while queued). Rates are derived by core.mortgage from
+the 'eibor_snapshot' reference dataset (floors and follow-on rules
+included), changed products are written with one bulk_update and the
+product caches are invalidated.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from core.cache import reference_cache
+from core.jobs import enqueue
+from core.models import BankProduct, EiborRate
+from core.mortgage import EIBOR_TERMS, effective_rates
+
+PRICED_FIELDS = ['eibor_rate', 'interest_rate', 'follow_on_rate']
+
+# Reference datasets holding product rates
+PRODUCT_DATASETS = ['bank_products', 'bank_catalogue']
+
+RATE_PLACES = Decimal('0.001')
+
+
+class BankPricingService:
+    """Service for re-pricing bank products from EIBOR"""
+
+    @staticmethod
+    def reprice(queryset=None, terms: list = None, eibor: dict = None) -> dict:
+        """
+        Re-derive stored rates from the latest EIBOR fixings.
+
+        Args:
+            queryset: Products to re-price (default: all products)
+            terms: Only re-price products on these EiborRate terms ('3_months', ...)
+            eibor: EIBOR snapshot (default: the cached 'eibor_snapshot')
+
+        Returns:
+            {'products': number priced, 'updated': number whose rates changed}
+        """
+        eibor = eibor or reference_cache.get('eibor_snapshot')
+        if queryset is None:
+            queryset = BankProduct.objects.all()
+        if terms is not None:
+            queryset = queryset.filter(
+                eibor_type__in=[eibor_type for eibor_type, term in EIBOR_TERMS.items() if term in terms]
+            )
+
+        now = timezone.now()
+        report = {'products': 0, 'updated': 0}
+        changed = []
+        for product in queryset.order_by('id'):
+            rates = effective_rates(product, eibor)
+            if not rates:
+                continue
+            report['products'] += 1
+
+            values = {field: Decimal(str(rate)).quantize(RATE_PLACES) for field, rate in rates.items()}
+            if all(getattr(product, field) == value for field, value in values.items()):
+                continue
+            for field, value in values.items():
+                setattr(product, field, value)
+            # Moves the product's mortgage memo keys along with its rates
+            product.updated_at = now
+            changed.append(product)
+
+        if changed:
+            with transaction.atomic():
+                BankProduct.objects.bulk_update(changed, [*PRICED_FIELDS, 'updated_at'], batch_size=500)
+            # bulk_update sends no signals
+            for name in PRODUCT_DATASETS:
+                reference_cache.invalidate(name)
+        report['updated'] = len(changed)
+        return report
+
+    @staticmethod
+    def reprice_product(product: BankProduct):
+        """Price one product after it is created or edited, refreshing the instance"""
+        if BankPricingService.reprice(BankProduct.objects.filter(id=product.id))['updated']:
+            product.refresh_from_db(fields=[*PRICED_FIELDS, 'updated_at'])
+
+    @staticmethod
+    def connect_signals():
+        """Re-price on EiborRate writes (call from AppConfig.ready)"""
+        post_save.connect(_on_rate_change, sender=EiborRate, dispatch_uid='bank-pricing-save')
+        post_delete.connect(_on_rate_change, sender=EiborRate, dispatch_uid='bank-pricing-delete')
+
+
+def _on_rate_change(sender, instance, **kwargs):
+    # The job row commits with the rate, so workers never see one without the other
+    enqueue('bank_products.reprice', {'terms': [instance.term]},
+            idempotency_key=f'bank_products.reprice:{instance.term}')
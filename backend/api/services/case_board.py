@@ -0,0 +1,138 @@
+"""
+Case Board Service
+
+Data for the cases kanban board. Column headers come from one GROUP BY
+over the filtered cases; the first cards of every column come from one
+ROW_NUMBER() window query partitioned by stage. Cards are flat value
+rows - the bank name and icon of a case's first bank product are looked
+up in the cached 'bank_products' dataset instead of being prefetched.
+
+Columns load further cards on their own, keyset-paginated over
+(created_at, id) like the cases list.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Window
+from django.db.models.functions import RowNumber
+
+from api.pagination import KeysetPagination
+from core.cache import reference_cache
+from core.models import Case
+
+# Case fields a board card needs
+CARD_FIELDS = [
+    'id', 'case_id', 'stage', 'loan_amount', 'bank_name', 'created_at',
+    'client_id', 'client__first_name', 'client__last_name',
+]
+
+
+class CaseBoardService:
+    """Service for the cases kanban board"""
+
+    @staticmethod
+    def columns(queryset, stages: list, limit: int) -> list:
+        """
+        Every column of the board with its first cards.
+
+        Args:
+            queryset: Filtered Case queryset
+            stages: Stages to return columns for, in board order
+            limit: Cards per column
+
+        Returns:
+            [{'stage', 'count', 'loan_amount', 'cards'}] in the order of stages
+        """
+        queryset = queryset.filter(stage__in=stages).order_by()
+
+        totals = {
+            row['stage']: row
+            for row in queryset.values('stage').annotate(count=Count('id'), loan_amount=Sum('loan_amount'))
+        }
+
+        ranked = queryset.annotate(
+            board_rank=Window(
+                RowNumber(),
+                partition_by=[F('stage')],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            )
+        ).filter(board_rank__lte=limit).order_by('stage', 'board_rank')
+        cards = defaultdict(list)
+        for card in CaseBoardService._cards(ranked):
+            cards[card['stage']].append(card)
+
+        return [
+            {
+                'stage': stage,
+                'count': totals.get(stage, {}).get('count', 0),
+                'loan_amount': totals.get(stage, {}).get('loan_amount') or 0,
+                'cards': cards[stage],
+            }
+            for stage in stages
+        ]
+
+    @staticmethod
+    def column_page(queryset, limit: int, after: tuple = None):
+        """
+        Next cards of one column, newest first.
+
+        Args:
+            queryset: Case queryset filtered to one stage
+            limit: Cards to return
+            after: Decoded (created_at, id) cursor of the last card shown
+
+        Returns:
+            (cards, has_more)
+        """
+        queryset = queryset.order_by('-created_at', '-id')
+        if after is not None:
+            queryset = KeysetPagination.filter_after(queryset, after)
+        # One extra row tells whether the column has more cards
+        cards = CaseBoardService._cards(queryset[:limit + 1])
+        return cards[:limit], len(cards) > limit
+
+    @staticmethod
+    def _cards(queryset) -> list:
+        """Card dicts for a Case queryset (one query, plus the cached products)"""
+        through = Case.bank_products.through
+        first_product = (
+            through.objects
+            .filter(case_id=OuterRef('pk'))
+            .order_by('bankproduct__bank_name', 'bankproduct__type_of_mortgage')
+            .values('bankproduct_id')[:1]
+        )
+        rows = list(queryset.annotate(first_product_id=Subquery(first_product)).values(
+            *CARD_FIELDS, 'first_product_id',
+        ))
+        if not rows:
+            return []
+
+        products = {}
+        if any(row['first_product_id'] for row in rows):
+            products = {product.id: product for product in reference_cache.get('bank_products')}
+        cards = []
+        for row in rows:
+            product = products.get(row['first_product_id'])
+            bank_name = row['bank_name'] or (product.bank_name if product else None)
+            # Same fallbacks as CaseListSerializer.get_bankName/get_bankIcon
+            if product is not None:
+                bank_icon = product.bank_icon
+            elif row['bank_name']:
+                bank_icon = reference_cache.get('bank_icons').get(row['bank_name'])
+            else:
+                bank_icon = None
+            cards.append({
+                'id': row['id'],
+                'case_id': row['case_id'],
+                'stage': row['stage'],
+                'loan_amount': row['loan_amount'],
+                'created_at': row['created_at'],
+                'bank_name': bank_name,
+                'bank_icon': bank_icon,
+                'client': {
+                    'id': row['client_id'],
+                    'first_name': row['client__first_name'],
+                    'last_name': row['client__last_name'],
+                },
+            })
+        return cards
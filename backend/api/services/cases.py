@@ -182,18 +182,17 @@ class CaseService:
         Returns:
             Created CallLog instance
         """
-        case = Case.objects.select_for_update().get(id=case_id)
+        # Bump updated_at first (single-column UPDATE) - also checks the case exists
+        if not Case.touch_pk(case_id):
+            raise Case.DoesNotExist(f'Case {case_id} does not exist')
 
         call_log = CallLog.objects.create(
             entity_type='case',
-            entity_id=case.id,
+            entity_id=case_id,
             outcome=outcome,
             notes=notes
         )
 
-        # Update entity's updated_at
-        case.save()
-
         return call_log
 
     @staticmethod
@@ -209,15 +208,14 @@ class CaseService:
         Returns:
             Created Note instance
         """
-        case = Case.objects.select_for_update().get(id=case_id)
+        # Bump updated_at first (single-column UPDATE) - also checks the case exists
+        if not Case.touch_pk(case_id):
+            raise Case.DoesNotExist(f'Case {case_id} does not exist')
 
         note = Note.objects.create(
             entity_type='case',
-            entity_id=case.id,
+            entity_id=case_id,
             content=content
         )
 
-        # Update entity's updated_at
-        case.save()
-
         return note
@@ -12,8 +12,9 @@ Every service function:
 
 from decimal import Decimal
 from django.db import transaction
-from core.models import Client, Document, Case, BankForm, BankProduct, ClientStatusChange, CaseStageChange, CallLog, Note
+from core.models import Client, Case, BankProduct, ClientStatusChange, CaseStageChange, CallLog, Note
 from core.exceptions import InvalidStateError
+from .placeholders import PlaceholderService
 
 
 class ClientService:
@@ -171,13 +172,8 @@ class ClientService:
             bank_products = BankProduct.objects.filter(id__in=bank_product_ids[:3])
             case.bank_products.set(bank_products)
 
-        # Create default bank form placeholders
-        for form_type in BankForm.DEFAULT_TYPES:
-            BankForm.objects.create(
-                case=case,
-                type=form_type,
-                status='missing'
-            )
+        # Create default bank form placeholders (single INSERT)
+        PlaceholderService.create_bank_forms(case)
 
         # Create initial stage change record
         CaseStageChange.objects.create(
@@ -203,7 +199,7 @@ class ClientService:
         )
 
         # Touch updated_at
-        client.save()
+        client.touch()
 
         return client, case
 
@@ -221,18 +217,17 @@ class ClientService:
         Returns:
             Created CallLog instance
         """
-        client = Client.objects.select_for_update().get(id=client_id)
+        # Bump updated_at first (single-column UPDATE) - also checks the client exists
+        if not Client.touch_pk(client_id):
+            raise Client.DoesNotExist(f'Client {client_id} does not exist')
 
         call_log = CallLog.objects.create(
             entity_type='client',
-            entity_id=client.id,
+            entity_id=client_id,
             outcome=outcome,
             notes=notes
         )
 
-        # Update entity's updated_at
-        client.save()
-
         return call_log
 
     @staticmethod
@@ -248,15 +243,14 @@ class ClientService:
         Returns:
             Created Note instance
         """
-        client = Client.objects.select_for_update().get(id=client_id)
+        # Bump updated_at first (single-column UPDATE) - also checks the client exists
+        if not Client.touch_pk(client_id):
+            raise Client.DoesNotExist(f'Client {client_id} does not exist')
 
         note = Note.objects.create(
             entity_type='client',
-            entity_id=client.id,
+            entity_id=client_id,
             content=content
         )
 
-        # Update entity's updated_at
-        client.save()
-
         return note
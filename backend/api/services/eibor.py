@@ -0,0 +1,85 @@
+"""
+EIBOR Service
+
+Latest rates come from the 'eibor_snapshot' reference dataset, which is
+invalidated on EiborRate writes, so reads make no queries. Historical
+ranges are downsampled server-side for charts.
+"""
+
+from collections import OrderedDict
+from datetime import timedelta
+
+from core.cache import reference_cache
+from core.models import EiborRate
+
+# EiborRate.term -> API field name
+TERM_FIELDS = OrderedDict([
+    ('overnight', 'overnight'),
+    ('1_week', 'oneWeek'),
+    ('1_month', 'oneMonth'),
+    ('3_months', 'threeMonths'),
+    ('6_months', 'sixMonths'),
+    ('1_year', 'oneYear'),
+])
+
+INTERVALS = ['daily', 'weekly', 'monthly']
+
+
+def bucket_start(day, interval: str):
+    """First day of the bucket a date falls in (weeks start on Monday)"""
+    if interval == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if interval == 'monthly':
+        return day.replace(day=1)
+    return day
+
+
+class EiborService:
+    """Service for EIBOR rates"""
+
+    @staticmethod
+    def latest() -> dict:
+        """Latest rate of every term, from the cached snapshot"""
+        snapshot = reference_cache.get('eibor_snapshot')
+        latest = {field: snapshot['rates'].get(term) for term, field in TERM_FIELDS.items()}
+        latest['lastUpdated'] = snapshot['date'].isoformat() if snapshot['date'] else None
+        return latest
+
+    @staticmethod
+    def series(terms: list = None, start=None, end=None, interval: str = 'daily') -> dict:
+        """
+        Rates over a date range, one point per term and bucket.
+
+        Args:
+            terms: EiborRate terms to include (default: all)
+            start: First date (inclusive), optional
+            end: Last date (inclusive), optional
+            interval: 'daily', 'weekly' or 'monthly'
+
+        Returns:
+            {'interval', 'series': {term: [{'date', 'rate', 'open', 'min', 'max', 'samples'}]}}
+            where date is the bucket start and rate is the bucket's last fixing
+        """
+        queryset = EiborRate.objects.order_by('term', 'date')
+        if terms:
+            queryset = queryset.filter(term__in=terms)
+        if start:
+            queryset = queryset.filter(date__gte=start)
+        if end:
+            queryset = queryset.filter(date__lte=end)
+
+        series = {}
+        for term, day, rate in queryset.values_list('term', 'date', 'rate').iterator():
+            points = series.setdefault(term, [])
+            bucket = bucket_start(day, interval)
+            rate = float(rate)
+            if points and points[-1]['date'] == bucket:
+                point = points[-1]
+                point['rate'] = rate
+                point['min'] = min(point['min'], rate)
+                point['max'] = max(point['max'], rate)
+                point['samples'] += 1
+            else:
+                points.append({'date': bucket, 'rate': rate, 'open': rate, 'min': rate, 'max': rate, 'samples': 1})
+
+        return {'interval': interval, 'series': series}
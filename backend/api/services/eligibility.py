@@ -0,0 +1,91 @@
+"""
+Eligibility Service
+
+Recalculates Client eligibility for the whole book after a policy change.
+Clients are streamed in chunks of .values() rows, evaluated with the
+vectorized EligibilityPolicy and only rows whose stored values differ are
+written back with bulk_update.
+"""
+
+from collections import Counter
+
+import numpy as np
+from django.db import transaction
+
+from core.eligibility import EligibilityPolicy, to_decimal, to_float
+from core.models import Client
+
+RECALCULATE_CHUNK_SIZE = 5000
+
+ELIGIBILITY_FIELDS = ['estimated_dbr', 'estimated_ltv', 'max_loan_amount', 'eligibility_status']
+INPUT_FIELDS = ['monthly_salary', 'monthly_liabilities', 'loan_amount', 'estimated_property_value', 'residency_status']
+
+
+class EligibilityService:
+    """Service for bulk eligibility recalculation"""
+
+    @staticmethod
+    def recalculate(queryset=None, policy: EligibilityPolicy = None,
+                    chunk_size: int = RECALCULATE_CHUNK_SIZE, dry_run: bool = False) -> dict:
+        """
+        Recompute DBR, LTV, max loan and eligibility status.
+
+        Args:
+            queryset: Clients to recalculate (default: all clients)
+            policy: Thresholds to apply (default: settings.ELIGIBILITY_POLICY)
+            chunk_size: Clients read, evaluated and written per chunk
+            dry_run: Compute the report without writing
+
+        Returns:
+            {'clients', 'updated', 'statusChanges': {'eligible->notEligible': n, ...}, 'policy'}
+        """
+        policy = policy or EligibilityPolicy.from_settings()
+        if queryset is None:
+            queryset = Client.objects.all()
+        rows = queryset.order_by('id').values('id', *INPUT_FIELDS, *ELIGIBILITY_FIELDS).iterator(chunk_size=chunk_size)
+
+        report = {'clients': 0, 'updated': 0, 'statusChanges': Counter()}
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                EligibilityService._process_chunk(chunk, policy, dry_run, report)
+                chunk = []
+        if chunk:
+            EligibilityService._process_chunk(chunk, policy, dry_run, report)
+
+        report['statusChanges'] = dict(report['statusChanges'])
+        report['policy'] = policy.as_dict()
+        return report
+
+    @staticmethod
+    def _process_chunk(rows: list, policy: EligibilityPolicy, dry_run: bool, report: dict):
+        result = policy.evaluate(
+            np.array([to_float(row['monthly_salary']) for row in rows]),
+            np.array([to_float(row['monthly_liabilities']) for row in rows]),
+            np.array([to_float(row['loan_amount']) for row in rows]),
+            np.array([to_float(row['estimated_property_value']) for row in rows]),
+            np.array([row['residency_status'] == 'citizen' for row in rows]),
+        )
+
+        changed = []
+        for index, row in enumerate(rows):
+            values = {
+                'estimated_dbr': to_decimal(result['dbr'][index]),
+                'estimated_ltv': to_decimal(result['ltv'][index]),
+                # Unknown salary keeps the stored estimate, as Client.calculate_eligibility does
+                'max_loan_amount': to_decimal(result['max_loan'][index]) if not np.isnan(result['max_loan'][index])
+                else row['max_loan_amount'],
+                'eligibility_status': 'eligible' if result['eligible'][index] else 'notEligible',
+            }
+            if all(values[field] == row[field] for field in ELIGIBILITY_FIELDS):
+                continue
+            if values['eligibility_status'] != row['eligibility_status']:
+                report['statusChanges'][f"{row['eligibility_status']}->{values['eligibility_status']}"] += 1
+            changed.append(Client(id=row['id'], **values))
+
+        report['clients'] += len(rows)
+        report['updated'] += len(changed)
+        if changed and not dry_run:
+            with transaction.atomic():
+                Client.objects.bulk_update(changed, ELIGIBILITY_FIELDS, batch_size=1000)
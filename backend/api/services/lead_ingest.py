@@ -0,0 +1,147 @@
+"""
+Lead Ingest Service
+
+Bulk lead ingestion for channel partners and marketing feeds.
+Rows arrive validated (LeadIngestRowSerializer), sub-sources are resolved from the cached
+reference data, duplicates are detected by normalized phone (within the
+batch and against existing leads) and accepted rows are written with
+bulk_create, one transaction per chunk.
+"""
+
+from django.db import transaction
+
+from core.cache import reference_cache
+from core.models import Lead, normalize_phone
+
+INGEST_CHUNK_SIZE = 1000
+
+# Sub-sources that no longer accept new leads (see SubSource.STATUS_CHOICES)
+BLOCKED_SUB_SOURCE_STATUSES = {'paused', 'inactive'}
+
+
+class LeadIngestService:
+    """Service for bulk lead ingestion."""
+
+    @staticmethod
+    def ingest(rows: list, row_errors: dict = None, dedupe: bool = True,
+               chunk_size: int = INGEST_CHUNK_SIZE) -> dict:
+        """
+        Create leads in bulk.
+
+        Args:
+            rows: Validated row dicts (LeadIngestRowSerializer.validated_data),
+                None for rows that failed validation
+            row_errors: Validation errors keyed by row index
+            dedupe: Skip rows whose phone matches an existing lead or an
+                earlier row of the same batch
+            chunk_size: Rows per INSERT/transaction
+
+        Returns:
+            Report dict with totals and one result per input row:
+            {'row', 'status': 'created'|'duplicate'|'error', 'id'?, 'errors'?}
+        """
+        sub_sources_by_id, sub_sources_by_name = LeadIngestService._sub_source_maps()
+
+        row_errors = row_errors or {}
+        results = [None] * len(rows)
+        pending = []  # (row index, Lead)
+        for index, data in enumerate(rows):
+            if index in row_errors:
+                results[index] = {'row': index, 'status': 'error', 'errors': row_errors[index]}
+                continue
+
+            sub_source, source_error = LeadIngestService._resolve_sub_source(
+                data, sub_sources_by_id, sub_sources_by_name
+            )
+            if source_error:
+                results[index] = {'row': index, 'status': 'error', 'errors': {'source': [source_error]}}
+                continue
+
+            phone_digits = normalize_phone(data['phone'])
+            if not phone_digits:
+                results[index] = {'row': index, 'status': 'error', 'errors': {'phone': ['Phone has no digits.']}}
+                continue
+
+            pending.append((index, Lead(
+                first_name=data['firstName'],
+                last_name=data.get('lastName', ''),
+                email=data.get('email') or None,
+                phone=data['phone'],
+                phone_digits=phone_digits,
+                source=sub_source,
+                intent=data.get('intent', ''),
+                transcript=data.get('transcript'),
+            )))
+
+        for offset in range(0, len(pending), chunk_size):
+            LeadIngestService._write_chunk(pending[offset:offset + chunk_size], results, dedupe)
+
+        return {
+            'received': len(rows),
+            'created': sum(1 for result in results if result['status'] == 'created'),
+            'duplicates': sum(1 for result in results if result['status'] == 'duplicate'),
+            'errors': sum(1 for result in results if result['status'] == 'error'),
+            'results': results,
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def _write_chunk(chunk: list, results: list, dedupe: bool):
+        to_create = []
+        if dedupe:
+            digits = {lead.phone_digits for _, lead in chunk}
+            seen = dict(
+                Lead.objects.filter(phone_digits__in=digits).order_by().values_list('phone_digits', 'id')
+            )
+            for index, lead in chunk:
+                existing_id = seen.get(lead.phone_digits)
+                if existing_id is not None:
+                    results[index] = {'row': index, 'status': 'duplicate', 'id': existing_id}
+                    continue
+                # Later rows in the batch with the same phone become duplicates of this one
+                seen[lead.phone_digits] = lead
+                to_create.append((index, lead))
+        else:
+            to_create = chunk
+
+        Lead.objects.bulk_create([lead for _, lead in to_create])
+        for index, lead in to_create:
+            results[index] = {'row': index, 'status': 'created', 'id': lead.id}
+
+        # In-batch duplicates point at the lead created from the earlier row
+        for index, _ in chunk:
+            if isinstance(results[index]['id'], Lead):
+                results[index]['id'] = results[index]['id'].id
+
+    @staticmethod
+    def _sub_source_maps():
+        """SubSource lookups by id and by (case-insensitive) name, from the reference cache"""
+        by_id = {}
+        by_name = {}
+        for sub_source in reference_cache.get('sub_sources'):
+            by_id[sub_source.id] = sub_source
+            by_name.setdefault(sub_source.name.strip().lower(), []).append(sub_source)
+        return by_id, by_name
+
+    @staticmethod
+    def _resolve_sub_source(data: dict, by_id: dict, by_name: dict):
+        """Returns (SubSource or None, error message or None)"""
+        source_id = data.get('sourceId')
+        name = (data.get('source') or '').strip()
+        if source_id:
+            sub_source = by_id.get(source_id)
+            if sub_source is None:
+                return None, f'Unknown sub-source id "{source_id}".'
+        elif name:
+            matches = by_name.get(name.lower(), [])
+            if not matches:
+                return None, f'Unknown sub-source "{name}".'
+            if len(matches) > 1:
+                return None, f'Sub-source name "{name}" is ambiguous, send sourceId instead.'
+            sub_source = matches[0]
+        else:
+            return None, None
+
+        if sub_source.status in BLOCKED_SUB_SOURCE_STATUSES:
+            return None, f'Sub-source "{sub_source.name}" is {sub_source.status} and not accepting leads.'
+        return sub_source, None
@@ -11,8 +11,9 @@ Every service function:
 """
 
 from django.db import transaction
-from core.models import Lead, Client, Document, LeadStatusChange, ClientStatusChange, CallLog, Note
+from core.models import Lead, Client, LeadStatusChange, ClientStatusChange, CallLog, Note
 from core.exceptions import InvalidStateError, ConversionError
+from .placeholders import PlaceholderService
 
 
 class LeadService:
@@ -86,13 +87,8 @@ class LeadService:
             status='active'
         )
 
-        # Create default document placeholders
-        for doc_type in Document.DEFAULT_TYPES:
-            Document.objects.create(
-                client=client,
-                type=doc_type,
-                status='missing'
-            )
+        # Create default document placeholders (single INSERT)
+        PlaceholderService.create_documents(client)
 
         # Update lead status
         lead.status = 'converted'
@@ -128,18 +124,17 @@ class LeadService:
         Returns:
             Created CallLog instance
         """
-        lead = Lead.objects.select_for_update().get(id=lead_id)
+        # Bump updated_at first (single-column UPDATE) - also checks the lead exists
+        if not Lead.touch_pk(lead_id):
+            raise Lead.DoesNotExist(f'Lead {lead_id} does not exist')
 
         call_log = CallLog.objects.create(
             entity_type='lead',
-            entity_id=lead.id,
+            entity_id=lead_id,
             outcome=outcome,
             notes=notes
         )
 
-        # Update entity's updated_at
-        lead.save()
-
         return call_log
 
     @staticmethod
@@ -155,15 +150,14 @@ class LeadService:
         Returns:
             Created Note instance
         """
-        lead = Lead.objects.select_for_update().get(id=lead_id)
+        # Bump updated_at first (single-column UPDATE) - also checks the lead exists
+        if not Lead.touch_pk(lead_id):
+            raise Lead.DoesNotExist(f'Lead {lead_id} does not exist')
 
         note = Note.objects.create(
             entity_type='lead',
-            entity_id=lead.id,
+            entity_id=lead_id,
             content=content
         )
 
-        # Update entity's updated_at
-        lead.save()
-
         return note
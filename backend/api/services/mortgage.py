@@ -0,0 +1,96 @@
+"""
+Mortgage Service
+
+Payment, total cost and amortization quotes for bank products. Products
+and the EIBOR snapshot come from the reference cache and results are
+memoized in core.mortgage, so repeated comparisons make no queries.
+"""
+
+from core.cache import reference_cache
+from core.exceptions import NotFoundError
+from core.mortgage import Quote, compare_products, product_schedule
+
+
+class MortgageService:
+    """Service for mortgage payment and cost calculations"""
+
+    @staticmethod
+    def get_quote(loan_amount, term_years: int, property_value=None) -> Quote:
+        return Quote(
+            loan_amount,
+            term_months=term_years * 12,
+            property_value=property_value,
+            eibor=reference_cache.get('eibor_snapshot'),
+        )
+
+    @staticmethod
+    def compare(loan_amount, term_years: int, property_value=None, product_ids: list = None) -> dict:
+        """
+        Compare monthly payments and total cost across active products.
+
+        Args:
+            loan_amount: Principal
+            term_years: Mortgage term
+            property_value: Enables property insurance costs
+            product_ids: Restrict to these products (default: all active)
+
+        Returns:
+            {'eiborDate', 'products': [summary, ...]} cheapest total cost first
+        """
+        quote = MortgageService.get_quote(loan_amount, term_years, property_value)
+        products = [product for product in reference_cache.get('bank_products') if product.is_active]
+        if product_ids:
+            wanted = set(product_ids)
+            products = [product for product in products if product.id in wanted]
+
+        return {
+            'eiborDate': quote.eibor['date'],
+            'products': compare_products(products, quote),
+        }
+
+    @staticmethod
+    def schedule(product_id: int, loan_amount, term_years: int, property_value=None,
+                 granularity: str = 'monthly') -> dict:
+        """
+        Amortization schedule for one product.
+
+        Args:
+            product_id: BankProduct ID
+            loan_amount: Principal
+            term_years: Mortgage term
+            property_value: Enables property insurance costs
+            granularity: 'monthly' or 'yearly' (months summed per year)
+
+        Returns:
+            {'eiborDate', 'summary', 'schedule': [...]}
+
+        Raises:
+            NotFoundError: If the product doesn't exist
+        """
+        product = next((p for p in reference_cache.get('bank_products') if p.id == product_id), None)
+        if product is None:
+            raise NotFoundError('Bank product not found')
+
+        quote = MortgageService.get_quote(loan_amount, term_years, property_value)
+        result = product_schedule(product, quote)
+
+        rows = result['months']
+        if granularity == 'yearly':
+            rows = MortgageService._yearly(rows)
+        return {'eiborDate': quote.eibor['date'], 'summary': result['summary'], 'schedule': rows}
+
+    @staticmethod
+    def _yearly(months: list) -> list:
+        years = []
+        for start in range(0, len(months), 12):
+            block = months[start:start + 12]
+            years.append({
+                'year': start // 12 + 1,
+                'rate': block[-1]['rate'],
+                'payment': round(sum(row['payment'] for row in block), 2),
+                'interest': round(sum(row['interest'] for row in block), 2),
+                'principal': round(sum(row['principal'] for row in block), 2),
+                'insurance': round(sum(row['insurance'] for row in block), 2),
+                'balance': block[-1]['balance'],
+            })
+        return years
@@ -0,0 +1,44 @@
+"""
+Placeholder Service
+
+Creates the default "missing" document and bank form rows that the UI
+shows as upload slots. Each set is written with a single bulk INSERT.
+"""
+
+from core.models import BankForm, Client, Case, Document
+
+
+class PlaceholderService:
+    """Service for provisioning document and bank form placeholders."""
+
+    @staticmethod
+    def create_documents(client: Client) -> list[Document]:
+        """
+        Create one missing Document per default type for a new client.
+
+        Args:
+            client: The newly created client
+
+        Returns:
+            Created Document instances
+        """
+        return Document.objects.bulk_create([
+            Document(client=client, type=doc_type, status='missing')
+            for doc_type in Document.DEFAULT_TYPES
+        ])
+
+    @staticmethod
+    def create_bank_forms(case: Case) -> list[BankForm]:
+        """
+        Create one missing BankForm per default type for a new case.
+
+        Args:
+            case: The newly created case
+
+        Returns:
+            Created BankForm instances
+        """
+        return BankForm.objects.bulk_create([
+            BankForm(case=case, type=form_type, status='missing')
+            for form_type in BankForm.DEFAULT_TYPES
+        ])
@@ -0,0 +1,86 @@
+"""
+WhatsApp Service
+
+Business logic for WhatsApp messaging.
+Every message write also maintains the WhatsAppConversation summary
+in the same transaction, so the inbox never has to scan messages.
+"""
+
+from django.db import transaction, IntegrityError
+from django.db.models import F
+from core.models import WhatsAppMessage, WhatsAppConversation, Lead, Client
+
+
+class WhatsAppService:
+    """Service for WhatsApp message business logic."""
+
+    @staticmethod
+    @transaction.atomic
+    def record_message(
+        direction: str,
+        content: str,
+        status: str,
+        lead: Lead = None,
+        client: Client = None
+    ) -> WhatsAppMessage:
+        """
+        Store a message and update its conversation summary.
+
+        Args:
+            direction: 'inbound' or 'outbound'
+            content: Message text
+            status: Delivery status of the message
+            lead: Lead the thread belongs to (exclusive with client)
+            client: Client the thread belongs to (exclusive with lead)
+
+        Returns:
+            Created WhatsAppMessage instance
+        """
+        entity = lead or client
+        message = WhatsAppMessage.objects.create(
+            direction=direction,
+            phone=entity.phone,
+            content=content,
+            status=status,
+            lead=lead,
+            client=client,
+        )
+
+        WhatsAppService._update_conversation(message, lead=lead, client=client)
+
+        return message
+
+    @staticmethod
+    def _update_conversation(message: WhatsAppMessage, lead: Lead = None, client: Client = None):
+        """Upsert the conversation row - one UPDATE in the common case"""
+        lookup = {'lead': lead} if lead else {'client': client}
+        inbound = message.direction == 'inbound'
+        summary = {
+            'last_message_preview': WhatsAppConversation.build_preview(message.content),
+            'last_message_direction': message.direction,
+            'last_message_at': message.created_at,
+        }
+
+        # Inbound messages add to the unread counter, replying clears it
+        unread = F('unread_count') + 1 if inbound else 0
+        updated = WhatsAppConversation.objects.filter(**lookup).update(unread_count=unread, **summary)
+        if updated:
+            return
+
+        try:
+            with transaction.atomic():
+                WhatsAppConversation.objects.create(
+                    entity_type='lead' if lead else 'client',
+                    unread_count=1 if inbound else 0,
+                    **lookup,
+                    **summary
+                )
+        except IntegrityError:
+            # A concurrent first message created the row - apply ours on top
+            WhatsAppConversation.objects.filter(**lookup).update(unread_count=unread, **summary)
+
+    @staticmethod
+    def mark_read(lead_id: int = None, client_id: int = None) -> None:
+        """Reset the unread counter for a thread (no-op when already read)"""
+        lookup = {'lead_id': lead_id} if lead_id else {'client_id': client_id}
+        WhatsAppConversation.objects.filter(unread_count__gt=0, **lookup).update(unread_count=0)
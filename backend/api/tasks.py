@@ -0,0 +1,32 @@
+"""
+Background job handlers (see core.jobs)
+
+Registered when the api app is ready, so both web processes (which
+enqueue) and run_jobs workers (which run) know every job name.
+"""
+
+from core.cache import reference_cache
+from core.jobs import register
+from core.models import BankProduct
+from core.storage import get_storage
+from api.services import AnalyticsService, BankPricingService
+
+
+@register('storage.delete_file')
+def delete_file(file_url: str):
+    """Remove a replaced or deleted document from storage"""
+    get_storage().delete_file(file_url)
+
+
+@register('bank_products.reprice')
+def reprice_bank_products(terms: list = None):
+    """Re-price EIBOR-linked products after new fixings"""
+    # This process's cached snapshot may predate the new fixing
+    reference_cache.invalidate('eibor_snapshot')
+    BankPricingService.reprice(BankProduct.objects.all(), terms=terms)
+
+
+@register('analytics.refresh')
+def refresh_analytics():
+    """Fold new rows into the analytics rollups and daily metrics"""
+    AnalyticsService.refresh()
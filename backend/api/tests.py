@@ -1,3 +1,985 @@
-from django.test import TestCase
+"""
+API query budget tests
 
-# Create your tests here.
+List endpoints must make a constant number of queries regardless of page
+size - these fail on N+1 regressions. Budgets live in PERF_QUERY_BUDGETS.
+"""
+
+import csv
+import io
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import MagicMock, PropertyMock, patch
+
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.cache import ReferenceCache, reference_cache
+from core.models import (
+    BankForm, BankProduct, CallLog, Case, CaseStageChange, Channel, Client, ClientStatusChange,
+    Document, EiborRate, Lead, LeadStatusChange, Note, Source, SubSource, User, WhatsAppConversation,
+)
+from core.testing import APIClientMixin, APIClientTestCase, QueryBudgetMixin
+from core.eligibility import EligibilityPolicy
+from core.jobs import Worker, enqueue, register, run_pending
+from core.sequences import create_sequence, drop_sequence, next_value
+from core.storage import LocalStorage, MemoryStorage, SupabaseStorage, get_storage, reset_storage
+from core.uploads import UploadPipeline, get_upload_pipeline, reset_upload_pipeline
+from api.search import CASE_SEARCH, LEAD_SEARCH, apply_search
+from api.services import (
+    AnalyticsService, CaseService, ClientService, EligibilityService, LeadService, PlaceholderService,
+    WhatsAppService,
+)
+
+
+class ListQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        user = User.objects.create(username='agent')
+        token = Token.objects.create(user=user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        BankProduct.objects.create(bank_name='ENBD', bank_icon='https://example.com/enbd.png')
+        channel = Channel.objects.create(id='perf_marketing', name='Performance Marketing')
+        self.sub_source = SubSource.objects.create(source=Source.objects.create(channel=channel, name='Meta'), name='Ads')
+        reference_cache.invalidate_all()
+
+    def create_rows(self, count):
+        start = Lead.objects.count()
+        for i in range(start, start + count):
+            lead = Lead.objects.create(
+                first_name=f'Lead{i}', last_name='Test', phone=f'+971 50 {i:03d} 4567', intent='Buy',
+                source=self.sub_source,
+            )
+            CallLog.objects.create(entity_type='lead', entity_id=lead.id, outcome='busy')
+            Note.objects.create(entity_type='lead', entity_id=lead.id, content='note')
+            LeadStatusChange.objects.create(lead=lead, type='dropped')
+
+            client = Client.objects.create(
+                first_name=f'Client{i}', last_name='Test', phone=f'055{i:04d}',
+                monthly_salary=Decimal('30000'), converted_from_lead=lead, source=self.sub_source,
+            )
+            Document.objects.create(client=client, type='passport', status='missing')
+            CallLog.objects.create(entity_type='client', entity_id=client.id, outcome='connected')
+            ClientStatusChange.objects.create(client=client, type='converted_from_lead')
+
+            case = Case.objects.create(
+                case_id=f'RV-{i:05d}', client=client, case_type='residential', service_type='assisted',
+                application_type='individual', mortgage_type='conventional', emirate='dubai',
+                loan_amount=Decimal('900000'), transaction_type='resale', mortgage_term_years=25,
+                estimated_property_value=Decimal('1500000'), property_status='ready', bank_name='ENBD',
+            )
+            CaseStageChange.objects.create(case=case, to_stage='processing')
+
+            WhatsAppService.record_message('inbound', 'Hello', 'delivered', lead=lead)
+            WhatsAppService.record_message('inbound', 'Hello', 'delivered', client=client)
+
+    def assertListWithinBudget(self, view_tag, url):
+        for count in (2, 10):
+            self.create_rows(count - Lead.objects.count())
+            with self.subTest(rows=count), self.assertQueryBudget(view_tag):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_leads_list(self):
+        self.assertListWithinBudget('LeadViewSet.list', '/api/leads/')
+
+    def test_leads_compact_list(self):
+        self.assertListWithinBudget('LeadViewSet.list', '/api/leads/?view=compact')
+
+    def test_clients_list(self):
+        self.assertListWithinBudget('ClientViewSet.list', '/api/clients/')
+
+    def test_cases_list(self):
+        self.assertListWithinBudget('CaseViewSet.list', '/api/cases/')
+
+    def test_cases_board(self):
+        self.assertListWithinBudget('CaseViewSet.board', '/api/cases/board/?limit=3')
+
+        Case.objects.filter(case_id__in=['RV-00000', 'RV-00001']).update(stage='submitted')
+        columns = self.client.get('/api/cases/board/?limit=3&status=active').json()['columns']
+        self.assertEqual([column['stage'] for column in columns], Case.ACTIVE_STAGES)
+        processing, submitted = columns[0], columns[1]
+        self.assertEqual((processing['count'], processing['loanAmount']), (8, '7200000.00'))
+        self.assertEqual((submitted['count'], len(submitted['cards']), submitted['next']), (2, 2, None))
+        self.assertEqual([card['caseId'] for card in processing['cards']], ['RV-00009', 'RV-00008', 'RV-00007'])
+        self.assertEqual(processing['cards'][0]['bankIcon'], 'https://example.com/enbd.png')
+
+        # The column pages on its own until every card was shown
+        seen = [card['caseId'] for card in processing['cards']]
+        url = processing['next']
+        while url:
+            with self.assertQueryBudget('CaseViewSet.board'):
+                page = self.client.get(url).json()
+            self.assertEqual(page['stage'], 'processing')
+            seen += [card['caseId'] for card in page['cards']]
+            url = page['next']
+        self.assertEqual(seen, [f'RV-{i:05d}' for i in range(9, 1, -1)])
+
+    def test_leads_cursor_pagination(self):
+        self.assertListWithinBudget('LeadViewSet.list', '/api/leads/?pagination=cursor')
+
+        # Rows sharing a created_at are ordered by id, so no page skips or repeats one
+        Lead.objects.update(created_at=timezone.now())
+        seen, url = [], '/api/leads/?pagination=cursor&page_size=3'
+        while url:
+            with self.assertQueryBudget('LeadViewSet.list'):
+                page = self.client.get(url).json()
+            self.assertIsNone(page['count'])
+            seen += [lead['id'] for lead in page['results']]
+            url = page['next']
+            if url:
+                self.assertIn('cursor=', url)
+                self.assertNotIn('pagination=', url)
+        self.assertEqual(seen, sorted(Lead.objects.values_list('id', flat=True), reverse=True))
+
+        self.assertEqual(self.client.get('/api/leads/?cursor=not-a-cursor').status_code, 404)
+        response = self.client.get('/api/leads/?pagination=cursor&search=Lead&search_rank=true')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/leads/?search=Lead&search_rank=true')
+        self.assertEqual(response.status_code, 200)
+
+    def test_whatsapp_conversations(self):
+        self.assertListWithinBudget('whatsapp_conversations', '/api/whatsapp/conversations/')
+
+    def test_whatsapp_mark_read(self):
+        self.create_rows(1)
+        lead = Lead.objects.get()
+        unread = lambda: WhatsAppConversation.objects.get(lead=lead).unread_count
+
+        # Fetching (polling, prefetching) a thread leaves the badge alone
+        self.assertEqual(self.client.get(f'/api/whatsapp/messages/?lead_id={lead.id}').status_code, 200)
+        self.assertEqual(unread(), 1)
+
+        response = self.client.post('/api/whatsapp/mark-read/', {'lead_id': lead.id}, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(unread(), 0)
+        self.assertEqual(WhatsAppConversation.objects.get(client__isnull=False).unread_count, 1)
+
+        response = self.client.post('/api/whatsapp/mark-read/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_lead_ingest(self):
+        for count in (5, 50):
+            rows = [
+                {'firstName': f'Feed{count}-{i}', 'phone': f'+971 55 {count:03d} {i:04d}', 'source': 'ads'}
+                for i in range(count)
+            ]
+            with self.subTest(rows=count), self.assertQueryBudget('LeadViewSet.ingest'):
+                response = self.client.post('/api/leads/ingest/', rows, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()['created'], count)
+
+        response = self.client.post('/api/leads/ingest/', rows[:1], format='json')
+        self.assertEqual(response.json()['results'][0]['status'], 'duplicate')
+
+    def test_export_streams_with_constant_queries(self):
+        for count in (2, 10):
+            self.create_rows(count - Lead.objects.count())
+            for url in ('/api/leads/export/', '/api/clients/export/?output=ndjson', '/api/cases/export/'):
+                with self.subTest(url=url, rows=count), self.assertQueryBudget(budget=2):
+                    response = self.client.get(url)
+                    lines = b''.join(response.streaming_content).decode().strip().splitlines()
+                self.assertEqual(len(lines), count + (0 if 'ndjson' in url else 1))
+
+        response = self.client.get('/api/leads/export/?output=xml')
+        self.assertEqual(response.status_code, 400)
+
+    def test_csv_export_neutralizes_formulas(self):
+        Lead.objects.create(
+            first_name='=HYPERLINK("http://evil")', last_name='@SUM(A1)', email='-2+3@example.com',
+            phone='+971 50 123 4567', intent='Buy',
+        )
+        response = self.client.get('/api/leads/export/')
+        header, row = csv.reader(io.StringIO(b''.join(response.streaming_content).decode()))
+        row = dict(zip(header, row))
+        self.assertEqual(row['firstName'], '\'=HYPERLINK("http://evil")')
+        self.assertEqual(row['lastName'], "'@SUM(A1)")
+        self.assertEqual(row['email'], "'-2+3@example.com")
+        self.assertEqual(row['phone'], "'+971 50 123 4567")
+        self.assertEqual(row['intent'], 'Buy')
+
+        # NDJSON is data, not a spreadsheet - values are exported as-is
+        response = self.client.get('/api/leads/export/?output=ndjson')
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['lastName'], '@SUM(A1)')
+
+    @override_settings(PERF_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        self.create_rows(1)
+        response = self.client.get('/api/leads/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+    @override_settings(PERF_SERVER_TIMING=False)
+    def test_server_timing_header_is_opt_in(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/leads/'))
+
+    def test_streaming_response_reported_after_body(self):
+        self.create_rows(3)
+        with self.assertLogs('rivo.perf', 'INFO') as logs:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/leads/export/')
+                self.assertEqual(logs.records, [])
+                body = b''.join(response.streaming_content)
+        record = logs.records[0].perf
+        self.assertEqual(record['view'], 'LeadViewSet.export')
+        self.assertEqual(record['queries'], len(ctx.captured_queries))
+        self.assertEqual(record['response_bytes'], len(body))
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.ann = Lead.objects.create(first_name='Ann', last_name='Lee', phone='+971 50-123 4567', intent='Buy')
+        self.anna = Lead.objects.create(first_name='Anna', last_name='Roe', phone='0559876543', intent='Buy')
+        self.joanne = Lead.objects.create(first_name='Joanne', last_name='Fox', phone='(04) 555 0000', intent='Buy')
+
+    def search(self, term, spec=LEAD_SEARCH, queryset=None, rank=False):
+        queryset = Lead.objects.order_by('id') if queryset is None else queryset
+        return list(apply_search(queryset, term, spec, rank=rank))
+
+    def test_phone_digits_follow_phone(self):
+        self.assertEqual(self.ann.phone_digits, '971501234567')
+        self.ann.phone = '+44 (20) 7946-0958'
+        self.ann.save(update_fields=['phone'])
+        self.ann.refresh_from_db()
+        self.assertEqual(self.ann.phone_digits, '442079460958')
+
+    def test_phone_terms_ignore_formatting(self):
+        for term in ('50-123', '+971 50 123', '971501234567'):
+            with self.subTest(term=term):
+                self.assertEqual(self.search(term), [self.ann])
+
+    def test_short_digit_terms_match_raw_phone(self):
+        self.assertEqual(self.search('55'), [self.anna, self.joanne])
+        self.assertEqual(self.search('04'), [self.joanne])
+        self.assertEqual(self.search('(0'), [self.joanne])
+
+    def test_text_terms(self):
+        self.assertEqual(self.search('ANN'), [self.ann, self.anna, self.joanne])
+        self.assertEqual(self.search('fox'), [self.joanne])
+        self.assertEqual(self.search('  '), [self.ann, self.anna, self.joanne])
+        self.assertEqual(self.search('nobody'), [])
+
+    def test_case_search_matches_client(self):
+        client = Client.objects.create(first_name='Omar', last_name='Haddad', phone='0501112222')
+        case = Case.objects.create(
+            case_id='RV-00042', client=client, case_type='residential', service_type='assisted',
+            application_type='individual', mortgage_type='conventional', emirate='dubai',
+            loan_amount=Decimal('900000'), transaction_type='resale', mortgage_term_years=25,
+            estimated_property_value=Decimal('1500000'), property_status='ready',
+        )
+        for term in ('rv-000', 'haddad', '050 111'):
+            with self.subTest(term=term):
+                self.assertEqual(self.search(term, CASE_SEARCH, Case.objects.all()), [case])
+
+    def test_rank_orders_exact_then_prefix_then_contains(self):
+        self.assertEqual(self.search('ann', rank=True), [self.ann, self.anna, self.joanne])
+        self.assertEqual(self.search('0559876543', rank=True), [self.anna])
+
+
+@override_settings(REFERENCE_CACHE={'SHARED_CACHE': 'default', 'LOCAL_TTL': 30})
+class ReferenceCacheTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        reference_cache._local = None  # rebuilt from the overridden config
+        reference_cache.reset_stats()
+        # A second worker process, sharing only the shared tier
+        self.other = ReferenceCache()
+        self.other.register('channels', reference_cache._loaders['channels'], models=['core.Channel'])
+        self.channel = Channel.objects.create(id='web', name='Web')
+
+    def tearDown(self):
+        reference_cache._local = None
+
+    def names(self, cache):
+        return [channel.name for channel in cache.get('channels')]
+
+    def test_write_invalidates_both_tiers_after_commit(self):
+        self.assertEqual(self.names(reference_cache), ['Web'])
+        self.assertEqual(self.names(self.other), ['Web'])
+        self.assertEqual(self.other.stats()['channels']['sharedHits'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.channel.name = 'Website'
+            self.channel.save()
+            # Not before commit, or a concurrent read could re-cache the old row
+            self.assertEqual(self.names(reference_cache), ['Web'])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.names(reference_cache), ['Website'])
+        self.assertEqual(reference_cache.stats()['channels']['misses'], 2)
+
+        # The other worker keeps its local copy until LOCAL_TTL, then finds
+        # the new version in the shared tier without touching the database
+        self.assertEqual(self.names(self.other), ['Web'])
+        self.other.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(self.other), ['Website'])
+        self.assertEqual(self.other.stats()['channels']['sharedHits'], 2)
+
+    def test_delete_invalidates_after_commit(self):
+        self.assertEqual(self.names(reference_cache), ['Web'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.channel.delete()
+        self.assertEqual(self.names(reference_cache), [])
+        self.other.local.clear()
+        self.assertEqual(self.names(self.other), [])
+
+
+class SubSourceListTests(APIClientTestCase):
+
+    def setUp(self):
+        super().setUp()
+        channel = Channel.objects.create(id='social', name='Social')
+        self.source = Source.objects.create(channel=channel, name='Meta')
+        SubSource.objects.create(source=self.source, name='Ads')
+        SubSource.objects.create(source=Source.objects.create(channel=channel, name='TikTok'), name='Ads')
+
+    def test_source_id_accepts_any_uuid_form(self):
+        for source_id in (str(self.source.id), self.source.id.hex.upper(), f'{{{self.source.id}}}'):
+            response = self.client.get('/api/sub-sources/', {'source_id': source_id})
+            self.assertEqual([sub['name'] for sub in response.json()], ['Ads'], source_id)
+
+    def test_invalid_source_id_is_400(self):
+        self.assertEqual(self.client.get('/api/sub-sources/', {'source_id': 'meta'}).status_code, 400)
+
+
+class SequenceTests(TransactionTestCase):
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('in-memory SQLite fails concurrent writers instead of making them wait')
+        with connection.schema_editor() as schema_editor:
+            create_sequence(schema_editor, 'tests')
+
+    def tearDown(self):
+        with connection.schema_editor() as schema_editor:
+            drop_sequence(schema_editor, 'tests')
+
+    def test_concurrent_allocations_are_unique_and_gap_free(self):
+        threads, per_thread = 4, 25
+        start = next_value('tests')
+        self.assertEqual(start, 1)
+        barrier = threading.Barrier(threads)
+
+        def allocate():
+            # Each thread gets its own database connection
+            try:
+                barrier.wait()
+                return [next_value('tests') for _ in range(per_thread)]
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(threads) as pool:
+            results = [future.result() for future in [pool.submit(allocate) for _ in range(threads)]]
+
+        for values in results:
+            self.assertEqual(values, sorted(values))
+        allocated = sorted(value for values in results for value in values)
+        self.assertEqual(allocated, list(range(start + 1, start + 1 + threads * per_thread)))
+
+
+class PlaceholderTests(TestCase):
+
+    def setUp(self):
+        self.lead = Lead.objects.create(first_name='Sara', last_name='Ali', phone='0501234567', intent='Buy')
+
+    def assertPlaceholders(self, rows, types):
+        self.assertEqual([row.type for row in rows], types)
+        for row in rows:
+            self.assertIsNotNone(row.pk)
+            self.assertEqual((row.status, row.file_url, row.uploaded_at), ('missing', None, None))
+
+    def test_documents_in_one_insert(self):
+        client = Client.objects.create(first_name='Sara', last_name='Ali', phone='0501234567')
+        with self.assertNumQueries(1):
+            created = PlaceholderService.create_documents(client)
+        self.assertPlaceholders(created, Document.DEFAULT_TYPES)
+        self.assertPlaceholders(client.documents.order_by('id'), Document.DEFAULT_TYPES)
+        self.assertNotIn('other', Document.DEFAULT_TYPES)
+
+    def test_bank_forms_in_one_insert(self):
+        client = Client.objects.create(first_name='Sara', last_name='Ali', phone='0501234567')
+        case = Case.objects.create(
+            case_id='RV-00001', client=client, case_type='residential', service_type='assisted',
+            application_type='individual', mortgage_type='conventional', emirate='dubai',
+            loan_amount=Decimal('900000'), transaction_type='resale', mortgage_term_years=25,
+            estimated_property_value=Decimal('1500000'), property_status='ready',
+        )
+        with self.assertNumQueries(1):
+            created = PlaceholderService.create_bank_forms(case)
+        self.assertPlaceholders(created, BankForm.DEFAULT_TYPES)
+        self.assertPlaceholders(case.bank_forms.order_by('id'), BankForm.DEFAULT_TYPES)
+
+    def test_conversion_and_case_creation_provision_placeholders(self):
+        _, client = LeadService.convert_lead(self.lead.id)
+        self.assertPlaceholders(client.documents.order_by('id'), Document.DEFAULT_TYPES)
+
+        client.monthly_salary = Decimal('30000')
+        client.save()
+        _, case = ClientService.create_case(
+            client.id, loan_amount=Decimal('900000'), estimated_property_value=Decimal('1500000'),
+        )
+        self.assertPlaceholders(case.bank_forms.order_by('id'), BankForm.DEFAULT_TYPES)
+
+
+class BankMatchTests(APIClientTestCase):
+
+    def setUp(self):
+        super().setUp()
+        defaults = {
+            'loan_to_value_ratio': Decimal('80'), 'maximum_length_of_mortgage': 25,
+            'type_of_employment': 'SALARIED', 'citizen_state': 'UAE RESIDENT',
+            'type_of_transaction': 'PRIMARY/RESALE/HANDOVER',
+        }
+        BankProduct.objects.create(bank_name='ENBD', interest_rate=Decimal('4.0'), **defaults)
+        BankProduct.objects.create(bank_name='ADCB', interest_rate=Decimal('3.5'), **defaults)
+        BankProduct.objects.create(bank_name='FAB', interest_rate=Decimal('3.0'), **{**defaults, 'loan_to_value_ratio': Decimal('60')})
+        BankProduct.objects.create(bank_name='DIB', interest_rate=Decimal('2.0'), **{**defaults, 'type_of_employment': 'SELF EMPLOYMENT'})
+        self.bank_client = Client.objects.create(
+            first_name='Client', last_name='Test', phone='0550000000', monthly_salary=Decimal('40000'),
+            monthly_liabilities=Decimal('3000'), loan_amount=Decimal('1500000'),
+            estimated_property_value=Decimal('2000000'),
+        )
+
+    def test_matches_ranked_by_instalment(self):
+        response = self.client.get(f'/api/clients/{self.bank_client.id}/bank_matches/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([match['bankName'] for match in response.json()['matches']], ['ADCB', 'ENBD'])
+
+    def test_ineligible_products_explain_failed_rules(self):
+        response = self.client.get(f'/api/clients/{self.bank_client.id}/bank_matches/?include_ineligible=true')
+        failed = {match['bankName']: match['failedRules'] for match in response.json()['matches']}
+        self.assertEqual(failed['FAB'], ['ltv'])
+        self.assertEqual(failed['DIB'], ['employment'])
+
+    def test_salary_change_rematches_client(self):
+        response = self.client.patch(f'/api/clients/{self.bank_client.id}/', {'monthlySalary': '15000'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.bank_client.eligible_bank_products.exists())
+
+        self.client.patch(f'/api/clients/{self.bank_client.id}/', {'monthlySalary': '40000'}, format='json')
+        # The refetch after a save already sees the new matches
+        response = self.client.get(f'/api/clients/{self.bank_client.id}/')
+        self.assertEqual(response.json()['eligibleBanks'], ['ADCB', 'ENBD'])
+
+    def test_unknown_salary_does_not_fail_dbr(self):
+        self.client.patch(f'/api/clients/{self.bank_client.id}/', {'monthlySalary': '0'}, format='json')
+        response = self.client.get(f'/api/clients/{self.bank_client.id}/bank_matches/')
+        matches = response.json()['matches']
+        self.assertEqual([match['bankName'] for match in matches], ['ADCB', 'ENBD'])
+        self.assertEqual([match['dbr'] for match in matches], [None, None])
+        response = self.client.get(f'/api/clients/{self.bank_client.id}/')
+        self.assertEqual(response.json()['eligibleBanks'], ['ADCB', 'ENBD'])
+
+
+class EligibilityRecalculationTests(TestCase):
+
+    def setUp(self):
+        for i, liabilities in enumerate(('5000', '12000', '25000')):
+            client = Client(
+                first_name=f'Client{i}', last_name='Test', phone=f'055{i:04d}', monthly_salary=Decimal('40000'),
+                monthly_liabilities=Decimal(liabilities), loan_amount=Decimal('800000'),
+                estimated_property_value=Decimal('1000000'),
+            )
+            client.calculate_eligibility()
+            client.save()
+
+    def test_unchanged_policy_writes_nothing(self):
+        report = EligibilityService.recalculate()
+        self.assertEqual(report['clients'], 3)
+        self.assertEqual(report['updated'], 0)
+
+    def test_stricter_policy_reports_status_changes(self):
+        report = EligibilityService.recalculate(policy=EligibilityPolicy.from_settings(max_dbr=20))
+        self.assertEqual(report['statusChanges'], {'eligible->notEligible': 1})
+        self.assertEqual(Client.objects.filter(eligibility_status='eligible').count(), 1)
+
+
+class MortgageQuoteTests(APIClientTestCase):
+
+    def setUp(self):
+        super().setUp()
+        EiborRate.objects.create(term='3_months', rate=Decimal('3.500'), date='2026-01-01')
+        self.variable = BankProduct.objects.create(
+            bank_name='ENBD', variable_rate_addition=Decimal('1.000'), minimum_rate=Decimal('4.000'),
+        )
+        self.fixed = BankProduct.objects.create(
+            bank_name='ADCB', interest_rate_type='fixed', fixed_rate=Decimal('3.990'), fixed_until=3,
+            variable_rate_addition=Decimal('1.500'), mortgage_processing_fee=Decimal('1.00'),
+        )
+
+    def test_compare_uses_latest_eibor_and_sorts_by_total_cost(self):
+        response = self.client.get('/api/bank-products/compare/?loan_amount=1000000&term_years=25')
+        self.assertEqual(response.status_code, 200)
+        products = response.json()['products']
+        self.assertEqual([product['bankName'] for product in products], ['ENBD', 'ADCB'])
+        # EIBOR 3.5 + 1.0 margin, above the 4.0 floor
+        self.assertEqual(products[0]['initialRate'], 4.5)
+        self.assertEqual(products[1]['fixedMonths'], 36)
+        self.assertEqual(products[1]['followOnRate'], 5.0)
+        self.assertEqual(products[1]['upfrontFees'], 10000.0)
+
+    def test_schedule_repays_the_loan(self):
+        response = self.client.get(f'/api/bank-products/{self.fixed.id}/schedule/?loan_amount=500000&term_years=10')
+        months = response.json()['schedule']
+        self.assertEqual(len(months), 120)
+        self.assertEqual(months[-1]['balance'], 0.0)
+        self.assertAlmostEqual(sum(month['principal'] for month in months), 500000, places=0)
+        self.assertEqual(months[36]['rate'], 5.0)
+
+    def test_schedule_of_unknown_product_is_404(self):
+        for pk in ('abc', self.fixed.id + 100):
+            with self.subTest(pk=pk):
+                response = self.client.get(f'/api/bank-products/{pk}/schedule/?loan_amount=500000&term_years=10')
+                self.assertEqual(response.status_code, 404)
+
+
+class EiborSnapshotTests(APIClientTestCase):
+
+    def setUp(self):
+        super().setUp()
+        EiborRate.objects.bulk_create([
+            EiborRate(term='3_months', rate=Decimal('4.000') + Decimal(day) / 100, date=date(2026, 1, 1) + timedelta(days=day))
+            for day in range(60)
+        ])
+        EiborRate.objects.create(term='1_year', rate=Decimal('4.400'), date='2025-12-01')
+
+    def test_latest_is_served_from_the_snapshot(self):
+        self.client.get('/api/eibor-rates/latest/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/eibor-rates/latest/')
+        latest = response.json()
+        self.assertEqual(latest['threeMonths'], 4.59)
+        self.assertEqual(latest['oneYear'], 4.4)
+        self.assertEqual(latest['lastUpdated'], '2026-03-01')
+
+        # The snapshot is invalidated when the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            EiborRate.objects.create(term='3_months', rate=Decimal('5.000'), date='2026-03-02')
+        self.assertEqual(self.client.get('/api/eibor-rates/latest/').json()['threeMonths'], 5.0)
+
+    def test_series_downsamples_by_interval(self):
+        response = self.client.get('/api/eibor-rates/series/?term=3_months&interval=monthly')
+        points = response.json()['series']['3_months']
+        self.assertEqual([point['date'] for point in points], ['2026-01-01', '2026-02-01', '2026-03-01'])
+        self.assertEqual(points[0]['samples'], 31)
+        self.assertEqual((points[0]['open'], points[0]['rate']), (4.0, 4.3))
+
+
+class BankRepricingTests(TestCase):
+
+    def setUp(self):
+        EiborRate.objects.create(term='3_months', rate=Decimal('3.500'), date='2026-01-01')
+        self.variable = BankProduct.objects.create(
+            bank_name='ENBD', eibor_rate=Decimal('3.000'), variable_rate_addition=Decimal('1.000'),
+            minimum_rate=Decimal('4.750'),
+        )
+        self.fixed = BankProduct.objects.create(
+            bank_name='ADCB', interest_rate_type='fixed', fixed_rate=Decimal('3.990'), fixed_until=3,
+            variable_rate_addition=Decimal('1.500'),
+        )
+        self.other_tenor = BankProduct.objects.create(
+            bank_name='FAB', eibor_type='EIBOR 6 MONTH', eibor_rate=Decimal('3.000'),
+        )
+        reference_cache.invalidate_all()
+
+    def test_new_fixing_reprices_products_on_its_tenor(self):
+        EiborRate.objects.create(term='3_months', rate=Decimal('4.000'), date='2026-02-01')
+        run_pending()
+
+        self.variable.refresh_from_db()
+        self.assertEqual(self.variable.eibor_rate, Decimal('4.000'))
+        self.assertEqual(self.variable.interest_rate, Decimal('5.000'))
+        self.assertEqual(self.variable.follow_on_rate, Decimal('5.000'))
+
+        self.fixed.refresh_from_db()
+        self.assertEqual(self.fixed.interest_rate, Decimal('3.990'))
+        self.assertEqual(self.fixed.follow_on_rate, Decimal('5.500'))
+
+        self.other_tenor.refresh_from_db()
+        self.assertEqual(self.other_tenor.eibor_rate, Decimal('3.000'))
+
+        # Products are read back from the invalidated caches
+        catalogue = reference_cache.get('bank_catalogue')
+        self.assertEqual(float(catalogue.rates[list(catalogue.ids).index(self.variable.id)]), 5.0)
+
+    def test_minimum_rate_floor(self):
+        EiborRate.objects.create(term='3_months', rate=Decimal('3.000'), date='2026-02-01')
+        run_pending()
+        self.variable.refresh_from_db()
+        self.assertEqual(self.variable.interest_rate, Decimal('4.750'))
+
+
+class DocumentUploadPipelineTests(APIClientMixin, TransactionTestCase):
+    # Upload threads update the Document rows, so no test transaction may hold them
+
+    def setUp(self):
+        super().setUp()
+        self.bank_client = Client.objects.create(first_name='Client', last_name='Test', phone='0550000000')
+        self.storage_root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.spool_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(
+            STORAGE_BACKEND='local', LOCAL_STORAGE_ROOT=str(self.storage_root),
+            LOCAL_STORAGE_URL='/media', UPLOAD_SPOOL_DIR=str(self.spool_dir), UPLOAD_MAX_ATTEMPTS=1,
+        ))
+        reset_storage()
+        reset_upload_pipeline()
+        self.addCleanup(reset_storage)
+        self.addCleanup(reset_upload_pipeline)
+
+    def upload(self, content: bytes) -> dict:
+        response = self.client.post(
+            f'/api/clients/{self.bank_client.id}/upload_document/',
+            {'type': 'passport', 'file': SimpleUploadedFile('passport.pdf', content, 'application/pdf')},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'pending')
+        reset_upload_pipeline()  # drains the background uploads
+        return response.json()
+
+    def stored(self, file_url: str) -> Path:
+        return self.storage_root / file_url.removeprefix('/media/')
+
+    def test_upload_is_stored_in_background_and_replaced_file_deleted(self):
+        first = self.upload(b'first')
+        self.assertEqual(self.stored(first['fileUrl']).read_bytes(), b'first')
+        document = Document.objects.get(id=first['id'])
+        self.assertEqual(document.status, 'uploaded')
+        self.assertIsNotNone(document.uploaded_at)
+
+        second = self.upload(b'second')
+        run_pending()  # queued delete of the replaced file
+        self.assertEqual(second['id'], first['id'])
+        self.assertEqual(self.stored(second['fileUrl']).read_bytes(), b'second')
+        self.assertFalse(self.stored(first['fileUrl']).exists())
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+        # Served straight from the local backend
+        response = self.client.get(second['fileUrl'])
+        self.assertEqual(b''.join(response.streaming_content), b'second')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+        self.assertEqual(APIClient().get(second['fileUrl']).status_code, 401)
+        self.assertEqual(self.client.get(first['fileUrl']).status_code, 404)
+
+    def test_replaced_file_kept_until_new_upload_succeeds(self):
+        first = self.upload(b'first')
+        unavailable = ConnectionError('storage unavailable')
+        with patch.object(LocalStorage, 'upload_path', side_effect=unavailable), self.assertLogs('core.uploads', 'ERROR'):
+            second = self.upload(b'second')
+        self.assertEqual(run_pending(), 0)
+        self.assertTrue(self.stored(first['fileUrl']).exists())
+        self.assertEqual(Document.objects.get(id=first['id']).status, 'pending')
+
+        # The next pipeline claims the stale entry and finishes the replacement
+        get_upload_pipeline()
+        reset_upload_pipeline()
+        self.assertEqual(Document.objects.get(id=first['id']).status, 'uploaded')
+        run_pending()
+        self.assertFalse(self.stored(first['fileUrl']).exists())
+        self.assertEqual(self.stored(second['fileUrl']).read_bytes(), b'second')
+
+    def test_memory_backend(self):
+        with override_settings(STORAGE_BACKEND='memory'):
+            reset_storage()
+            reset_upload_pipeline()
+            document = self.upload(b'in memory')
+            storage = get_storage()
+        self.assertIsInstance(storage, MemoryStorage)
+        self.assertEqual(storage.files[storage.path_from_url(document['fileUrl'])], (b'in memory', 'application/pdf'))
+
+    def test_failed_upload_stays_spooled_and_resumes(self):
+        class Unavailable:
+            object_path = staticmethod(lambda filename, folder: f'{folder}/{filename}')
+            public_url = staticmethod(lambda path: f'/media/{path}')
+
+            def upload_path(self, *args):
+                raise ConnectionError('storage unavailable')
+
+        failing = UploadPipeline(Unavailable(), self.spool_dir, max_attempts=1)
+        with self.assertLogs('core.uploads', 'ERROR'):
+            failing.submit(SimpleUploadedFile('form.pdf', b'data', 'application/pdf'), folder='cases/1')
+            failing.drain()
+        self.assertEqual(len(list(self.spool_dir.glob('*.json'))), 1)
+
+        resumed = UploadPipeline(LocalStorage(self.storage_root, '/media'), self.spool_dir)
+        self.assertEqual(resumed.resume(), 1)
+        resumed.drain()
+        self.assertEqual((self.storage_root / 'cases/1/form.pdf').read_bytes(), b'data')
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+    def test_in_progress_upload_is_not_resumed_elsewhere(self):
+        release = threading.Event()
+
+        class Slow(LocalStorage):
+            def upload_path(self, *args):
+                release.wait(5)
+                super().upload_path(*args)
+
+        owner = UploadPipeline(Slow(self.storage_root, '/media'), self.spool_dir)
+        file_url = owner.submit(SimpleUploadedFile('form.pdf', b'data', 'application/pdf'), folder='cases/1')
+
+        # Another gunicorn worker starting up leaves the claimed entry alone
+        other = UploadPipeline(LocalStorage(self.storage_root, '/media'), self.spool_dir)
+        self.assertEqual(other.resume(), 0)
+
+        release.set()
+        owner.drain()
+        self.assertEqual(self.stored(file_url).read_bytes(), b'data')
+        self.assertEqual(other.resume(), 0)
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+    def test_supabase_upload_closes_spooled_file(self):
+        source = self.spool_dir / 'entry.data'
+        source.write_bytes(b'data')
+        bucket = MagicMock()
+        with patch.object(SupabaseStorage, 'bucket', new_callable=PropertyMock, return_value=bucket):
+            SupabaseStorage().upload_path('cases/1/form.pdf', str(source), 'application/pdf')
+        uploaded = bucket.upload.call_args.kwargs['file']
+        self.assertEqual(uploaded.name, str(source))
+        self.assertTrue(uploaded.closed)
+
+    def test_rolled_back_upload_is_discarded(self):
+        pipeline = get_upload_pipeline()
+        with transaction.atomic():
+            kept = pipeline.submit(SimpleUploadedFile('kept.pdf', b'kept', 'application/pdf'), folder='cases/1')
+            try:
+                with transaction.atomic():
+                    pipeline.submit(SimpleUploadedFile('form.pdf', b'data', 'application/pdf'), folder='cases/1')
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+            # The savepoint's entry is gone and its lock released; the outer one waits for commit
+            self.assertEqual(len(list(self.spool_dir.iterdir())), 2)
+        pipeline.drain()
+        self.assertEqual(self.stored(kept).read_bytes(), b'kept')
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                pipeline.submit(SimpleUploadedFile('form.pdf', b'data', 'application/pdf'), folder='cases/1')
+                raise IntegrityError
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+        self.assertEqual(list((self.storage_root / 'cases').rglob('form.pdf')), [])
+
+
+_job_calls = []
+
+
+@register('tests.record')
+def record_job(value, fail_times=0):
+    _job_calls.append(value)
+    if _job_calls.count(value) <= fail_times:
+        raise RuntimeError('transient')
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        _job_calls.clear()
+
+    def test_idempotency_key_deduplicates_queued_jobs(self):
+        first = enqueue('tests.record', {'value': 1}, idempotency_key='record:1')
+        self.assertEqual(enqueue('tests.record', {'value': 1}, idempotency_key='record:1').id, first.id)
+        self.assertEqual(run_pending(), 1)
+        # Once it has run, the key can be queued again
+        self.assertNotEqual(enqueue('tests.record', {'value': 1}, idempotency_key='record:1').id, first.id)
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = enqueue('tests.record', {'value': 'flaky', 'fail_times': 1}, max_attempts=2)
+        worker = Worker(config={**Worker().config, 'BACKOFF_BASE': 0})
+        self.assertTrue(worker.run_once())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertIn('transient', job.last_error)
+        self.assertTrue(worker.run_once())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+
+        doomed = enqueue('tests.record', {'value': 'doomed', 'fail_times': 5}, max_attempts=2)
+        with self.assertLogs('core.jobs', 'WARNING'):
+            while worker.run_once():
+                pass
+        doomed.refresh_from_db()
+        self.assertEqual((doomed.status, doomed.attempts), ('failed', 2))
+
+    def test_expired_lock_is_reclaimed(self):
+        job = enqueue('tests.record', {'value': 'abandoned'})
+        crashed = Worker(name='crashed', config={**Worker().config, 'VISIBILITY_TIMEOUT': -1})
+        self.assertEqual(crashed.claim().id, job.id)  # claimed, never finished
+
+        self.assertTrue(Worker(name='rescuer').run_once())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), ('succeeded', 2, 'rescuer'))
+        self.assertEqual(_job_calls, ['abandoned'])
+
+    def test_expired_lock_on_last_attempt_fails_the_job(self):
+        job = enqueue('tests.record', {'value': 'killer'}, max_attempts=2)
+        crashed = Worker(name='crashed', config={**Worker().config, 'VISIBILITY_TIMEOUT': -1})
+        self.assertEqual(crashed.claim().id, job.id)
+        self.assertEqual(crashed.claim().id, job.id)  # every attempt killed its worker
+
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertFalse(Worker(name='rescuer').run_once())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_until), ('failed', 2, None))
+        self.assertIn('Visibility timeout expired', job.last_error)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(_job_calls, [])
+
+
+class ActivityTouchTests(APIClientTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.lead = Lead.objects.create(first_name='Lead', last_name='Test', phone='0551111111')
+
+    def test_log_call_is_one_insert_and_one_update(self):
+        before = self.lead.updated_at
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(f'/api/leads/{self.lead.id}/log_call/', {'outcome': 'connected'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        # Savepoints come from the test's own transaction
+        statements = [query['sql'].split()[0] for query in ctx.captured_queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(statements, ['UPDATE', 'INSERT'])
+        self.lead.refresh_from_db()
+        self.assertGreater(self.lead.updated_at, before)
+
+    def test_missing_entity_logs_nothing(self):
+        response = self.client.post('/api/leads/999999/add_note/', {'content': 'hello'}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Note.objects.exists())
+
+
+class PipelineAnalyticsTests(APIClientTestCase):
+
+    def setUp(self):
+        super().setUp()
+        channel = Channel.objects.create(id='perf_marketing', name='Performance Marketing')
+        self.sub_source = SubSource.objects.create(source=Source.objects.create(channel=channel, name='Meta'), name='Ads')
+
+    def create_lead(self, i):
+        return Lead.objects.create(
+            first_name=f'Lead{i}', last_name='Test', phone=f'+971 50 {i:03d} 4567', intent='Buy', source=self.sub_source,
+        )
+
+    def create_funnel(self):
+        leads = [self.create_lead(i) for i in range(4)]
+        LeadService.drop_lead(leads[0].id, notes='  Salary  too low ')
+        clients = [LeadService.convert_lead(lead.id)[1] for lead in leads[1:]]
+        cases = [
+            ClientService.create_case(client.id, loan_amount=Decimal('800000'),
+                                      estimated_property_value=Decimal('1000000'))[1]
+            for client in clients[:2]
+        ]
+        ClientService.mark_not_proceeding(clients[2].id, notes='Bought with cash')
+        CaseService.set_stage(cases[0].id, 'disbursed')
+        CaseService.decline(cases[1].id, reason='Salary too low')
+
+        # The disbursed case spent 30 hours in processing
+        disbursed = CaseStageChange.objects.get(case=cases[0], to_stage='disbursed')
+        CaseStageChange.objects.filter(case=cases[0], to_stage='processing').update(
+            timestamp=disbursed.timestamp - timedelta(hours=30)
+        )
+
+    def funnel(self, dimension='channel'):
+        response = self.client.get(f'/api/analytics/funnel/?dimension={dimension}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_rollups(self):
+        self.create_funnel()
+        processed = AnalyticsService.refresh(settle=0)
+        self.assertEqual(processed['analytics.leads'], 4)
+
+        (row,) = self.funnel()['rows']
+        self.assertEqual((row['key'], row['name']), ('perf_marketing', 'Performance Marketing'))
+        self.assertEqual(
+            [row[field] for field in ('leads', 'leadsConverted', 'leadsDropped', 'clients', 'clientsWithCase',
+                                      'clientsNotProceeding', 'cases', 'casesDisbursed', 'casesDeclined')],
+            [4, 3, 1, 3, 2, 1, 2, 1, 1],
+        )
+        self.assertEqual(row['disbursedAmount'], 800000.0)
+        self.assertEqual(row['conversion'], {'leadToClient': 0.75, 'clientToCase': 0.6667, 'caseToDisbursed': 0.5})
+        self.assertEqual(self.funnel('sub_source')['rows'][0]['name'], 'Ads (Meta)')
+        # Lead-sourced clients have no campaign
+        self.assertEqual(self.funnel('campaign')['rows'][0]['key'], None)
+
+        stages = {row['stage']: row for row in self.client.get('/api/analytics/stage-durations/').json()['stages']}
+        self.assertEqual(stages['processing']['count'], 2)
+        self.assertEqual(stages['processing']['meanHours'], 15.0)
+        self.assertEqual(stages['submitted']['count'], 0)
+
+        drop_offs = self.client.get('/api/analytics/drop-offs/').json()
+        self.assertEqual(drop_offs['totals'], {'lead_dropped': 1, 'client_not_proceeding': 1, 'case_declined': 1})
+        self.assertIn({'outcome': 'lead_dropped', 'stage': None, 'reason': 'Salary too low', 'count': 1},
+                      drop_offs['reasons'])
+        declined = self.client.get('/api/analytics/drop-offs/?outcome=case_declined').json()['reasons']
+        self.assertEqual(declined, [{'outcome': 'case_declined', 'stage': 'processing',
+                                     'reason': 'Salary too low', 'count': 1}])
+
+        self.assertEqual(self.client.get('/api/analytics/funnel/?dimension=bank').status_code, 400)
+
+    def test_daily_metrics(self):
+        self.create_funnel()
+        lead = self.create_lead(10)
+        CallLog.objects.create(entity_type='lead', entity_id=lead.id, outcome='busy')
+        CallLog.objects.create(entity_type='case', entity_id=Case.objects.first().id, outcome='connected')
+        Note.objects.create(entity_type='client', entity_id=Client.objects.first().id, content='note')
+        yesterday = timezone.localdate() - timedelta(days=1)
+        Lead.objects.filter(id=lead.id).update(created_at=timezone.now() - timedelta(days=1))
+        AnalyticsService.refresh(settle=0)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/analytics/daily/?date_from={yesterday - timedelta(days=1)}')
+        data = response.json()
+        self.assertEqual([day['leads'] for day in data['days']], [0, 1, 4])
+        self.assertEqual(data['totals'], {
+            'leads': 5, 'calls': 2, 'notes': 1, 'conversions': 3,
+            'casesOpened': 2, 'casesDisbursed': 1, 'disbursedAmount': 800000.0,
+        })
+
+        data = self.client.get(f'/api/analytics/daily/?group=sub_source&sub_source={self.sub_source.id}').json()
+        (series,) = data['subSources']
+        self.assertEqual((series['name'], series['totals']['leads']), ('Ads (Meta)', 5))
+        self.assertEqual(len(data['days']), 30)
+
+        # Daily metrics keep their own watermarks
+        CallLog.objects.create(entity_type='lead', entity_id=lead.id, outcome='busy')
+        processed = AnalyticsService.refresh(settle=0)
+        self.assertEqual(sum(processed.values()), 1)
+        self.assertEqual(self.client.get('/api/analytics/daily/').json()['totals']['calls'], 3)
+
+        response = self.client.get(f'/api/analytics/daily/?date_from={yesterday}&date_to={yesterday - timedelta(days=1)}')
+        self.assertEqual(response.status_code, 400)
+
+    def test_refresh_is_incremental(self):
+        self.create_funnel()
+        AnalyticsService.refresh(settle=0)
+
+        self.create_lead(10)
+        # Rows younger than the settle window wait for the next refresh
+        self.assertEqual(sum(AnalyticsService.refresh(settle=3600).values()), 0)
+        processed = AnalyticsService.refresh(settle=0, batch_size=2)
+        self.assertEqual({name: count for name, count in processed.items() if count},
+                         {'analytics.leads': 1, 'daily.leads': 1})
+        self.assertEqual(self.funnel()['rows'][0]['leads'], 5)
+
+        AnalyticsService.reset()
+        AnalyticsService.refresh(settle=0, batch_size=2)
+        totals = self.funnel()['totals']
+        self.assertEqual((totals['leads'], totals['cases'], totals['casesDisbursed']), (5, 2, 1))
@@ -17,8 +17,12 @@ from .views.settings import (
     EiborRateViewSet,
     eibor_rates_latest,
     system_settings,
+    cache_stats,
+)
+from .views.analytics import analytics_funnel, analytics_stage_durations, analytics_drop_offs, analytics_daily
+from .views.whatsapp import (
+    whatsapp_conversations, whatsapp_messages, whatsapp_mark_read, whatsapp_send, whatsapp_simulate_inbound,
 )
-from .views.whatsapp import whatsapp_conversations, whatsapp_messages, whatsapp_send, whatsapp_simulate_inbound
 
 router = DefaultRouter()
 
@@ -38,9 +42,16 @@ urlpatterns = [
     # Custom endpoints before router to ensure they're matched first
     path('eibor-rates/latest/', eibor_rates_latest, name='eibor-rates-latest'),
     path('system-settings/', system_settings, name='system-settings'),
+    path('cache-stats/', cache_stats, name='cache-stats'),
+    # Analytics endpoints
+    path('analytics/funnel/', analytics_funnel, name='analytics-funnel'),
+    path('analytics/stage-durations/', analytics_stage_durations, name='analytics-stage-durations'),
+    path('analytics/drop-offs/', analytics_drop_offs, name='analytics-drop-offs'),
+    path('analytics/daily/', analytics_daily, name='analytics-daily'),
     # WhatsApp endpoints
     path('whatsapp/conversations/', whatsapp_conversations, name='whatsapp-conversations'),
     path('whatsapp/messages/', whatsapp_messages, name='whatsapp-messages'),
+    path('whatsapp/mark-read/', whatsapp_mark_read, name='whatsapp-mark-read'),
     path('whatsapp/send/', whatsapp_send, name='whatsapp-send'),
     path('whatsapp/simulate-inbound/', whatsapp_simulate_inbound, name='whatsapp-simulate-inbound'),
     path('', include(router.urls)),
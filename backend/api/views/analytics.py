@@ -0,0 +1,77 @@
+"""
+Analytics Views
+
+Read precomputed rollups - refreshed by `manage.py refresh_analytics`
+or the 'analytics.refresh' job, never computed per request.
+"""
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from api.services import AnalyticsService
+from api.serializers.analytics import DailyMetricsQuerySerializer, DropOffQuerySerializer, FunnelQuerySerializer
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_funnel(request):
+    """
+    Lead -> client -> case -> disbursed counts and conversion rates.
+
+    Query params:
+    - dimension: channel (default), sub_source or campaign
+    """
+    serializer = FunnelQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return Response(AnalyticsService.funnel(serializer.validated_data['dimension']))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_stage_durations(request):
+    """Median and mean hours cases spend in each stage"""
+    return Response(AnalyticsService.stage_durations())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_drop_offs(request):
+    """
+    Where and why leads, clients and cases leave the funnel.
+
+    Query params:
+    - outcome: lead_dropped, client_not_eligible, client_not_proceeding, case_declined or case_withdrawn
+    - stage: Case stage left (case outcomes only)
+    - limit: Reasons to return, most common first (default: 50, max: 500)
+    """
+    serializer = DropOffQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+    return Response(AnalyticsService.drop_offs(
+        outcome=params.get('outcome'),
+        stage=params.get('stage'),
+        limit=params['limit'],
+    ))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def analytics_daily(request):
+    """
+    Daily leads, calls, notes, conversions, cases opened and disbursed volume.
+
+    Query params:
+    - date_from / date_to: Inclusive range (default: the last 30 days)
+    - sub_source: Only this sub-source id, repeatable ('' for unattributed)
+    - group: day (default) or sub_source for a series per sub-source
+    """
+    serializer = DailyMetricsQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+    return Response(AnalyticsService.daily(
+        params['date_from'],
+        params['date_to'],
+        sub_sources=params.get('sub_source'),
+        group=params['group'],
+    ))
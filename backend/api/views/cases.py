@@ -9,17 +9,21 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Q
-from django.utils import timezone
-from collections import defaultdict
-
-from core.models import Case, BankForm, BankProduct, CaseStageChange, CallLog, Note
-from core.storage import storage_service
-from api.views.mixins import ActivityTrackingMixin
-from api.pagination import StandardPagination
-from api.services import CaseService
+from rest_framework.utils.urls import replace_query_param
+from django.db import transaction
+
+from core.profiling import profile_section
+from core.models import Case, BankForm, BankProduct, CaseStageChange
+from core.uploads import get_upload_pipeline
+from api.views.mixins import ActivityTrackingMixin, ExportMixin, KeysetPaginationMixin
+from api.pagination import KeysetPagination, StandardPagination
+from api.search import CASE_SEARCH, apply_search, is_rank_requested
+from api.services import CaseBoardService, CaseService, PlaceholderService
 from api.serializers.cases import (
     CaseListSerializer,
+    CaseBoardQuerySerializer,
+    CaseBoardCardSerializer,
+    CaseBoardColumnSerializer,
     CaseDetailSerializer,
     CaseCreateSerializer,
     CaseUpdateSerializer,
@@ -30,11 +34,12 @@ from api.serializers.cases import (
 )
 
 
-class CaseViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
+class CaseViewSet(ActivityTrackingMixin, ExportMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     """
     ViewSet for Case CRUD operations and actions.
 
-    list: GET /api/cases/
+    list: GET /api/cases/ (?pagination=cursor for keyset pagination)
+    board: GET /api/cases/board/ (?stage=...&cursor=... loads more cards of one column)
     create: POST /api/cases/
     retrieve: GET /api/cases/{id}/
     update: PUT /api/cases/{id}/
@@ -48,11 +53,31 @@ class CaseViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
     - advance_stage: POST /api/cases/{id}/advance_stage/
     - decline: POST /api/cases/{id}/decline/
     - withdraw: POST /api/cases/{id}/withdraw/
+    - export: GET /api/cases/export/ (?output=csv|ndjson, list filters apply)
     """
 
     activity_entity_type = 'case'
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    export_basename = 'cases'
+    export_columns = [
+        ('id', 'id'),
+        ('caseId', 'case_id'),
+        ('clientId', 'client_id'),
+        ('clientFirstName', 'client__first_name'),
+        ('clientLastName', 'client__last_name'),
+        ('stage', 'stage'),
+        ('caseType', 'case_type'),
+        ('mortgageType', 'mortgage_type'),
+        ('emirate', 'emirate'),
+        ('loanAmount', 'loan_amount'),
+        ('estimatedPropertyValue', 'estimated_property_value'),
+        ('bankName', 'bank_name'),
+        ('rateType', 'rate_type'),
+        ('ratePercent', 'rate_percent'),
+        ('createdAt', 'created_at'),
+        ('updatedAt', 'updated_at'),
+    ]
     queryset = Case.objects.all()
 
     def get_serializer_class(self):
@@ -68,8 +93,8 @@ class CaseViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter cases based on query params"""
-        queryset = Case.objects.select_related('client').prefetch_related(
-            'bank_products', 'bank_forms', 'stage_changes'
+        queryset = Case.objects.select_related('client__source__source').prefetch_related(
+            'bank_products', 'bank_forms'
         ).order_by('-created_at')
 
         # Filter by stage
@@ -89,93 +114,80 @@ class CaseViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
         if client_id:
             queryset = queryset.filter(client_id=client_id)
 
-        # Search by case_id or client name
+        # Search by case_id or client name (?search_rank=true orders by relevance)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(case_id__icontains=search) |
-                Q(client__first_name__icontains=search) |
-                Q(client__last_name__icontains=search)
-            )
+            queryset = apply_search(queryset, search, CASE_SEARCH, rank=is_rank_requested(self.request))
 
         return queryset
 
-    def _prefetch_activities(self, case_ids: list) -> dict:
-        """Prefetch call logs and notes for multiple cases in 2 queries"""
-        call_logs = CallLog.objects.filter(
-            entity_type='case',
-            entity_id__in=case_ids
-        ).order_by('-timestamp')
-
-        notes = Note.objects.filter(
-            entity_type='case',
-            entity_id__in=case_ids
-        ).order_by('-timestamp')
-
-        call_logs_by_case = defaultdict(list)
-        for log in call_logs:
-            call_logs_by_case[log.entity_id].append(log)
-
-        notes_by_case = defaultdict(list)
-        for note in notes:
-            notes_by_case[note.entity_id].append(note)
-
-        return {
-            'call_logs': call_logs_by_case,
-            'notes': notes_by_case,
-        }
-
     def list(self, request, *args, **kwargs):
-        """Override list to prefetch activities efficiently with pagination"""
+        """Override list to profile serialization"""
         queryset = self.filter_queryset(self.get_queryset())
 
-        # Paginate the queryset
         page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page if page is not None else queryset, many=True)
+        with profile_section('serialize'):
+            data = serializer.data
         if page is not None:
-            case_ids = [case.id for case in page]
-            activities = self._prefetch_activities(case_ids)
-
-            serializer = self.get_serializer(
-                page,
-                many=True,
-                context={
-                    **self.get_serializer_context(),
-                    'prefetched_call_logs': activities['call_logs'],
-                    'prefetched_notes': activities['notes'],
-                }
-            )
-            return self.get_paginated_response(serializer.data)
-
-        # Fallback for no pagination
-        case_ids = list(queryset.values_list('id', flat=True))
-        activities = self._prefetch_activities(case_ids)
-
-        serializer = self.get_serializer(
-            queryset,
-            many=True,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
-        )
-        return Response(serializer.data)
+            return self.get_paginated_response(data)
+        return Response(data)
 
     def retrieve(self, request, *args, **kwargs):
-        """Override retrieve to prefetch activities"""
+        """Override retrieve to load the full activity history"""
         instance = self.get_object()
-
-        activities = self._prefetch_activities([instance.id])
-
-        serializer = self.get_serializer(
-            instance,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
-        )
-        return Response(serializer.data)
+        serializer = self.get_serializer(instance, context=self.get_activity_context([instance.id]))
+        with profile_section('serialize'):
+            data = serializer.data
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def board(self, request):
+        """
+        Kanban board - per-stage counts and loan sums plus the newest
+        `limit` cards of every stage. With ?stage=... returns the next cards
+        of that column only, after ?cursor from the column's `next` link.
+        List filters (status, client, search) apply. Delegates to CaseBoardService.
+        """
+        serializer = CaseBoardQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        # Cards are value rows - the list prefetches would be wasted
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+
+        if 'stage' in params:
+            cursor = KeysetPagination().decode_cursor(request)
+            cards, has_more = CaseBoardService.column_page(queryset, params['limit'], after=cursor)
+            with profile_section('serialize'):
+                data = CaseBoardCardSerializer(cards, many=True).data
+            return Response({
+                'stage': params['stage'],
+                'cards': data,
+                'next': self._board_next_link(params['stage'], cards) if has_more else None,
+            })
+
+        status_filter = request.query_params.get('status')
+        if status_filter == 'active':
+            stages = Case.ACTIVE_STAGES
+        elif status_filter == 'terminal':
+            stages = Case.TERMINAL_STAGES
+        else:
+            stages = Case.ACTIVE_STAGES + Case.TERMINAL_STAGES
+
+        columns = CaseBoardService.columns(queryset, stages, params['limit'])
+        for column in columns:
+            has_more = column['count'] > len(column['cards'])
+            column['next'] = self._board_next_link(column['stage'], column['cards']) if has_more else None
+        with profile_section('serialize'):
+            data = CaseBoardColumnSerializer(columns, many=True).data
+        return Response({'columns': data})
+
+    def _board_next_link(self, stage: str, cards: list) -> str:
+        """Link loading the cards of a column after the last one shown"""
+        last = cards[-1]
+        url = replace_query_param(self.request.build_absolute_uri(), 'stage', stage)
+        cursor = KeysetPagination().encode_cursor(last['created_at'], last['id'])
+        return replace_query_param(url, KeysetPagination.cursor_query_param, cursor)
 
     def perform_create(self, serializer):
         """Create case with auto-generated case_id and bank forms"""
@@ -193,13 +205,8 @@ class CaseViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
             bank_products = BankProduct.objects.filter(id__in=bank_product_ids[:3])
             case.bank_products.set(bank_products)
 
-        # Create default bank form placeholders
-        for form_type in BankForm.DEFAULT_TYPES:
-            BankForm.objects.create(
-                case=case,
-                type=form_type,
-                status='missing'
-            )
+        # Create default bank form placeholders (single INSERT)
+        PlaceholderService.create_bank_forms(case)
 
         # Create initial stage change
         CaseStageChange.objects.create(
@@ -229,52 +236,34 @@ class CaseViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Upload file to Supabase Storage
-        try:
-            file_url = storage_service.upload_file(
-                file_data=file.read(),
-                filename=file.name,
-                content_type=file.content_type,
-                folder=f"cases/{case.id}/bank_forms"
+        # For 'other' type, always create a new bank form
+        # For standard types, reuse the existing row (or create it)
+        if form_type == 'other':
+            bank_form = BankForm(case=case, type=form_type)
+        else:
+            bank_form = (
+                BankForm.objects.filter(case=case, type=form_type).first()
+                or BankForm(case=case, type=form_type)
             )
-        except Exception as e:
+
+        # Spool the file and upload it in the background - the URL is reserved now.
+        # The row stays 'pending' until the upload succeeds; only then is the
+        # replaced file deleted.
+        pipeline = get_upload_pipeline()
+        try:
+            with transaction.atomic():
+                bank_form.file_url = pipeline.submit(
+                    file, folder=f"cases/{case.id}/bank_forms", record='core.BankForm', replaces=bank_form.file_url,
+                )
+                bank_form.status = 'pending'
+                bank_form.uploaded_at = None
+                bank_form.save()
+        except OSError as e:
             return Response(
                 {'error': f'Failed to upload file: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        # For 'other' type, always create new bank form
-        # For standard types, update existing or create new
-        if form_type == 'other':
-            bank_form = BankForm.objects.create(
-                case=case,
-                type=form_type,
-                file_url=file_url,
-                status='uploaded',
-                uploaded_at=timezone.now()
-            )
-        else:
-            try:
-                bank_form = BankForm.objects.get(case=case, type=form_type)
-                # Delete old file if exists
-                if bank_form.file_url:
-                    try:
-                        storage_service.delete_file(bank_form.file_url)
-                    except Exception:
-                        pass
-                bank_form.file_url = file_url
-                bank_form.status = 'uploaded'
-                bank_form.uploaded_at = timezone.now()
-                bank_form.save()
-            except BankForm.DoesNotExist:
-                bank_form = BankForm.objects.create(
-                    case=case,
-                    type=form_type,
-                    file_url=file_url,
-                    status='uploaded',
-                    uploaded_at=timezone.now()
-                )
-
         return Response({
             'id': bank_form.id,
             'type': bank_form.type,
@@ -296,12 +285,8 @@ class CaseViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Delete file from storage if exists
-        if bank_form.file_url:
-            try:
-                storage_service.delete_file(bank_form.file_url)
-            except Exception:
-                pass
+        # Delete file from storage in the background
+        get_upload_pipeline().delete(bank_form.file_url)
 
         # For 'other' type, delete the record entirely
         # For standard types, just clear the file_url
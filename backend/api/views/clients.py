@@ -9,15 +9,16 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Q
-from django.utils import timezone
-from collections import defaultdict
+from django.shortcuts import get_object_or_404
+from django.db import transaction
 
-from core.models import Client, Document, CallLog, Note
-from core.storage import storage_service
-from api.views.mixins import ActivityTrackingMixin
+from core.profiling import profile_section
+from core.models import Case, Client, Document
+from core.uploads import get_upload_pipeline
+from api.views.mixins import ActivityTrackingMixin, ExportMixin, KeysetPaginationMixin
 from api.pagination import StandardPagination
-from api.services import ClientService
+from api.search import CLIENT_SEARCH, apply_search, is_rank_requested
+from api.services import BankMatchService, ClientService, PlaceholderService
 from api.serializers.clients import (
     ClientListSerializer,
     ClientDetailSerializer,
@@ -29,11 +30,11 @@ from api.serializers.clients import (
 )
 
 
-class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
+class ClientViewSet(ActivityTrackingMixin, ExportMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     """
     ViewSet for Client CRUD operations and actions.
 
-    list: GET /api/clients/
+    list: GET /api/clients/ (?pagination=cursor for keyset pagination)
     create: POST /api/clients/
     retrieve: GET /api/clients/{id}/
     update: PUT /api/clients/{id}/
@@ -47,11 +48,33 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
     - create_case: POST /api/clients/{id}/create_case/
     - mark_not_proceeding: POST /api/clients/{id}/mark_not_proceeding/
     - mark_not_eligible: POST /api/clients/{id}/mark_not_eligible/
+    - bank_matches: GET /api/clients/{id}/bank_matches/
+    - export: GET /api/clients/export/ (?output=csv|ndjson, list filters apply)
     """
 
     activity_entity_type = 'client'
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    export_basename = 'clients'
+    export_columns = [
+        ('id', 'id'),
+        ('firstName', 'first_name'),
+        ('lastName', 'last_name'),
+        ('email', 'email'),
+        ('phone', 'phone'),
+        ('status', 'status'),
+        ('residencyStatus', 'residency_status'),
+        ('employmentStatus', 'employment_status'),
+        ('monthlySalary', 'monthly_salary'),
+        ('monthlyLiabilities', 'monthly_liabilities'),
+        ('loanAmount', 'loan_amount'),
+        ('estimatedPropertyValue', 'estimated_property_value'),
+        ('eligibilityStatus', 'eligibility_status'),
+        ('source', 'source__name'),
+        ('campaign', 'source_campaign__name'),
+        ('createdAt', 'created_at'),
+        ('updatedAt', 'updated_at'),
+    ]
     queryset = Client.objects.all()
 
     def get_serializer_class(self):
@@ -70,7 +93,7 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
         queryset = Client.objects.select_related(
             'source__source', 'source_campaign'
         ).prefetch_related(
-            'documents', 'status_changes', 'cases'
+            'documents', 'cases'
         ).order_by('-created_at')
 
         # Filter by status
@@ -93,116 +116,70 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
         if channel:
             queryset = queryset.filter(source_channel=channel)
 
-        # Search by name, phone, or email
+        # Search by name, phone, or email (?search_rank=true orders by relevance)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(phone__icontains=search) |
-                Q(email__icontains=search)
-            )
-
-        return queryset
-
-    def _prefetch_activities(self, client_ids: list) -> dict:
-        """Prefetch call logs and notes for multiple clients in 2 queries"""
-        call_logs = CallLog.objects.filter(
-            entity_type='client',
-            entity_id__in=client_ids
-        ).order_by('-timestamp')
-
-        notes = Note.objects.filter(
-            entity_type='client',
-            entity_id__in=client_ids
-        ).order_by('-timestamp')
+            queryset = apply_search(queryset, search, CLIENT_SEARCH, rank=is_rank_requested(self.request))
 
-        call_logs_by_client = defaultdict(list)
-        for log in call_logs:
-            call_logs_by_client[log.entity_id].append(log)
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('eligible_bank_products')
 
-        notes_by_client = defaultdict(list)
-        for note in notes:
-            notes_by_client[note.entity_id].append(note)
-
-        return {
-            'call_logs': call_logs_by_client,
-            'notes': notes_by_client,
-        }
+        return queryset
 
     def list(self, request, *args, **kwargs):
-        """Override list to prefetch activities efficiently with pagination"""
+        """Override list to load a bounded slice of activities for the page in one query"""
         queryset = self.filter_queryset(self.get_queryset())
 
         # Paginate the queryset
         page = self.paginate_queryset(queryset)
         if page is not None:
             client_ids = [client.id for client in page]
-            activities = self._prefetch_activities(client_ids)
-
             serializer = self.get_serializer(
                 page,
                 many=True,
-                context={
-                    **self.get_serializer_context(),
-                    'prefetched_call_logs': activities['call_logs'],
-                    'prefetched_notes': activities['notes'],
-                }
+                context=self.get_activity_context(client_ids, limit=self.activity_list_limit)
             )
-            return self.get_paginated_response(serializer.data)
+            with profile_section('serialize'):
+                data = serializer.data
+            return self.get_paginated_response(data)
 
         # Fallback for no pagination
         client_ids = list(queryset.values_list('id', flat=True))
-        activities = self._prefetch_activities(client_ids)
-
         serializer = self.get_serializer(
             queryset,
             many=True,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
+            context=self.get_activity_context(client_ids, limit=self.activity_list_limit)
         )
-        return Response(serializer.data)
+        with profile_section('serialize'):
+            data = serializer.data
+        return Response(data)
 
     def retrieve(self, request, *args, **kwargs):
-        """Override retrieve to prefetch activities"""
+        """Override retrieve to load the full activity history"""
         instance = self.get_object()
-
-        activities = self._prefetch_activities([instance.id])
-
-        serializer = self.get_serializer(
-            instance,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
-        )
-        return Response(serializer.data)
+        serializer = self.get_serializer(instance, context=self.get_activity_context([instance.id]))
+        with profile_section('serialize'):
+            data = serializer.data
+        return Response(data)
 
     def perform_create(self, serializer):
         """Create client and initialize document placeholders"""
         client = serializer.save()
 
-        # Create default document placeholders
-        for doc_type in Document.DEFAULT_TYPES:
-            Document.objects.create(
-                client=client,
-                type=doc_type,
-                status='missing'
-            )
+        # Create default document placeholders (single INSERT)
+        PlaceholderService.create_documents(client)
 
         # Calculate eligibility
         client.calculate_eligibility()
         client.save()
+        BankMatchService.update_client_matches(client)
 
     def perform_update(self, serializer):
         """Update client and recalculate eligibility"""
         client = serializer.save()
         client.calculate_eligibility()
         client.save()
+        BankMatchService.update_client_matches(client)
 
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def upload_document(self, request, pk=None):
@@ -224,52 +201,34 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Upload file to Supabase Storage
-        try:
-            file_url = storage_service.upload_file(
-                file_data=file.read(),
-                filename=file.name,
-                content_type=file.content_type,
-                folder=f"clients/{client.id}"
+        # For 'other' type, always create a new document
+        # For standard types, reuse the existing row (or create it)
+        if doc_type == 'other':
+            document = Document(client=client, type=doc_type)
+        else:
+            document = (
+                Document.objects.filter(client=client, type=doc_type).first()
+                or Document(client=client, type=doc_type)
             )
-        except Exception as e:
+
+        # Spool the file and upload it in the background - the URL is reserved now.
+        # The row stays 'pending' until the upload succeeds; only then is the
+        # replaced file deleted.
+        pipeline = get_upload_pipeline()
+        try:
+            with transaction.atomic():
+                document.file_url = pipeline.submit(
+                    file, folder=f"clients/{client.id}", record='core.Document', replaces=document.file_url,
+                )
+                document.status = 'pending'
+                document.uploaded_at = None
+                document.save()
+        except OSError as e:
             return Response(
                 {'error': f'Failed to upload file: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        # For 'other' type, always create new document
-        # For standard types, update existing or create new
-        if doc_type == 'other':
-            document = Document.objects.create(
-                client=client,
-                type=doc_type,
-                file_url=file_url,
-                status='uploaded',
-                uploaded_at=timezone.now()
-            )
-        else:
-            try:
-                document = Document.objects.get(client=client, type=doc_type)
-                # Delete old file if exists
-                if document.file_url:
-                    try:
-                        storage_service.delete_file(document.file_url)
-                    except Exception:
-                        pass
-                document.file_url = file_url
-                document.status = 'uploaded'
-                document.uploaded_at = timezone.now()
-                document.save()
-            except Document.DoesNotExist:
-                document = Document.objects.create(
-                    client=client,
-                    type=doc_type,
-                    file_url=file_url,
-                    status='uploaded',
-                    uploaded_at=timezone.now()
-                )
-
         return Response({
             'id': document.id,
             'type': document.type,
@@ -291,12 +250,8 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Delete file from storage if exists
-        if document.file_url:
-            try:
-                storage_service.delete_file(document.file_url)
-            except Exception:
-                pass
+        # Delete file from storage in the background
+        get_upload_pipeline().delete(document.file_url)
 
         # For 'other' type, delete the record entirely
         # For standard types, just clear the file_url
@@ -304,7 +259,7 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
             document.delete()
         else:
             document.file_url = ''
-            document.status = 'pending'
+            document.status = 'missing'
             document.save()
 
         return Response({'success': True}, status=status.HTTP_200_OK)
@@ -322,17 +277,9 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
         )
 
         # Refresh client with prefetched data
-        client = Client.objects.prefetch_related('status_changes', 'documents', 'cases').get(id=client.id)
-        activities = self._prefetch_activities([client.id])
+        client = Client.objects.prefetch_related('documents', 'cases').get(id=client.id)
 
-        return Response(ClientDetailSerializer(
-            client,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
-        ).data)
+        return Response(ClientDetailSerializer(client, context=self.get_activity_context([client.id])).data)
 
     @action(detail=True, methods=['post'])
     def mark_not_eligible(self, request, pk=None):
@@ -347,17 +294,9 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
         )
 
         # Refresh client with prefetched data
-        client = Client.objects.prefetch_related('status_changes', 'documents', 'cases').get(id=client.id)
-        activities = self._prefetch_activities([client.id])
+        client = Client.objects.prefetch_related('documents', 'cases').get(id=client.id)
 
-        return Response(ClientDetailSerializer(
-            client,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
-        ).data)
+        return Response(ClientDetailSerializer(client, context=self.get_activity_context([client.id])).data)
 
     @action(detail=True, methods=['post'])
     def create_case(self, request, pk=None):
@@ -389,3 +328,38 @@ class ClientViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
             'caseId': case.id,
             'caseNumber': case.case_id
         })
+
+    @action(detail=True, methods=['get'])
+    def bank_matches(self, request, pk=None):
+        """
+        Rank bank products for the client - delegates to BankMatchService
+
+        Query params:
+        - transaction_type: Case transaction type (primaryPurchase, resale, ...)
+        - term_years: Requested mortgage term
+        - include_ineligible: 'true' to also list failing products with reasons
+        - limit: Maximum number of products
+        """
+        # Plain lookup - the matcher needs none of the list prefetches
+        client = get_object_or_404(Client, pk=pk)
+
+        transaction_type = request.query_params.get('transaction_type') or None
+        if transaction_type and transaction_type not in dict(Case.TRANSACTION_TYPE_CHOICES):
+            return Response(
+                {'error': f'Invalid transaction_type. Must be one of: {", ".join(dict(Case.TRANSACTION_TYPE_CHOICES))}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            term_years = int(request.query_params['term_years']) if request.query_params.get('term_years') else None
+            limit = int(request.query_params['limit']) if request.query_params.get('limit') else None
+        except ValueError:
+            return Response({'error': 'term_years and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = BankMatchService.get_matches(
+            client,
+            transaction_type=transaction_type,
+            term_years=term_years,
+            include_ineligible=request.query_params.get('include_ineligible', '').lower() == 'true',
+            limit=limit,
+        )
+        return Response({'clientId': client.id, 'matches': matches})
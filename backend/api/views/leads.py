@@ -4,32 +4,38 @@ Lead Views
 ViewSets are thin - logic lives in services.
 """
 
+from django.conf import settings
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Prefetch
-from collections import defaultdict
 
-from core.models import Lead, CallLog, Note
-from api.views.mixins import ActivityTrackingMixin
+from core.profiling import profile_section
+from core.models import Lead
+from api.views.mixins import ActivityTrackingMixin, ExportMixin, KeysetPaginationMixin
 from api.pagination import StandardPagination
-from api.services import LeadService
+from api.search import LEAD_SEARCH, apply_search, is_rank_requested
+from api.parsers import NDJSONParser
+from api.services import LeadService, LeadIngestService
 from api.serializers.leads import (
     LeadListSerializer,
+    LeadCompactListSerializer,
     LeadDetailSerializer,
     LeadCreateSerializer,
     LeadUpdateSerializer,
     DropLeadSerializer,
     ConvertLeadSerializer,
+    LeadIngestRowSerializer,
 )
 
 
-class LeadViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
+class LeadViewSet(ActivityTrackingMixin, ExportMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     """
     ViewSet for Lead CRUD operations and actions.
 
-    list: GET /api/leads/
+    list: GET /api/leads/ (?pagination=cursor for keyset pagination,
+          ?view=compact for activity counts instead of full history)
     create: POST /api/leads/
     retrieve: GET /api/leads/{id}/
     update: PUT /api/leads/{id}/
@@ -41,16 +47,32 @@ class LeadViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
     - add_note: POST /api/leads/{id}/add_note/
     - drop: POST /api/leads/{id}/drop/
     - convert: POST /api/leads/{id}/convert/
+    - ingest: POST /api/leads/ingest/ (JSON array or NDJSON, ?dedupe=false to keep duplicates)
+    - export: GET /api/leads/export/ (?output=csv|ndjson, list filters apply)
     """
 
     activity_entity_type = 'lead'
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    export_basename = 'leads'
+    export_columns = [
+        ('id', 'id'),
+        ('firstName', 'first_name'),
+        ('lastName', 'last_name'),
+        ('email', 'email'),
+        ('phone', 'phone'),
+        ('status', 'status'),
+        ('source', 'source__name'),
+        ('sourceParent', 'source__source__name'),
+        ('intent', 'intent'),
+        ('createdAt', 'created_at'),
+        ('updatedAt', 'updated_at'),
+    ]
     queryset = Lead.objects.all()
 
     def get_serializer_class(self):
         if self.action == 'list':
-            return LeadListSerializer
+            return LeadCompactListSerializer if self.is_compact_list() else LeadListSerializer
         elif self.action == 'retrieve':
             return LeadDetailSerializer
         elif self.action == 'create':
@@ -59,12 +81,21 @@ class LeadViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
             return LeadUpdateSerializer
         return LeadListSerializer
 
+    def is_compact_list(self):
+        return self.request.query_params.get('view') == 'compact'
+
+    def get_list_context(self, lead_ids):
+        """Compact lists get aggregated counts, full lists a bounded activity slice"""
+        if self.is_compact_list():
+            return self.get_activity_summary_context(lead_ids)
+        return self.get_activity_context(lead_ids, limit=self.activity_list_limit)
+
     def get_queryset(self):
         """Filter leads based on query params"""
         queryset = Lead.objects.select_related('source__source').order_by('-created_at')
 
-        # Prefetch status changes and converted client
-        queryset = queryset.prefetch_related('status_changes', 'converted_client')
+        # Prefetch converted client (activities come from the activity loader)
+        queryset = queryset.prefetch_related('converted_client')
 
         # Filter by status
         status_param = self.request.query_params.get('status')
@@ -76,98 +107,48 @@ class LeadViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
         if source:
             queryset = queryset.filter(source_id=source)
 
-        # Search by name, phone, or email
+        # Search by name, phone, or email (?search_rank=true orders by relevance)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(phone__icontains=search) |
-                Q(email__icontains=search)
-            )
+            queryset = apply_search(queryset, search, LEAD_SEARCH, rank=is_rank_requested(self.request))
 
         return queryset
 
-    def _prefetch_activities(self, lead_ids: list) -> dict:
-        """Prefetch call logs and notes for multiple leads in 2 queries"""
-        # Fetch all call logs for these leads
-        call_logs = CallLog.objects.filter(
-            entity_type='lead',
-            entity_id__in=lead_ids
-        ).order_by('-timestamp')
-
-        # Fetch all notes for these leads
-        notes = Note.objects.filter(
-            entity_type='lead',
-            entity_id__in=lead_ids
-        ).order_by('-timestamp')
-
-        # Group by entity_id
-        call_logs_by_lead = defaultdict(list)
-        for log in call_logs:
-            call_logs_by_lead[log.entity_id].append(log)
-
-        notes_by_lead = defaultdict(list)
-        for note in notes:
-            notes_by_lead[note.entity_id].append(note)
-
-        return {
-            'call_logs': call_logs_by_lead,
-            'notes': notes_by_lead,
-        }
-
     def list(self, request, *args, **kwargs):
-        """Override list to prefetch activities efficiently with pagination"""
+        """Override list to load activities (or their counts) for the page in one query"""
         queryset = self.filter_queryset(self.get_queryset())
 
         # Paginate the queryset
         page = self.paginate_queryset(queryset)
         if page is not None:
             lead_ids = [lead.id for lead in page]
-            activities = self._prefetch_activities(lead_ids)
-
             serializer = self.get_serializer(
                 page,
                 many=True,
-                context={
-                    **self.get_serializer_context(),
-                    'prefetched_call_logs': activities['call_logs'],
-                    'prefetched_notes': activities['notes'],
-                }
+                context=self.get_list_context(lead_ids)
             )
-            return self.get_paginated_response(serializer.data)
+            with profile_section('serialize'):
+                data = serializer.data
+            return self.get_paginated_response(data)
 
         # Fallback for no pagination
         lead_ids = list(queryset.values_list('id', flat=True))
-        activities = self._prefetch_activities(lead_ids)
-
         serializer = self.get_serializer(
             queryset,
             many=True,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
+            context=self.get_list_context(lead_ids)
         )
-        return Response(serializer.data)
+        with profile_section('serialize'):
+            data = serializer.data
+        return Response(data)
 
     def retrieve(self, request, *args, **kwargs):
-        """Override retrieve to prefetch activities"""
+        """Override retrieve to load the full activity history"""
         instance = self.get_object()
-
-        # Prefetch activities for single lead
-        activities = self._prefetch_activities([instance.id])
-
-        serializer = self.get_serializer(
-            instance,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
-        )
-        return Response(serializer.data)
+        serializer = self.get_serializer(instance, context=self.get_activity_context([instance.id]))
+        with profile_section('serialize'):
+            data = serializer.data
+        return Response(data)
 
     @action(detail=True, methods=['post'])
     def drop(self, request, pk=None):
@@ -182,17 +163,9 @@ class LeadViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
         )
 
         # Refresh lead with prefetched data
-        lead = Lead.objects.prefetch_related('status_changes', 'converted_client').get(id=lead.id)
-        activities = self._prefetch_activities([lead.id])
-
-        return Response(LeadDetailSerializer(
-            lead,
-            context={
-                **self.get_serializer_context(),
-                'prefetched_call_logs': activities['call_logs'],
-                'prefetched_notes': activities['notes'],
-            }
-        ).data)
+        lead = Lead.objects.prefetch_related('converted_client').get(id=lead.id)
+
+        return Response(LeadDetailSerializer(lead, context=self.get_activity_context([lead.id])).data)
 
     @action(detail=True, methods=['post'])
     def convert(self, request, pk=None):
@@ -207,17 +180,42 @@ class LeadViewSet(ActivityTrackingMixin, viewsets.ModelViewSet):
         )
 
         # Refresh lead with prefetched data
-        lead = Lead.objects.prefetch_related('status_changes', 'converted_client').get(id=lead.id)
-        activities = self._prefetch_activities([lead.id])
+        lead = Lead.objects.prefetch_related('converted_client').get(id=lead.id)
 
         return Response({
-            'lead': LeadDetailSerializer(
-                lead,
-                context={
-                    **self.get_serializer_context(),
-                    'prefetched_call_logs': activities['call_logs'],
-                    'prefetched_notes': activities['notes'],
-                }
-            ).data,
+            'lead': LeadDetailSerializer(lead, context=self.get_activity_context([lead.id])).data,
             'clientId': client.id
         })
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def ingest(self, request):
+        """Bulk-create leads from a partner or marketing feed - delegates to LeadIngestService"""
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = rows.get('leads')
+        if not isinstance(rows, list):
+            return Response(
+                {'error': 'Expected a list of leads, {"leads": [...]} or an NDJSON body'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > settings.LEAD_INGEST_MAX_ROWS:
+            return Response(
+                {'error': f'At most {settings.LEAD_INGEST_MAX_ROWS} leads per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Validate row by row so one bad row doesn't reject the whole feed
+        validated = []
+        row_errors = {}
+        for index, row in enumerate(rows):
+            serializer = LeadIngestRowSerializer(data=row)
+            if serializer.is_valid():
+                validated.append(serializer.validated_data)
+            else:
+                validated.append(None)
+                row_errors[index] = serializer.errors
+
+        dedupe = request.query_params.get('dedupe', 'true').lower() != 'false'
+        report = LeadIngestService.ingest(validated, row_errors=row_errors, dedupe=dedupe)
+
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
@@ -1,36 +1,111 @@
 """
 ViewSet mixins for shared functionality
 """
+from django.db import transaction
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from core.exceptions import NotFoundError
 from core.models import CallLog, Note
 from api.serializers.common import LogCallSerializer, AddNoteSerializer
+from api.pagination import KeysetPagination
+from api.exports import EXPORT_FORMATS, export_response
+from api.services.activities import ActivityLoader, ACTIVITY_LIST_LIMIT
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin letting list endpoints opt in to keyset pagination per request.
+    Falls back to the viewset's pagination_class when not requested.
+    """
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            if request is not None and self.keyset_pagination_class.is_requested(request):
+                self._paginator = self.keyset_pagination_class()
+        return super().paginator
+
+
+class ExportMixin:
+    """
+    Mixin providing a streaming export action:
+    GET /api/<entities>/export/?output=csv|ndjson
+
+    Applies the same filters as the list endpoint (get_queryset).
+    Requires export_columns - (header, lookup) pairs - to be set.
+    """
+    export_columns = None
+    export_basename = None
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every matching row as CSV (default) or NDJSON"""
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'output must be one of: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, self.export_columns, output, self.export_basename)
 
 
 class ActivityTrackingMixin:
     """
-    Mixin providing log_call and add_note actions for entities.
+    Mixin providing log_call and add_note actions for entities,
+    plus batched activity loading for list and detail serializers.
     Requires activity_entity_type class attribute to be set.
     """
     activity_entity_type = None  # Must be set in subclass ('lead', 'client', 'case')
+    activity_list_limit = ACTIVITY_LIST_LIMIT  # Latest N of each kind per row in lists
+
+    def get_activity_context(self, entity_ids: list, limit: int = None) -> dict:
+        """Serializer context with activities for the given entities (1 query)"""
+        activities = ActivityLoader(self.activity_entity_type, limit=limit).load(entity_ids)
+        return {
+            **self.get_serializer_context(),
+            'prefetched_call_logs': activities['call_logs'],
+            'prefetched_notes': activities['notes'],
+            'prefetched_status_changes': activities['status_changes'],
+        }
+
+    def get_activity_summary_context(self, entity_ids: list) -> dict:
+        """Serializer context with activity counts for compact lists (1 query)"""
+        return {
+            **self.get_serializer_context(),
+            'activity_summary': ActivityLoader(self.activity_entity_type).summarize(entity_ids),
+        }
+
+    def touch_entity(self, pk) -> int:
+        """
+        Bump the entity's updated_at with one single-column UPDATE, which
+        doubles as the existence check - the row itself is never loaded.
+        """
+        model = self.get_queryset().model
+        try:
+            touched = model.touch_pk(pk)
+        except (TypeError, ValueError):
+            touched = False
+        if not touched:
+            raise NotFoundError(f'{self.activity_entity_type.title()} not found.')
+        return int(pk)
 
     @action(detail=True, methods=['post'])
     def log_call(self, request, pk=None):
         """Log a call for the entity"""
-        obj = self.get_object()
         serializer = LogCallSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        call_log = CallLog.objects.create(
-            entity_type=self.activity_entity_type,
-            entity_id=obj.id,
-            outcome=serializer.validated_data['outcome'],
-            notes=serializer.validated_data.get('notes', '')
-        )
-
-        # Update entity's updated_at
-        obj.save()
+        with transaction.atomic():
+            call_log = CallLog.objects.create(
+                entity_type=self.activity_entity_type,
+                entity_id=self.touch_entity(pk),
+                outcome=serializer.validated_data['outcome'],
+                notes=serializer.validated_data.get('notes', '')
+            )
 
         return Response({
             'id': call_log.id,
@@ -42,18 +117,15 @@ class ActivityTrackingMixin:
     @action(detail=True, methods=['post'])
     def add_note(self, request, pk=None):
         """Add a note to the entity"""
-        obj = self.get_object()
         serializer = AddNoteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        note = Note.objects.create(
-            entity_type=self.activity_entity_type,
-            entity_id=obj.id,
-            content=serializer.validated_data['content']
-        )
-
-        # Update entity's updated_at
-        obj.save()
+        with transaction.atomic():
+            note = Note.objects.create(
+                entity_type=self.activity_entity_type,
+                entity_id=self.touch_entity(pk),
+                content=serializer.validated_data['content']
+            )
 
         return Response({
             'id': note.id,
@@ -2,14 +2,19 @@
 Settings Views (Channels, Sources, SubSources, Campaigns, Users, Bank Products, System Settings)
 """
 
+import uuid
+
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q
 
+from core.cache import reference_cache
+from core.exceptions import NotFoundError, ValidationError
 from core.models import Channel, Source, SubSource, Campaign, User, BankProduct, EiborRate, SystemSettings
 from api.pagination import StandardPagination
+from api.services import BankPricingService, EiborService, MortgageService
 from api.serializers.settings import (
     ChannelSerializer,
     SourceSerializer,
@@ -19,7 +24,9 @@ from api.serializers.settings import (
     UserCreateSerializer,
     UserUpdateSerializer,
     BankProductSerializer,
+    MortgageQuoteSerializer,
     EiborRateSerializer,
+    EiborSeriesQuerySerializer,
     SystemSettingsSerializer,
 )
 
@@ -34,6 +41,11 @@ class ChannelViewSet(viewsets.ModelViewSet):
     queryset = Channel.objects.all()
     serializer_class = ChannelSerializer
 
+    def list(self, request, *args, **kwargs):
+        """Served from the reference data cache"""
+        serializer = self.get_serializer(reference_cache.get('channels'), many=True)
+        return Response(serializer.data)
+
 
 class SourceViewSet(viewsets.ModelViewSet):
     """
@@ -51,6 +63,15 @@ class SourceViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(channel_id=channel_id)
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """Served from the reference data cache"""
+        sources = reference_cache.get('sources')
+        channel_id = request.query_params.get('channel_id')
+        if channel_id:
+            sources = [source for source in sources if source.channel_id == channel_id]
+        serializer = self.get_serializer(sources, many=True)
+        return Response(serializer.data)
+
 
 class SubSourceViewSet(viewsets.ModelViewSet):
     """
@@ -68,6 +89,19 @@ class SubSourceViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(source_id=source_id)
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """Served from the reference data cache"""
+        sub_sources = reference_cache.get('sub_sources')
+        source_id = request.query_params.get('source_id')
+        if source_id:
+            try:
+                source_id = uuid.UUID(source_id)
+            except ValueError:
+                raise ValidationError('source_id must be a UUID')
+            sub_sources = [sub for sub in sub_sources if sub.source_id == source_id]
+        serializer = self.get_serializer(sub_sources, many=True)
+        return Response(serializer.data)
+
 
 class CampaignViewSet(viewsets.ModelViewSet):
     """
@@ -79,6 +113,11 @@ class CampaignViewSet(viewsets.ModelViewSet):
     queryset = Campaign.objects.all()
     serializer_class = CampaignSerializer
 
+    def list(self, request, *args, **kwargs):
+        """Served from the reference data cache"""
+        serializer = self.get_serializer(reference_cache.get('campaigns'), many=True)
+        return Response(serializer.data)
+
 
 class UserViewSet(viewsets.ModelViewSet):
     """
@@ -100,6 +139,10 @@ class UserViewSet(viewsets.ModelViewSet):
 class BankProductViewSet(viewsets.ModelViewSet):
     """
     ViewSet for BankProduct CRUD operations with filtering.
+
+    Custom actions:
+    - compare: GET /api/bank-products/compare/?loan_amount=&term_years=[&property_value=&ids=1,2]
+    - schedule: GET /api/bank-products/{id}/schedule/?loan_amount=&term_years=[&granularity=yearly]
     """
 
     permission_classes = [IsAuthenticated]
@@ -168,56 +211,103 @@ class BankProductViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def perform_create(self, serializer):
+        """Create product and price it from the latest EIBOR"""
+        BankPricingService.reprice_product(serializer.save())
+
+    def perform_update(self, serializer):
+        """Update product and re-price it - margin, floor or tenor may have changed"""
+        BankPricingService.reprice_product(serializer.save())
+
+    @action(detail=False, methods=['get'])
+    def compare(self, request):
+        """Monthly payments and total cost of every active product for one loan"""
+        serializer = MortgageQuoteSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        return Response(MortgageService.compare(
+            params['loan_amount'],
+            params['term_years'],
+            property_value=params.get('property_value'),
+            product_ids=params.get('ids'),
+        ))
+
+    @action(detail=True, methods=['get'])
+    def schedule(self, request, pk=None):
+        """Amortization schedule of one product - delegates to MortgageService"""
+        # Products come from the reference cache, so the pk never goes through get_object()
+        try:
+            product_id = int(pk)
+        except ValueError:
+            raise NotFoundError('Bank product not found')
+
+        serializer = MortgageQuoteSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        return Response(MortgageService.schedule(
+            product_id,
+            params['loan_amount'],
+            params['term_years'],
+            property_value=params.get('property_value'),
+            granularity=params['granularity'],
+        ))
+
 
 class EiborRateViewSet(viewsets.ModelViewSet):
     """
     ViewSet for EiborRate CRUD operations.
+
+    list: GET /api/eibor-rates/ (paginated, ?term=&date_from=&date_to=)
+
+    Custom actions:
+    - series: GET /api/eibor-rates/series/?term=3_months&date_from=&date_to=&interval=daily|weekly|monthly
     """
 
     permission_classes = [IsAuthenticated]
-    pagination_class = None
-    queryset = EiborRate.objects.all()
+    pagination_class = StandardPagination
     serializer_class = EiborRateSerializer
 
+    def get_queryset(self):
+        queryset = EiborRate.objects.all()
+
+        term = self.request.query_params.get('term')
+        if term:
+            queryset = queryset.filter(term=term)
+
+        date_from = self.request.query_params.get('date_from')
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+
+        date_to = self.request.query_params.get('date_to')
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def series(self, request):
+        """Downsampled rate history for charts - delegates to EiborService"""
+        serializer = EiborSeriesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        return Response(EiborService.series(
+            terms=sorted(params.get('term', [])),
+            start=params.get('date_from'),
+            end=params.get('date_to'),
+            interval=params['interval'],
+        ))
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def eibor_rates_latest(request):
     """
-    GET: Retrieve the latest EIBOR rates for all terms (single query)
-    """
-    from django.db import connection
-
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT term, rate, date FROM eibor_rates
-            WHERE date = (SELECT MAX(date) FROM eibor_rates)
-        """)
-        rows = cursor.fetchall()
-
-    if not rows:
-        return Response({
-            'overnight': None,
-            'oneWeek': None,
-            'oneMonth': None,
-            'threeMonths': None,
-            'sixMonths': None,
-            'oneYear': None,
-            'lastUpdated': None,
-        })
-
-    rate_map = {row[0]: float(row[1]) for row in rows}
-    latest_date = rows[0][2]
-
-    return Response({
-        'overnight': rate_map.get('overnight'),
-        'oneWeek': rate_map.get('1_week'),
-        'oneMonth': rate_map.get('1_month'),
-        'threeMonths': rate_map.get('3_months'),
-        'sixMonths': rate_map.get('6_months'),
-        'oneYear': rate_map.get('1_year'),
-        'lastUpdated': latest_date.isoformat() if latest_date else None,
-    })
+    GET: Retrieve the latest EIBOR rate of every term (served from the snapshot cache)
+    """
+    return Response(EiborService.latest())
 
 
 @api_view(['GET', 'PATCH'])
@@ -242,3 +332,12 @@ def system_settings(request):
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cache_stats(request):
+    """
+    GET: Reference data cache hit/miss counters for the serving process
+    """
+    return Response(reference_cache.stats())
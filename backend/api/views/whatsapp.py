@@ -2,79 +2,49 @@
 WhatsApp Message Views
 """
 
-from django.db.models import Max, Q
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from core.models import WhatsAppMessage, Lead, Client
-from api.serializers.whatsapp import WhatsAppMessageSerializer, SendMessageSerializer
+from core.profiling import profile_section
+from core.models import WhatsAppMessage, WhatsAppConversation, Lead, Client
+from api.pagination import StandardPagination
+from api.services import WhatsAppService
+from api.serializers.whatsapp import (
+    WhatsAppMessageSerializer,
+    WhatsAppConversationSerializer,
+    SendMessageSerializer,
+    ThreadSerializer,
+)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def whatsapp_conversations(request):
     """
-    Get all WhatsApp conversations (grouped by lead/client).
-    Returns a list of conversations with the contact name, last message, and unread count.
+    Get all WhatsApp conversations, most recent activity first.
+    Reads the denormalized conversation table in a single query.
+
+    Query params:
+    - page / page_size: Paginate the inbox (unpaginated list when omitted)
     """
-    conversations = []
-
-    # Get unique lead conversations
-    lead_ids = WhatsAppMessage.objects.filter(
-        lead__isnull=False
-    ).values_list('lead_id', flat=True).distinct()
-
-    for lead_id in lead_ids:
-        lead = Lead.objects.filter(id=lead_id).first()
-        if not lead:
-            continue
-
-        last_message = WhatsAppMessage.objects.filter(
-            lead_id=lead_id
-        ).order_by('-created_at').first()
-
-        if last_message:
-            conversations.append({
-                'entityType': 'lead',
-                'entityId': lead.id,
-                'name': f"{lead.first_name} {lead.last_name}",
-                'phone': lead.phone,
-                'lastMessage': last_message.content[:50] + ('...' if len(last_message.content) > 50 else ''),
-                'lastMessageTime': last_message.created_at,
-                'lastMessageDirection': last_message.direction,
-            })
-
-    # Get unique client conversations
-    client_ids = WhatsAppMessage.objects.filter(
-        client__isnull=False
-    ).values_list('client_id', flat=True).distinct()
-
-    for client_id in client_ids:
-        client = Client.objects.filter(id=client_id).first()
-        if not client:
-            continue
-
-        last_message = WhatsAppMessage.objects.filter(
-            client_id=client_id
-        ).order_by('-created_at').first()
-
-        if last_message:
-            conversations.append({
-                'entityType': 'client',
-                'entityId': client.id,
-                'name': f"{client.first_name} {client.last_name}",
-                'phone': client.phone,
-                'lastMessage': last_message.content[:50] + ('...' if len(last_message.content) > 50 else ''),
-                'lastMessageTime': last_message.created_at,
-                'lastMessageDirection': last_message.direction,
-            })
-
-    # Sort by last message time (most recent first)
-    conversations.sort(key=lambda x: x['lastMessageTime'], reverse=True)
-
-    return Response(conversations)
+    conversations = WhatsAppConversation.objects.select_related(
+        'lead', 'client'
+    ).order_by('-last_message_at', '-id')
+
+    if 'page' in request.query_params or 'page_size' in request.query_params:
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(conversations, request)
+        serializer = WhatsAppConversationSerializer(page, many=True)
+        with profile_section('serialize'):
+            data = serializer.data
+        return paginator.get_paginated_response(data)
+
+    serializer = WhatsAppConversationSerializer(conversations, many=True)
+    with profile_section('serialize'):
+        data = serializer.data
+    return Response(data)
 
 
 @api_view(['GET'])
@@ -105,6 +75,25 @@ def whatsapp_messages(request):
     return Response(serializer.data)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def whatsapp_mark_read(request):
+    """
+    Clear a thread's unread badge in the inbox - sent when the thread is
+    viewed, so fetching messages (polling, prefetches, retries) stays read-only.
+
+    Body:
+    - lead_id or client_id: The thread to mark as read
+    """
+    serializer = ThreadSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    WhatsAppService.mark_read(
+        lead_id=serializer.validated_data.get('lead_id'),
+        client_id=serializer.validated_data.get('client_id'),
+    )
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def whatsapp_send(request):
@@ -122,11 +111,11 @@ def whatsapp_send(request):
     client_id = serializer.validated_data.get('client_id')
     content = serializer.validated_data['content']
 
-    # Get the phone number from lead or client
+    # Resolve the lead or client the thread belongs to
+    lead = client = None
     if lead_id:
         try:
             lead = Lead.objects.get(id=lead_id)
-            phone = lead.phone
         except Lead.DoesNotExist:
             return Response(
                 {'error': 'Lead not found'},
@@ -135,21 +124,19 @@ def whatsapp_send(request):
     else:
         try:
             client = Client.objects.get(id=client_id)
-            phone = client.phone
         except Client.DoesNotExist:
             return Response(
                 {'error': 'Client not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-    # Create the outbound message
-    message = WhatsAppMessage.objects.create(
+    # Store the outbound message and update the conversation summary
+    message = WhatsAppService.record_message(
         direction='outbound',
-        phone=phone,
         content=content,
         status='sent',
-        lead_id=lead_id,
-        client_id=client_id,
+        lead=lead,
+        client=client,
     )
 
     return Response(
@@ -175,11 +162,11 @@ def whatsapp_simulate_inbound(request):
     client_id = serializer.validated_data.get('client_id')
     content = serializer.validated_data['content']
 
-    # Get the phone number from lead or client
+    # Resolve the lead or client the thread belongs to
+    lead = client = None
     if lead_id:
         try:
             lead = Lead.objects.get(id=lead_id)
-            phone = lead.phone
         except Lead.DoesNotExist:
             return Response(
                 {'error': 'Lead not found'},
@@ -188,21 +175,19 @@ def whatsapp_simulate_inbound(request):
     else:
         try:
             client = Client.objects.get(id=client_id)
-            phone = client.phone
         except Client.DoesNotExist:
             return Response(
                 {'error': 'Client not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-    # Create the inbound message
-    message = WhatsAppMessage.objects.create(
+    # Store the inbound message and update the conversation summary
+    message = WhatsAppService.record_message(
         direction='inbound',
-        phone=phone,
         content=content,
         status='delivered',
-        lead_id=lead_id,
-        client_id=client_id,
+        lead=lead,
+        client=client,
     )
 
     return Response(
@@ -6,6 +6,10 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
+        # Invalidate cached reference data when its tables change
+        from core.cache import reference_cache
+        reference_cache.connect_signals()
+
         # Pre-warm database connection pool on server start
         # This moves the ~1.5s SSL connection delay from first request to startup
         import sys
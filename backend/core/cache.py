@@ -0,0 +1,308 @@
+"""
+Reference Data Cache
+
+Versioned read-through cache for small, rarely-changing reference tables
+(channels, sources, sub-sources, campaigns, bank products) and small
+structures derived from them (bank name -> icon, the compiled product
+catalogue used for matching).
+
+Two tiers:
+- local: per-process LRU (cachetools) with a short TTL, no network at all
+- shared: optional Django cache alias (e.g. Redis) shared by all workers
+
+Every dataset has a version number kept in the shared tier. Saving or
+deleting a model a dataset depends on bumps that version after the
+transaction commits, so other workers pick up the change from the shared
+tier at the latest when their local entry expires (LOCAL_TTL seconds).
+Without a shared tier, invalidation only reaches the current process and
+other processes rely on LOCAL_TTL.
+
+Bulk queryset.update()/bulk_create() do not send signals - call
+reference_cache.invalidate(name) after those.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from cachetools import TTLCache
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'LOCAL_MAXSIZE': 128,   # Datasets kept per process
+    'LOCAL_TTL': 30,        # Seconds before re-checking the shared tier
+    'SHARED_CACHE': None,   # Django cache alias, None for local-only
+    'SHARED_TTL': 3600,     # Seconds a dataset lives in the shared tier
+    'KEY_PREFIX': 'refcache',
+}
+
+
+class ReferenceCache:
+    """
+    Registry of cached datasets.
+
+    Usage:
+        reference_cache.register('channels', load_channels, models=['core.Channel'])
+        channels = reference_cache.get('channels')
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._dependencies = defaultdict(set)  # model label -> dataset names
+        self._local = None
+        self._lock = threading.RLock()
+        self._stats = defaultdict(lambda: defaultdict(int))
+
+    # -------------------------------------------------------------------------
+    # Configuration
+    # -------------------------------------------------------------------------
+
+    @property
+    def config(self) -> dict:
+        return {**DEFAULTS, **getattr(settings, 'REFERENCE_CACHE', {})}
+
+    @property
+    def local(self) -> TTLCache:
+        if self._local is None:
+            with self._lock:
+                if self._local is None:
+                    config = self.config
+                    self._local = TTLCache(maxsize=config['LOCAL_MAXSIZE'], ttl=config['LOCAL_TTL'])
+        return self._local
+
+    @property
+    def shared(self):
+        alias = self.config['SHARED_CACHE']
+        return caches[alias] if alias else None
+
+    def register(self, name: str, loader, models: list):
+        """
+        Register a dataset.
+
+        Args:
+            name: Dataset name used with get()/invalidate()
+            loader: Zero-argument callable returning a picklable value
+            models: Model labels ('core.Channel') whose changes invalidate it
+        """
+        self._loaders[name] = loader
+        for label in models:
+            self._dependencies[label].add(name)
+
+    def connect_signals(self):
+        """Invalidate datasets on save/delete of the models they depend on (call from AppConfig.ready)"""
+        for label in self._dependencies:
+            model = apps.get_model(label)
+            post_save.connect(self._on_change, sender=model, dispatch_uid=f'refcache-save-{label}')
+            post_delete.connect(self._on_change, sender=model, dispatch_uid=f'refcache-delete-{label}')
+
+    # -------------------------------------------------------------------------
+    # Read path
+    # -------------------------------------------------------------------------
+
+    def get(self, name: str):
+        """Return a dataset, loading it from the database on a miss"""
+        if name not in self._loaders:
+            raise KeyError(f'Unknown reference dataset: {name}')
+
+        with self._lock:
+            entry = self.local.get(name)
+        if entry is not None:
+            self._stats[name]['local_hits'] += 1
+            return entry[1]
+
+        version = self._get_version(name)
+        value = self._shared_get(self._value_key(name, version))
+        if value is not None:
+            self._stats[name]['shared_hits'] += 1
+        else:
+            self._stats[name]['misses'] += 1
+            value = self._loaders[name]()
+            self._shared_set(self._value_key(name, version), value)
+
+        with self._lock:
+            self.local[name] = (version, value)
+        return value
+
+    # -------------------------------------------------------------------------
+    # Invalidation
+    # -------------------------------------------------------------------------
+
+    def invalidate(self, name: str):
+        """Drop a dataset everywhere by bumping its version"""
+        self._stats[name]['invalidations'] += 1
+        with self._lock:
+            self.local.pop(name, None)
+
+        shared = self.shared
+        if shared is None:
+            return
+        try:
+            shared.incr(self._version_key(name))
+        except ValueError:
+            # Version key missing or evicted - a fresh version orphans old values
+            shared.set(self._version_key(name), time.time_ns(), None)
+        except Exception:
+            logger.warning('Reference cache: failed to bump version of %s', name, exc_info=True)
+
+    def invalidate_all(self):
+        for name in self._loaders:
+            self.invalidate(name)
+
+    def _on_change(self, sender, **kwargs):
+        names = self._dependencies.get(sender._meta.label, ())
+        for name in names:
+            # After commit, so a concurrent read can't re-cache the old rows
+            transaction.on_commit(lambda name=name: self.invalidate(name))
+
+    # -------------------------------------------------------------------------
+    # Metrics
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Per-dataset hit/miss counters for this process"""
+        result = {}
+        for name in self._loaders:
+            counters = self._stats[name]
+            hits = counters['local_hits'] + counters['shared_hits']
+            lookups = hits + counters['misses']
+            result[name] = {
+                'localHits': counters['local_hits'],
+                'sharedHits': counters['shared_hits'],
+                'misses': counters['misses'],
+                'invalidations': counters['invalidations'],
+                'hitRatio': round(hits / lookups, 4) if lookups else None,
+            }
+        return result
+
+    def reset_stats(self):
+        self._stats.clear()
+
+    # -------------------------------------------------------------------------
+    # Shared tier helpers - failures degrade to a miss instead of an error
+    # -------------------------------------------------------------------------
+
+    def _version_key(self, name: str) -> str:
+        return f"{self.config['KEY_PREFIX']}:{name}:version"
+
+    def _value_key(self, name: str, version) -> str:
+        return f"{self.config['KEY_PREFIX']}:{name}:v{version}"
+
+    def _get_version(self, name: str):
+        shared = self.shared
+        if shared is None:
+            return 0
+        try:
+            version = shared.get(self._version_key(name))
+            if version is None:
+                version = time.time_ns()
+                if not shared.add(self._version_key(name), version, None):
+                    version = shared.get(self._version_key(name), version)
+            return version
+        except Exception:
+            logger.warning('Reference cache: shared tier unavailable', exc_info=True)
+            return 0
+
+    def _shared_get(self, key: str):
+        shared = self.shared
+        if shared is None:
+            return None
+        try:
+            return shared.get(key)
+        except Exception:
+            logger.warning('Reference cache: shared tier unavailable', exc_info=True)
+            return None
+
+    def _shared_set(self, key: str, value):
+        shared = self.shared
+        if shared is None:
+            return
+        try:
+            shared.set(key, value, self.config['SHARED_TTL'])
+        except Exception:
+            logger.warning('Reference cache: shared tier unavailable', exc_info=True)
+
+
+reference_cache = ReferenceCache()
+
+
+# =============================================================================
+# Datasets
+# =============================================================================
+
+def _load_channels():
+    from core.models import Channel
+    return list(Channel.objects.all())
+
+
+def _load_sources():
+    from core.models import Source
+    return list(Source.objects.all())
+
+
+def _load_sub_sources():
+    from core.models import SubSource
+    return list(SubSource.objects.select_related('source'))
+
+
+def _load_campaigns():
+    from core.models import Campaign
+    return list(Campaign.objects.all())
+
+
+def _load_bank_products():
+    from core.models import BankProduct
+    return list(BankProduct.objects.all())
+
+
+def _load_bank_catalogue():
+    """Active products compiled for vectorized matching (see core.matching)"""
+    from core.matching import ProductCatalogue
+    from core.models import BankProduct
+    products = BankProduct.objects.filter(is_active=True).order_by('id')
+    return ProductCatalogue.from_products(products, eibor=reference_cache.get('eibor_snapshot'))
+
+
+def _load_eibor_snapshot():
+    """
+    Latest EIBOR fixing of every term:
+    {'date': most recent date, 'rates': {term: rate}, 'dates': {term: date}}
+    """
+    from django.db.models import Max, Q
+    from core.models import EiborRate
+    latest = dict(EiborRate.objects.values('term').annotate(latest=Max('date')).values_list('term', 'latest'))
+    snapshot = {'date': max(latest.values(), default=None), 'rates': {}, 'dates': {}}
+    if latest:
+        lookup = Q()
+        for term, day in latest.items():
+            lookup |= Q(term=term, date=day)
+        for term, rate, day in EiborRate.objects.filter(lookup).values_list('term', 'rate', 'date'):
+            snapshot['rates'][term] = float(rate)
+            snapshot['dates'][term] = day
+    return snapshot
+
+
+def _load_bank_icons():
+    """bank_name -> icon URL, the first product of a bank with an icon wins"""
+    from core.models import BankProduct
+    icons = {}
+    rows = BankProduct.objects.exclude(bank_icon__isnull=True).exclude(bank_icon='').order_by('id')
+    for bank_name, bank_icon in rows.values_list('bank_name', 'bank_icon'):
+        icons.setdefault(bank_name, bank_icon)
+    return icons
+
+
+reference_cache.register('channels', _load_channels, models=['core.Channel'])
+reference_cache.register('sources', _load_sources, models=['core.Source'])
+reference_cache.register('sub_sources', _load_sub_sources, models=['core.SubSource', 'core.Source'])
+reference_cache.register('campaigns', _load_campaigns, models=['core.Campaign'])
+reference_cache.register('bank_products', _load_bank_products, models=['core.BankProduct'])
+reference_cache.register('bank_catalogue', _load_bank_catalogue, models=['core.BankProduct', 'core.EiborRate'])
+reference_cache.register('eibor_snapshot', _load_eibor_snapshot, models=['core.EiborRate'])
+reference_cache.register('bank_icons', _load_bank_icons, models=['core.BankProduct'])
@@ -0,0 +1,126 @@
+"""
+Eligibility Policy
+
+Affordability rules behind Client.estimated_dbr, estimated_ltv,
+max_loan_amount and eligibility_status. Thresholds come from
+settings.ELIGIBILITY_POLICY so they can change without a code change.
+
+The rules are evaluated on NumPy arrays, so recalculating one client on
+save and the whole book in a batch share one code path:
+
+    policy = EligibilityPolicy.from_settings()
+    policy.apply(client)                          # single instance
+    result = policy.evaluate(salary, liabilities, loan, property_value, is_citizen)
+"""
+
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+
+DEFAULTS = {
+    'MAX_DBR': 50,              # Existing liabilities, % of monthly salary
+    'MAX_LTV_CITIZEN': 85,      # Loan-to-value cap, % - UAE nationals
+    'MAX_LTV_RESIDENT': 80,     # Loan-to-value cap, % - everyone else
+    'MAX_LOAN_DBR': 50,         # Share of salary available for instalments, %
+    'MAX_LOAN_MONTHS': 240,     # Instalments the max loan estimate assumes
+}
+
+# Largest value the DecimalField(max_digits=5, decimal_places=2) ratios can hold
+RATIO_CAP = 999.99
+
+
+class EligibilityPolicy:
+    """Affordability thresholds with vectorized evaluation"""
+
+    def __init__(self, max_dbr, max_ltv_citizen, max_ltv_resident, max_loan_dbr, max_loan_months):
+        self.max_dbr = float(max_dbr)
+        self.max_ltv_citizen = float(max_ltv_citizen)
+        self.max_ltv_resident = float(max_ltv_resident)
+        self.max_loan_dbr = float(max_loan_dbr)
+        self.max_loan_months = int(max_loan_months)
+
+    @classmethod
+    def from_settings(cls, **overrides) -> 'EligibilityPolicy':
+        """
+        Policy from settings.ELIGIBILITY_POLICY.
+
+        Args:
+            overrides: Lower-case threshold names (max_dbr=45) replacing
+                the configured values, e.g. for what-if runs
+        """
+        config = {**DEFAULTS, **getattr(settings, 'ELIGIBILITY_POLICY', {})}
+        values = {key.lower(): value for key, value in config.items()}
+        values.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**values)
+
+    def as_dict(self) -> dict:
+        return {
+            'maxDbr': self.max_dbr,
+            'maxLtvCitizen': self.max_ltv_citizen,
+            'maxLtvResident': self.max_ltv_resident,
+            'maxLoanDbr': self.max_loan_dbr,
+            'maxLoanMonths': self.max_loan_months,
+        }
+
+    def evaluate(self, salary, liabilities, loan, property_value, is_citizen) -> dict:
+        """
+        Evaluate the rules elementwise. Missing inputs are NaN.
+
+        Args:
+            salary, liabilities, loan, property_value: Float arrays
+            is_citizen: Bool array
+
+        Returns:
+            Dict of arrays: 'dbr' and 'ltv' (NaN when not computable),
+            'max_loan' (NaN when salary is unknown) and bool 'eligible'
+        """
+        salary = np.nan_to_num(np.asarray(salary, dtype=float), nan=0.0)
+        liabilities = np.nan_to_num(np.asarray(liabilities, dtype=float), nan=0.0)
+        loan = np.nan_to_num(np.asarray(loan, dtype=float), nan=0.0)
+        property_value = np.nan_to_num(np.asarray(property_value, dtype=float), nan=0.0)
+        is_citizen = np.asarray(is_citizen, dtype=bool)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            has_dbr = (salary > 0) & (liabilities != 0)
+            dbr = np.where(has_dbr, np.minimum(liabilities / salary * 100, RATIO_CAP), np.nan)
+
+            has_ltv = (loan != 0) & (property_value > 0)
+            ltv = np.where(has_ltv, np.minimum(loan / property_value * 100, RATIO_CAP), np.nan)
+
+        max_instalment = salary * (self.max_loan_dbr / 100) - liabilities
+        max_loan = np.where(salary > 0, np.maximum(max_instalment, 0) * self.max_loan_months, np.nan)
+
+        ltv_limit = np.where(is_citizen, self.max_ltv_citizen, self.max_ltv_resident)
+        dbr_ok = ~has_dbr | (dbr <= self.max_dbr)
+        ltv_ok = ~has_ltv | (ltv <= ltv_limit)
+
+        return {'dbr': dbr, 'ltv': ltv, 'max_loan': max_loan, 'eligible': dbr_ok & ltv_ok}
+
+    def apply(self, client):
+        """Set the computed eligibility fields on one client (does not save)"""
+        result = self.evaluate(
+            [to_float(client.monthly_salary)],
+            [to_float(client.monthly_liabilities)],
+            [to_float(client.loan_amount)],
+            [to_float(client.estimated_property_value)],
+            [client.residency_status == 'citizen'],
+        )
+        client.estimated_dbr = to_decimal(result['dbr'][0])
+        client.estimated_ltv = to_decimal(result['ltv'][0])
+        # Unknown salary leaves the previous estimate untouched
+        max_loan = to_decimal(result['max_loan'][0])
+        if max_loan is not None:
+            client.max_loan_amount = max_loan
+        client.eligibility_status = 'eligible' if result['eligible'][0] else 'notEligible'
+
+
+def to_float(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+def to_decimal(value):
+    """Float -> 2dp Decimal as stored by the model, NaN -> None"""
+    if value is None or np.isnan(value):
+        return None
+    return Decimal(f'{value:.2f}')
@@ -0,0 +1,223 @@
+"""
+Background Jobs
+
+A small job queue on the `jobs` table (core.models.Job) for side effects
+that shouldn't hold a request thread: storage deletes, bank re-pricing,
+analytics refreshes. Requests insert a row and respond; `manage.py run_jobs`
+workers claim and run it.
+
+    @register('storage.delete_file')
+    def delete_file(file_url):
+        ...
+
+    enqueue('storage.delete_file', {'file_url': url})
+    enqueue('analytics.refresh', idempotency_key='analytics.refresh')
+
+- Enqueueing inside a transaction only makes the job visible on commit.
+- Jobs with the same idempotency_key are deduplicated while one is queued.
+- A claimed job is locked for VISIBILITY_TIMEOUT seconds; a worker that
+  dies mid-job leaves it to be claimed again once the lock expires.
+- Failures are retried with exponential backoff (plus jitter) up to
+  max_attempts, then the job is marked failed with its traceback.
+
+Handlers take the payload as keyword arguments and must be idempotent,
+since a job can run more than once.
+"""
+
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'VISIBILITY_TIMEOUT': 300,  # Seconds a claimed job stays locked to its worker
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 10,         # Seconds before the first retry, doubled per attempt
+    'BACKOFF_MAX': 3600,
+    'POLL_INTERVAL': 1.0,       # Idle sleep between polls, seconds
+    'RETENTION_DAYS': 7,        # Succeeded jobs older than this are purged
+}
+
+PURGE_INTERVAL = 3600
+CLAIM_CANDIDATES = 10
+
+_registry = {}
+
+
+def get_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, 'JOBS', {})}
+
+
+def register(name: str):
+    """Decorator registering a job handler under a name"""
+    def decorator(fn):
+        _registry[name] = fn
+        return fn
+    return decorator
+
+
+def enqueue(name: str, payload: dict = None, idempotency_key: str = None,
+            delay: float = 0, max_attempts: int = None) -> Job:
+    """
+    Queue a job.
+
+    Args:
+        name: Registered handler name
+        payload: JSON-serializable keyword arguments for the handler
+        idempotency_key: Return the already-queued job with this key instead of adding one
+        delay: Seconds before the job may run
+        max_attempts: Override JOBS['MAX_ATTEMPTS']
+
+    Returns:
+        The queued Job (an existing one when deduplicated)
+    """
+    if name not in _registry:
+        raise ValueError(f'Unknown job: {name}')
+
+    values = {
+        'name': name,
+        'payload': payload or {},
+        'idempotency_key': idempotency_key,
+        'max_attempts': max_attempts or get_config()['MAX_ATTEMPTS'],
+        'run_at': timezone.now() + timedelta(seconds=delay),
+    }
+    if idempotency_key is None:
+        return Job.objects.create(**values)
+
+    existing = Job.objects.filter(idempotency_key=idempotency_key, status='queued').first()
+    if existing is not None:
+        return existing
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**values)
+    except IntegrityError:
+        # Lost a race with a concurrent enqueue of the same key
+        return Job.objects.get(idempotency_key=idempotency_key, status='queued')
+
+
+def backoff(attempts: int, config: dict = None) -> float:
+    """Seconds before retry number `attempts`, with jitter"""
+    config = config or get_config()
+    delay = min(config['BACKOFF_BASE'] * 2 ** (attempts - 1), config['BACKOFF_MAX'])
+    return delay * random.uniform(0.5, 1.0)
+
+
+class Worker:
+    """Claims and runs due jobs, one at a time"""
+
+    def __init__(self, name: str = None, config: dict = None):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.config = config or get_config()
+        self.stopping = False
+        self._last_purge = 0.0
+
+    def claim(self):
+        """
+        Lock the next due job to this worker: queued jobs whose run_at has
+        passed, or running jobs whose visibility timeout expired.
+        The conditional UPDATE makes the claim atomic across workers.
+
+        An expired job that already used max_attempts is marked failed
+        instead - its handler keeps killing the worker (OOM, SIGKILL).
+        """
+        now = timezone.now()
+        due = (
+            Job.objects
+            .filter(Q(status='queued', run_at__lte=now) | Q(status='running', locked_until__lt=now))
+            .order_by('run_at', 'id')
+            .values_list('id', 'name', 'status', 'attempts', 'max_attempts')[:CLAIM_CANDIDATES]
+        )
+        locked_until = now + timedelta(seconds=self.config['VISIBILITY_TIMEOUT'])
+        for job_id, name, job_status, attempts, max_attempts in due:
+            if job_status == 'running' and attempts >= max_attempts:
+                expired = Job.objects.filter(id=job_id, status='running', attempts=attempts).update(
+                    status='failed', locked_until=None, finished_at=now,
+                    last_error=f'Visibility timeout expired after {attempts} attempts',
+                )
+                if expired:
+                    logger.error('Job %s #%s failed: visibility timeout expired after %d attempts',
+                                 name, job_id, attempts)
+                continue
+            claimed = Job.objects.filter(id=job_id, status=job_status, attempts=attempts).update(
+                status='running', attempts=attempts + 1, locked_until=locked_until, locked_by=self.name,
+            )
+            if claimed:
+                return Job.objects.get(id=job_id)
+        return None
+
+    def run(self, job: Job):
+        """Run a claimed job and record the outcome"""
+        # Matching attempts: a worker whose lock expired and was re-claimed
+        # must not overwrite the newer attempt's outcome
+        mine = Job.objects.filter(id=job.id, status='running', attempts=job.attempts)
+        try:
+            handler = _registry.get(job.name)
+            if handler is None:
+                raise LookupError(f'Unknown job: {job.name}')
+            handler(**job.payload)
+        except Exception:
+            error = traceback.format_exc()
+            if job.attempts >= job.max_attempts:
+                logger.error('Job %s #%s failed after %d attempts', job.name, job.id, job.attempts, exc_info=True)
+                mine.update(status='failed', last_error=error, locked_until=None, finished_at=timezone.now())
+                return
+            delay = backoff(job.attempts, self.config)
+            logger.warning('Job %s #%s failed (attempt %d), retrying in %.0fs',
+                           job.name, job.id, job.attempts, delay, exc_info=True)
+            try:
+                with transaction.atomic():
+                    mine.update(status='queued', last_error=error, locked_until=None,
+                                run_at=timezone.now() + timedelta(seconds=delay))
+            except IntegrityError:
+                # A job with the same key was queued meanwhile and will redo the work
+                mine.update(status='failed', locked_until=None, finished_at=timezone.now(),
+                            last_error=f'{error}\nSuperseded by a queued job with the same idempotency key')
+        else:
+            mine.update(status='succeeded', last_error='', locked_until=None, finished_at=timezone.now())
+
+    def run_once(self) -> bool:
+        """Claim and run one job; False when none is due"""
+        job = self.claim()
+        if job is None:
+            return False
+        self.run(job)
+        return True
+
+    def run_forever(self):
+        """Poll until self.stopping is set (the current job always finishes)"""
+        logger.info('Job worker %s started', self.name)
+        while not self.stopping:
+            close_old_connections()
+            if not self.run_once():
+                self.purge()
+                time.sleep(self.config['POLL_INTERVAL'])
+        logger.info('Job worker %s stopped', self.name)
+
+    def purge(self):
+        """Delete old succeeded jobs, at most once per PURGE_INTERVAL"""
+        if time.monotonic() - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = timezone.now() - timedelta(days=self.config['RETENTION_DAYS'])
+        Job.objects.filter(status='succeeded', finished_at__lt=cutoff).delete()
+
+
+def run_pending(max_jobs: int = None) -> int:
+    """Run due jobs in this process until none are left (tests, `run_jobs --once`)"""
+    worker = Worker()
+    count = 0
+    while (max_jobs is None or count < max_jobs) and worker.run_once():
+        count += 1
+    return count
@@ -0,0 +1,445 @@
+"""
+Generate production-scale synthetic data for benchmarking.
+
+Creates a realistic funnel - leads (new / dropped / converted), clients
+(direct and converted), cases across every stage - with call logs, notes,
+status history, documents, bank forms and WhatsApp threads. Everything is
+written with bulk_create in batches, so 500k leads take minutes, not hours.
+
+Synthetic leads and clients use the SYNTHETIC_EMAIL_DOMAIN email domain and
+cases use the SY case number prefix, so --flush can remove them again.
+
+Usage:
+    python manage.py generate_synthetic_data --leads 500000 --clients 100000
+    python manage.py generate_synthetic_data --flush
+"""
+
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import (
+    BankForm, BankProduct, CallLog, Campaign, Case, CaseStageChange, Channel, Client,
+    ClientStatusChange, Document, Lead, LeadStatusChange, Note, Source, SubSource,
+    WhatsAppConversation, WhatsAppMessage, normalize_phone,
+)
+
+SYNTHETIC_EMAIL_DOMAIN = 'synthetic.rivo.test'
+SYNTHETIC_CASE_PREFIX = 'SY'
+
+FIRST_NAMES = [
+    'Ahmed', 'Fatima', 'Mohammed', 'Sara', 'Khalid', 'Aisha', 'Omar', 'Priya', 'Rahul', 'Maryam',
+    'Yousef', 'Layla', 'Hassan', 'Noura', 'Ali', 'Huda', 'John', 'Emma', 'Ravi', 'Anita',
+]
+LAST_NAMES = [
+    'Al Mansouri', 'Hassan', 'Rashid', 'Ahmed', 'Ibrahim', 'Khan', 'Youssef', 'Sharma', 'Al Falasi',
+    'Al Suwaidi', 'Nair', 'Smith', 'Patel', 'Al Hashimi', 'Menon', 'Haddad', 'Saleh', 'Fernandes',
+]
+INTENTS = [
+    "Clicked 'Free Mortgage Calculator'",
+    "Searched 'best mortgage rates dubai'",
+    'Completed eligibility check via chatbot',
+    "Replied 'INTERESTED' to broadcast",
+    "Clicked 'See New Rates' in email",
+    'Asked about investment property financing',
+]
+BANK_NAMES = ['ENBD', 'ADCB', 'FAB', 'Mashreq', 'DIB', 'ADIB', 'RAKBANK', 'CBD']
+MESSAGES = [
+    'Hi, I am interested in a mortgage',
+    'Can you share the latest rates?',
+    'Please call me after 5pm',
+    'I have sent the documents',
+    'Thanks, talk soon',
+]
+
+# (status, weight) - converted is derived from the requested client count
+LEAD_OUTCOMES = [('new', 60), ('dropped', 25)]
+CLIENT_STATUSES = [('active', 60), ('converted', 25), ('notProceeding', 10), ('notEligible', 5)]
+DOCUMENT_STATUSES = [('missing', 40), ('uploaded', 35), ('verified', 20), ('notApplicable', 5)]
+CASE_STAGES = [(stage, 10) for stage in Case.ACTIVE_STAGES] + [
+    ('disbursed', 15), ('declined', 8), ('withdrawn', 7),
+]
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create write the generated created_at/timestamp values instead of now()"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generate production-scale synthetic data for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leads', type=int, default=10000, help='Number of leads (default: 10000)')
+        parser.add_argument('--clients', type=int, default=2000, help='Number of clients (default: 2000)')
+        parser.add_argument('--calls', type=float, default=4, help='Average call logs per entity (default: 4)')
+        parser.add_argument('--notes', type=float, default=2, help='Average notes per entity (default: 2)')
+        parser.add_argument('--whatsapp', type=float, default=0.4,
+                            help='Share of leads/clients with a WhatsApp thread (default: 0.4)')
+        parser.add_argument('--days', type=int, default=365, help='Spread created_at over this many days')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert (default: 5000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible data')
+        parser.add_argument('--flush', action='store_true', help='Delete previously generated data and exit')
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            self.flush()
+            return
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.avg_calls = options['calls']
+        self.avg_notes = options['notes']
+        self.whatsapp_share = options['whatsapp']
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=options['days'])
+        self.counts = {}
+
+        self.ensure_reference_data()
+        self.case_number = Case.objects.filter(case_id__startswith=SYNTHETIC_CASE_PREFIX).count()
+        self.phone_number = Lead.objects.count() + Client.objects.count()
+
+        leads = options['leads']
+        clients = options['clients']
+        # Up to half of the clients come from converted leads, the rest are direct
+        converted_share = min(0.3, (clients / 2) / leads) if leads else 0
+
+        timestamped = (
+            Lead, Client, Case, CallLog, Note, LeadStatusChange, ClientStatusChange,
+            CaseStageChange, WhatsAppMessage,
+        )
+        with explicit_timestamps(*timestamped):
+            converted = 0
+            for offset in range(0, leads, self.batch_size):
+                size = min(self.batch_size, leads - offset)
+                converted += self.create_lead_batch(size, converted_share, clients - converted)
+                self.stdout.write(f'  leads: {offset + size}/{leads}')
+
+            remaining = clients - converted
+            for offset in range(0, remaining, self.batch_size):
+                size = min(self.batch_size, remaining - offset)
+                self.create_client_batch([None] * size)
+                self.stdout.write(f'  direct clients: {offset + size}/{remaining}')
+
+        for model, count in self.counts.items():
+            self.stdout.write(f'{model.__name__}: {count}')
+        self.stdout.write(self.style.SUCCESS('Synthetic data generated'))
+
+    # -------------------------------------------------------------------------
+    # Generators
+    # -------------------------------------------------------------------------
+
+    @transaction.atomic
+    def create_lead_batch(self, size, converted_share, clients_left):
+        statuses = [status for status, _ in LEAD_OUTCOMES]
+        weights = [weight for _, weight in LEAD_OUTCOMES]
+
+        leads = []
+        for _ in range(size):
+            created_at = self.random_time()
+            if clients_left > 0 and self.rng.random() < converted_share:
+                status = 'converted'
+                clients_left -= 1
+            else:
+                status = self.rng.choices(statuses, weights)[0]
+            first_name, last_name, email, phone = self.random_person()
+            leads.append(Lead(
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                phone=phone,
+                phone_digits=normalize_phone(phone),
+                source=self.rng.choice(self.sub_sources),
+                intent=self.rng.choice(INTENTS),
+                status=status,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        leads = self.bulk(Lead, leads)
+
+        status_changes = []
+        for lead in leads:
+            if lead.status == 'dropped':
+                status_changes.append(LeadStatusChange(
+                    lead=lead, type='dropped', notes='Not eligible', timestamp=self.after(lead.created_at)
+                ))
+            elif lead.status == 'converted':
+                status_changes.append(LeadStatusChange(
+                    lead=lead, type='converted_to_client', timestamp=self.after(lead.created_at)
+                ))
+        self.bulk(LeadStatusChange, status_changes)
+        self.create_activities('lead', leads)
+        self.create_whatsapp(leads, 'lead')
+
+        converted = [lead for lead in leads if lead.status == 'converted']
+        self.create_client_batch(converted)
+        return len(converted)
+
+    @transaction.atomic
+    def create_client_batch(self, source_leads):
+        statuses = [status for status, _ in CLIENT_STATUSES]
+        weights = [weight for _, weight in CLIENT_STATUSES]
+
+        clients = []
+        for lead in source_leads:
+            if lead is not None:
+                created_at = self.after(lead.created_at)
+                first_name, last_name, email, phone = lead.first_name, lead.last_name, lead.email, lead.phone
+            else:
+                created_at = self.random_time()
+                first_name, last_name, email, phone = self.random_person()
+            salary = Decimal(self.rng.randrange(15000, 120000, 500))
+            loan = Decimal(self.rng.randrange(500000, 5000000, 10000))
+            client = Client(
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                phone=phone,
+                phone_digits=normalize_phone(phone),
+                residency_status=self.rng.choice(['citizen', 'resident', 'resident']),
+                employment_status=self.rng.choice(['employed', 'employed', 'selfEmployed']),
+                monthly_salary=salary,
+                monthly_liabilities=Decimal(self.rng.randrange(0, int(salary) // 2, 250)),
+                loan_amount=loan,
+                estimated_property_value=(loan * Decimal(str(round(self.rng.uniform(1.1, 1.6), 2)))),
+                source=self.rng.choice(self.sub_sources),
+                source_campaign=self.rng.choice(self.campaigns),
+                converted_from_lead=lead,
+                status=self.rng.choices(statuses, weights)[0],
+                created_at=created_at,
+                updated_at=created_at,
+            )
+            client.calculate_eligibility()
+            clients.append(client)
+        clients = self.bulk(Client, clients)
+
+        status_changes = []
+        documents = []
+        for client in clients:
+            if client.converted_from_lead_id:
+                status_changes.append(ClientStatusChange(
+                    client=client, type='converted_from_lead', timestamp=client.created_at
+                ))
+            change_type = {
+                'converted': 'converted_to_case',
+                'notProceeding': 'not_proceeding',
+                'notEligible': 'not_eligible',
+            }.get(client.status)
+            if change_type:
+                status_changes.append(ClientStatusChange(
+                    client=client, type=change_type, timestamp=self.after(client.created_at)
+                ))
+            for doc_type in Document.DEFAULT_TYPES:
+                status = self.weighted(DOCUMENT_STATUSES)
+                uploaded = status in ('uploaded', 'verified')
+                documents.append(Document(
+                    client=client,
+                    type=doc_type,
+                    status=status,
+                    file_url=f'https://files.{SYNTHETIC_EMAIL_DOMAIN}/{client.id}/{doc_type}.pdf' if uploaded else None,
+                    uploaded_at=self.after(client.created_at) if uploaded else None,
+                ))
+        self.bulk(ClientStatusChange, status_changes)
+        self.bulk(Document, documents)
+        self.create_activities('client', clients)
+        self.create_whatsapp(clients, 'client')
+        self.create_cases([client for client in clients if client.status == 'converted'])
+
+    def create_cases(self, clients):
+        cases = []
+        for client in clients:
+            for _ in range(1 if self.rng.random() < 0.9 else 2):
+                self.case_number += 1
+                created_at = self.after(client.created_at)
+                cases.append(Case(
+                    case_id=f'{SYNTHETIC_CASE_PREFIX}{self.case_number:08d}',
+                    client=client,
+                    case_type=self.rng.choice(['residential', 'residential', 'commercial']),
+                    service_type=self.rng.choice(['assisted', 'fullyPackaged']),
+                    application_type=self.rng.choice(['individual', 'joint']),
+                    mortgage_type=self.rng.choice(['conventional', 'islamic']),
+                    emirate=self.rng.choice(['dubai', 'dubai', 'abuDhabi', 'sharjah']),
+                    loan_amount=client.loan_amount,
+                    transaction_type=self.rng.choice(['primaryPurchase', 'resale', 'buyout']),
+                    mortgage_term_years=self.rng.choice([15, 20, 25]),
+                    estimated_property_value=client.estimated_property_value,
+                    property_status=self.rng.choice(['ready', 'underConstruction']),
+                    bank_name=self.rng.choice(self.bank_names),
+                    stage=self.weighted(CASE_STAGES),
+                    created_at=created_at,
+                    updated_at=created_at,
+                ))
+        cases = self.bulk(Case, cases)
+
+        stage_changes = []
+        bank_forms = []
+        for case in cases:
+            stage_changes.extend(self.stage_history(case))
+            for form_type in BankForm.DEFAULT_TYPES:
+                bank_forms.append(BankForm(case=case, type=form_type, status=self.weighted(DOCUMENT_STATUSES[:3])))
+        self.bulk(CaseStageChange, stage_changes)
+        self.bulk(BankForm, bank_forms)
+        self.create_activities('case', cases)
+
+    def stage_history(self, case):
+        """Walk the pipeline from processing up to the case's current stage"""
+        path = [None, 'processing']
+        if case.stage in Case.ACTIVE_STAGES:
+            path += Case.ACTIVE_STAGES[1:Case.ACTIVE_STAGES.index(case.stage) + 1]
+        else:
+            stop = self.rng.randrange(1, len(Case.ACTIVE_STAGES)) if case.stage != 'disbursed' else len(Case.ACTIVE_STAGES)
+            path += Case.ACTIVE_STAGES[1:stop] + [case.stage]
+
+        changes = []
+        timestamp = case.created_at
+        for from_stage, to_stage in zip(path, path[1:]):
+            changes.append(CaseStageChange(
+                case=case, from_stage=from_stage, to_stage=to_stage, notes='', timestamp=timestamp
+            ))
+            timestamp = self.after(timestamp, max_days=14)
+        return changes
+
+    def create_activities(self, entity_type, entities):
+        call_logs = []
+        notes = []
+        outcomes = [outcome for outcome, _ in CallLog.OUTCOME_CHOICES]
+        for entity in entities:
+            for _ in range(self.random_count(self.avg_calls)):
+                call_logs.append(CallLog(
+                    entity_type=entity_type,
+                    entity_id=entity.id,
+                    outcome=self.rng.choice(outcomes),
+                    notes='',
+                    timestamp=self.after(entity.created_at),
+                ))
+            for _ in range(self.random_count(self.avg_notes)):
+                notes.append(Note(
+                    entity_type=entity_type,
+                    entity_id=entity.id,
+                    content='Follow up on documents',
+                    timestamp=self.after(entity.created_at),
+                ))
+        self.bulk(CallLog, call_logs)
+        self.bulk(Note, notes)
+
+    def create_whatsapp(self, entities, entity_type):
+        messages = []
+        conversations = []
+        for entity in entities:
+            if self.rng.random() >= self.whatsapp_share:
+                continue
+            timestamp = entity.created_at
+            last = None
+            for _ in range(self.rng.randint(1, 8)):
+                timestamp = self.after(timestamp, max_days=3)
+                last = WhatsAppMessage(
+                    direction=self.rng.choice(['inbound', 'outbound']),
+                    phone=entity.phone,
+                    content=self.rng.choice(MESSAGES),
+                    status='delivered',
+                    created_at=timestamp,
+                    **{entity_type: entity},
+                )
+                messages.append(last)
+            conversations.append(WhatsAppConversation(
+                entity_type=entity_type,
+                last_message_preview=WhatsAppConversation.build_preview(last.content),
+                last_message_direction=last.direction,
+                last_message_at=last.created_at,
+                unread_count=self.rng.randint(0, 3) if last.direction == 'inbound' else 0,
+                **{entity_type: entity},
+            ))
+        self.bulk(WhatsAppMessage, messages)
+        self.bulk(WhatsAppConversation, conversations)
+
+    # -------------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------------
+
+    def ensure_reference_data(self):
+        """Sources, campaigns and bank names to attach synthetic rows to"""
+        if not SubSource.objects.exists():
+            channel, _ = Channel.objects.get_or_create(
+                id='perf_marketing', defaults={'name': 'Performance Marketing', 'trust_level': 'untrusted'}
+            )
+            source = Source.objects.create(channel=channel, name='Synthetic')
+            for name in ('Meta', 'Google', 'TikTok'):
+                SubSource.objects.create(source=source, name=name, status='incubation', default_sla_min=30)
+        if not Campaign.objects.exists():
+            for name in ('Synthetic_Q1', 'Synthetic_Q2'):
+                Campaign.objects.create(name=name, status='live')
+
+        self.sub_sources = list(SubSource.objects.all())
+        self.campaigns = list(Campaign.objects.all())
+        self.bank_names = list(BankProduct.objects.values_list('bank_name', flat=True).distinct()) or BANK_NAMES
+
+    def bulk(self, model, objs):
+        created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.counts[model] = self.counts.get(model, 0) + len(created)
+        return created
+
+    def random_person(self):
+        self.phone_number += 1
+        first_name = self.rng.choice(FIRST_NAMES)
+        last_name = self.rng.choice(LAST_NAMES)
+        email = f'{first_name}.{self.phone_number}@{SYNTHETIC_EMAIL_DOMAIN}'.lower()
+        number = f'{self.phone_number:07d}'[-7:]
+        phone = f'+971 5{self.rng.choice("02568")} {number[:3]} {number[3:]}'
+        return first_name, last_name, email, phone
+
+    def random_time(self):
+        span = (self.now - self.start).total_seconds()
+        return self.start + timedelta(seconds=self.rng.random() * span)
+
+    def after(self, moment, max_days=30):
+        later = moment + timedelta(seconds=self.rng.random() * max_days * 86400)
+        return min(later, self.now)
+
+    def random_count(self, average):
+        return self.rng.randint(0, int(average * 2)) if average else 0
+
+    def weighted(self, choices):
+        return self.rng.choices([value for value, _ in choices], [weight for _, weight in choices])[0]
+
+    # -------------------------------------------------------------------------
+    # Flush
+    # -------------------------------------------------------------------------
+
+    @transaction.atomic
+    def flush(self):
+        lead_ids = list(Lead.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}').values_list('id', flat=True))
+        client_ids = list(Client.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}').values_list('id', flat=True))
+        case_ids = list(Case.objects.filter(client_id__in=client_ids).values_list('id', flat=True))
+
+        for entity_type, ids in (('lead', lead_ids), ('client', client_ids), ('case', case_ids)):
+            for offset in range(0, len(ids), 10000):
+                chunk = ids[offset:offset + 10000]
+                CallLog.objects.filter(entity_type=entity_type, entity_id__in=chunk).delete()
+                Note.objects.filter(entity_type=entity_type, entity_id__in=chunk).delete()
+
+        # Messages keep their row on lead/client delete (SET_NULL), so remove them first
+        WhatsAppMessage.objects.filter(lead__email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}').delete()
+        WhatsAppMessage.objects.filter(client__email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}').delete()
+        Client.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}').delete()
+        Lead.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}').delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {len(lead_ids)} leads, {len(client_ids)} clients and {len(case_ids)} cases'
+        ))
@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import date
 from core.models import BankProduct, EiborRate
+from api.services import BankPricingService
 
 
 class Command(BaseCommand):
@@ -19,6 +20,10 @@ class Command(BaseCommand):
         # Load bank products
         self.load_bank_products()
 
+        # Price them from the EIBOR rates just loaded
+        report = BankPricingService.reprice()
+        self.stdout.write(f'  Re-priced {report["updated"]} of {report["products"]} EIBOR-linked products')
+
         self.stdout.write(self.style.SUCCESS('Sample data loaded successfully!'))
 
     def load_eibor_rates(self):
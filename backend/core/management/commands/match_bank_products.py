@@ -0,0 +1,52 @@
+"""
+Re-match clients against the bank product catalogue.
+
+Rewrites Client.eligible_bank_products for every active client (or the
+given clients) in vectorized chunks. Run after changing bank products;
+single clients are re-matched by a background job when they are saved
+through the API.
+
+Usage:
+    python manage.py match_bank_products
+    python manage.py match_bank_products --all-statuses --chunk-size 5000
+    python manage.py match_bank_products --client 42 --client 43
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.cache import reference_cache
+from core.models import Client
+from api.services import BankMatchService
+from api.services.bank_matching import REMATCH_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Re-match clients to eligible bank products'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--client', type=int, action='append', default=[],
+                            help='Only re-match this client id (repeatable)')
+        parser.add_argument('--all-statuses', action='store_true',
+                            help='Include clients that are not active')
+        parser.add_argument('--chunk-size', type=int, default=REMATCH_CHUNK_SIZE,
+                            help=f'Clients per chunk (default: {REMATCH_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        queryset = Client.objects.all() if options['all_statuses'] else Client.objects.filter(status='active')
+        if options['client']:
+            queryset = queryset.filter(id__in=options['client'])
+
+        # Compile the catalogue from the database, not a stale cached copy
+        reference_cache.invalidate('bank_catalogue')
+        products = len(reference_cache.get('bank_catalogue'))
+
+        start = time.perf_counter()
+        totals = BankMatchService.rematch_clients(queryset, chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Matched {totals["clients"]} clients against {products} products: '
+            f'{totals["matches"]} eligible pairs in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,65 @@
+"""
+Recalculate eligibility (DBR, LTV, max loan, status) for existing clients.
+
+Run after changing settings.ELIGIBILITY_POLICY. Threshold options apply a
+one-off policy instead - combine with --dry-run to see how many clients a
+policy change would move before rolling it out.
+
+Usage:
+    python manage.py recalculate_eligibility
+    python manage.py recalculate_eligibility --max-dbr 45 --dry-run
+    python manage.py recalculate_eligibility --status active --chunk-size 10000
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.eligibility import EligibilityPolicy
+from core.models import Client
+from api.services import EligibilityService
+from api.services.eligibility import RECALCULATE_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Recalculate client eligibility with the current (or given) policy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-dbr', type=float, help='Max debt burden ratio, %% of salary')
+        parser.add_argument('--max-ltv-citizen', type=float, help='Max loan-to-value for UAE nationals, %%')
+        parser.add_argument('--max-ltv-resident', type=float, help='Max loan-to-value for residents, %%')
+        parser.add_argument('--max-loan-dbr', type=float, help='Salary share available for instalments, %%')
+        parser.add_argument('--max-loan-months', type=int, help='Instalments assumed for the max loan estimate')
+        parser.add_argument('--status', action='append', default=[],
+                            help='Only clients with this status (repeatable, default: all)')
+        parser.add_argument('--chunk-size', type=int, default=RECALCULATE_CHUNK_SIZE,
+                            help=f'Clients per chunk (default: {RECALCULATE_CHUNK_SIZE})')
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without writing them')
+
+    def handle(self, *args, **options):
+        policy = EligibilityPolicy.from_settings(
+            max_dbr=options['max_dbr'],
+            max_ltv_citizen=options['max_ltv_citizen'],
+            max_ltv_resident=options['max_ltv_resident'],
+            max_loan_dbr=options['max_loan_dbr'],
+            max_loan_months=options['max_loan_months'],
+        )
+        queryset = Client.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status__in=options['status'])
+
+        start = time.perf_counter()
+        report = EligibilityService.recalculate(
+            queryset, policy=policy, chunk_size=options['chunk_size'], dry_run=options['dry_run']
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f'Policy: {json.dumps(report["policy"])}')
+        for change, count in sorted(report['statusChanges'].items()):
+            self.stdout.write(f'  {change}: {count}')
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {report["updated"]} of {report["clients"]} clients '
+            f'({sum(report["statusChanges"].values())} eligibility changes) in {elapsed:.2f}s'
+        ))
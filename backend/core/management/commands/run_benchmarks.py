@@ -0,0 +1,197 @@
+"""
+Run scripted API benchmark scenarios against the configured database.
+
+Each scenario issues the same request the frontend makes (list, search,
+detail, kanban, inbox) through the full Django/DRF stack, and reports
+p50/p95/p99 latency, queries per request and response size. Populate the
+database first with generate_synthetic_data.
+
+Usage:
+    python manage.py run_benchmarks --iterations 50 --output before.json
+    python manage.py run_benchmarks --output after.json --compare before.json
+    python manage.py run_benchmarks --scenario leads --scenario whatsapp
+"""
+
+import json
+import statistics
+import subprocess
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Case, Client, Lead, User, WhatsAppConversation
+
+# (name, url template) - templates are formatted with ids from sample_ids()
+SCENARIOS = [
+    ('leads.list', '/api/leads/'),
+    ('leads.list.compact', '/api/leads/?view=compact'),
+    ('leads.list.cursor', '/api/leads/?pagination=cursor'),
+    ('leads.list.deep_page', '/api/leads/?page=50'),
+    ('leads.search.name', '/api/leads/?search=fatima'),
+    ('leads.search.phone', '/api/leads/?search=050%20123'),
+    ('leads.search.ranked', '/api/leads/?search=khan&search_rank=true'),
+    ('leads.detail', '/api/leads/{lead_id}/'),
+    ('clients.list', '/api/clients/'),
+    ('clients.search', '/api/clients/?search=ahmed'),
+    ('clients.detail', '/api/clients/{client_id}/'),
+    ('cases.list', '/api/cases/'),
+    ('cases.search', '/api/cases/?search=SY0000'),
+    ('cases.kanban', '/api/cases/board/'),
+    ('cases.detail', '/api/cases/{case_id}/'),
+    ('whatsapp.inbox', '/api/whatsapp/conversations/?page=1&page_size=50'),
+    ('whatsapp.thread', '/api/whatsapp/messages/?lead_id={whatsapp_lead_id}'),
+]
+
+
+def percentile(samples: list, pct: int) -> float:
+    """Inclusive percentile, so small sample sizes still give sensible p99s"""
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1]
+
+
+class Command(BaseCommand):
+    help = 'Run API benchmark scenarios and report latency percentiles and query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Measured requests per scenario (default: 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per scenario (default: 2)')
+        parser.add_argument('--scenario', action='append', default=[],
+                            help='Only run scenarios starting with this name (repeatable)')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+        parser.add_argument('--compare', help='Baseline JSON from a previous run to diff against')
+
+    def handle(self, *args, **options):
+        scenarios = [
+            (name, url) for name, url in SCENARIOS
+            if not options['scenario'] or any(name.startswith(prefix) for prefix in options['scenario'])
+        ]
+        if not scenarios:
+            raise CommandError('No scenarios match the given --scenario filters')
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = {row['name']: row for row in json.load(f)['scenarios']}
+
+        client = self.get_client()
+        ids = self.sample_ids()
+
+        results = []
+        # The test client talks to the 'testserver' host
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for name, url_template in scenarios:
+                try:
+                    url = url_template.format(**ids)
+                except KeyError:
+                    self.stdout.write(self.style.WARNING(f'Skipping {name}: no data'))
+                    continue
+                results.append(self.run_scenario(client, name, url, options['iterations'], options['warmup']))
+
+        self.print_table(results, baseline)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'commit': self.git_commit(),
+                    'vendor': connection.vendor,
+                    'createdAt': timezone.now().isoformat(),
+                    'rows': {'leads': Lead.objects.count(), 'clients': Client.objects.count(), 'cases': Case.objects.count()},
+                    'scenarios': results,
+                }, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def get_client(self):
+        """API client authenticated with a real token, like the frontend"""
+        user, _ = User.objects.get_or_create(username='benchmark', defaults={'first_name': 'Benchmark'})
+        token, _ = Token.objects.get_or_create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def sample_ids(self) -> dict:
+        """Most recent rows - what an agent opens first"""
+        ids = {}
+        samples = {
+            'lead_id': Lead.objects.order_by('-id').values_list('id', flat=True).first(),
+            'client_id': Client.objects.order_by('-id').values_list('id', flat=True).first(),
+            'case_id': Case.objects.order_by('-id').values_list('id', flat=True).first(),
+            'whatsapp_lead_id': WhatsAppConversation.objects.filter(lead__isnull=False)
+            .order_by('-last_message_at').values_list('lead_id', flat=True).first(),
+        }
+        for key, value in samples.items():
+            if value is not None:
+                ids[key] = value
+        return ids
+
+    def run_scenario(self, client, name, url, iterations, warmup) -> dict:
+        for _ in range(warmup):
+            client.get(url)
+
+        latencies = []
+        query_counts = []
+        response_bytes = 0
+        status_code = None
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(ctx.captured_queries))
+            response_bytes = len(response.content)
+            status_code = response.status_code
+
+        return {
+            'name': name,
+            'url': url,
+            'status': status_code,
+            'iterations': iterations,
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'mean': round(statistics.fmean(latencies), 2),
+            'queries': statistics.median(query_counts),
+            'maxQueries': max(query_counts),
+            'responseBytes': response_bytes,
+        }
+
+    def print_table(self, results, baseline):
+        header = f'{"scenario":<24} {"status":>6} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"queries":>8} {"bytes":>9}'
+        if baseline:
+            header += f' {"Δp50":>8} {"Δp95":>8} {"Δqueries":>9}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for row in results:
+            line = (
+                f'{row["name"]:<24} {row["status"]:>6} {row["p50"]:>9.2f} {row["p95"]:>9.2f} '
+                f'{row["p99"]:>9.2f} {row["queries"]:>8} {row["responseBytes"]:>9}'
+            )
+            previous = (baseline or {}).get(row['name'])
+            if previous:
+                line += (
+                    f' {self.delta(row["p50"], previous["p50"]):>8}'
+                    f' {self.delta(row["p95"], previous["p95"]):>8}'
+                    f' {row["queries"] - previous["queries"]:>+9}'
+                )
+            self.stdout.write(line)
+
+    @staticmethod
+    def delta(current, previous) -> str:
+        if not previous:
+            return 'n/a'
+        return f'{(current - previous) / previous * 100:+.0f}%'
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
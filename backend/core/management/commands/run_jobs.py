@@ -0,0 +1,79 @@
+"""
+Run background job workers (see core.jobs).
+
+Each worker process claims one due job at a time from the jobs table.
+Without --once the command runs until SIGTERM/SIGINT, letting the
+current job finish first.
+
+Usage:
+    python manage.py run_jobs                 # one worker, runs forever
+    python manage.py run_jobs --processes 4   # four forked worker processes
+    python manage.py run_jobs --once          # run everything due, then exit
+    python manage.py run_jobs --stats
+"""
+
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count
+
+from core.jobs import Worker, run_pending
+from core.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes (default: 1)')
+        parser.add_argument('--once', action='store_true', help='Run all due jobs, then exit')
+        parser.add_argument('--stats', action='store_true', help='Print job counts by status and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for row in Job.objects.values('name', 'status').annotate(count=Count('id')).order_by('name', 'status'):
+                self.stdout.write(f'{row["name"]:<32} {row["status"]:<10} {row["count"]:>8}')
+            return
+
+        if options['once']:
+            count = run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Ran {count} jobs'))
+            return
+
+        if options['processes'] <= 1:
+            self.work()
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=self.work, name=f'run_jobs-{i}') for i in range(options['processes'])]
+        for process in processes:
+            process.start()
+        self.stdout.write(f'Started {len(processes)} job workers')
+
+        def stop(signum, frame):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            # SIGINT also reached the children through the process group
+            for process in processes:
+                process.join()
+
+    def work(self):
+        worker = Worker()
+
+        def stop(signum, frame):
+            worker.stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        worker.run_forever()
@@ -0,0 +1,276 @@
+"""
+Bank Product Matching
+
+Scores clients against the bank product catalogue in one vectorized pass.
+
+The active catalogue is compiled once into NumPy columns (rate, max LTV,
+max term, expiry) plus boolean lookup tables for the categorical rules
+(employment, residency, transaction type). Matching N clients against P
+products builds (N, P) matrices, so one client or every active client is
+the same code path:
+
+    catalogue = ProductCatalogue.from_products(products, eibor=snapshot)
+    result = catalogue.match(ClientFeatures.from_rows(rows))
+
+A product matches when every rule passes. Each failed rule sets a bit in
+result.reasons so callers can explain why a product was excluded.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from core.eligibility import EligibilityPolicy
+from core.mortgage import initial_rate
+
+# Failed-rule bits in MatchResult.reasons
+REASON_EXPIRED = 1
+REASON_EMPLOYMENT = 2
+REASON_RESIDENCY = 4
+REASON_TRANSACTION = 8
+REASON_LTV = 16
+REASON_DBR = 32
+REASON_TERM = 64
+
+REASON_NAMES = {
+    REASON_EXPIRED: 'expired',
+    REASON_EMPLOYMENT: 'employment',
+    REASON_RESIDENCY: 'residency',
+    REASON_TRANSACTION: 'transaction',
+    REASON_LTV: 'ltv',
+    REASON_DBR: 'dbr',
+    REASON_TERM: 'term',
+}
+
+# Loans must be repaid by this age
+RETIREMENT_AGE = {'employed': 65, 'selfEmployed': 70}
+
+# Client choice -> BankProduct values that accept it
+EMPLOYMENT_MATCHES = {
+    'employed': {'SALARIED', 'ALL'},
+    'selfEmployed': {'SELF EMPLOYMENT', 'ALL'},
+}
+RESIDENCY_MATCHES = {
+    'citizen': {'UAE NATIONAL', 'ALL'},
+    'resident': {'UAE RESIDENT', 'ALL'},
+}
+# Case.TRANSACTION_TYPE_CHOICES -> BankProduct.TRANSACTION_TYPE_CHOICES
+TRANSACTION_MATCHES = {
+    'primaryPurchase': {'PRIMARY PURCHASE', 'PRIMARY/RESALE/HANDOVER'},
+    'resale': {'RESALE', 'PRIMARY/RESALE/HANDOVER'},
+    'buyout': {'BUYOUT'},
+    'buyoutEquity': {'BUYOUT', 'EQUITY RELEASE'},
+    'equity': {'EQUITY RELEASE'},
+}
+
+EMPLOYMENT_KEYS = list(EMPLOYMENT_MATCHES)
+RESIDENCY_KEYS = list(RESIDENCY_MATCHES)
+TRANSACTION_KEYS = list(TRANSACTION_MATCHES)
+
+NO_EXPIRY = np.iinfo(np.int64).max
+
+
+def _float(value, default=np.nan) -> float:
+    return default if value is None else float(value)
+
+
+def monthly_instalment(principal, annual_rate, months):
+    """
+    Amortizing monthly payment, elementwise over broadcastable arrays.
+
+    Args:
+        principal: Loan amount
+        annual_rate: Annual rate in percent
+        months: Number of monthly payments
+    """
+    principal, months = np.broadcast_arrays(np.asarray(principal, dtype=float), np.asarray(months, dtype=float))
+    rate = np.broadcast_to(np.asarray(annual_rate, dtype=float) / 1200.0, principal.shape)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        amortizing = principal * rate / (1.0 - np.power(1.0 + rate, -months))
+        flat = principal / months
+    return np.where(rate > 0, amortizing, flat)
+
+
+class ClientFeatures:
+    """Columnar client inputs for matching - one entry per client"""
+
+    def __init__(self, ids, salary, liabilities, loan, property_value,
+                 employment, residency, transaction, max_term_months):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.salary = np.asarray(salary, dtype=float)
+        self.liabilities = np.asarray(liabilities, dtype=float)
+        self.loan = np.asarray(loan, dtype=float)
+        self.property_value = np.asarray(property_value, dtype=float)
+        self.employment = np.asarray(employment, dtype=np.int64)
+        self.residency = np.asarray(residency, dtype=np.int64)
+        self.transaction = np.asarray(transaction, dtype=np.int64)  # -1 matches any product
+        self.max_term_months = np.asarray(max_term_months, dtype=float)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: list, transaction_type: str = None, term_years: int = None, today: date = None):
+        """
+        Build features from Client field dicts (e.g. Client.objects.values(*CLIENT_FIELDS)).
+
+        Args:
+            rows: Dicts with the CLIENT_FIELDS keys
+            transaction_type: Case transaction type to match, None for any
+            term_years: Requested term, None for the longest allowed
+            today: Reference date for ages (defaults to today)
+        """
+        today = today or date.today()
+        transaction = TRANSACTION_KEYS.index(transaction_type) if transaction_type else -1
+        requested_months = term_years * 12 if term_years else np.inf
+
+        columns = {key: [] for key in ('ids', 'salary', 'liabilities', 'loan', 'property_value',
+                                       'employment', 'residency', 'max_term_months')}
+        for row in rows:
+            employment = row['employment_status'] if row['employment_status'] in EMPLOYMENT_MATCHES else 'employed'
+            residency = row['residency_status'] if row['residency_status'] in RESIDENCY_MATCHES else 'resident'
+            max_months = requested_months
+            if row['date_of_birth']:
+                birth = row['date_of_birth']
+                age = today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
+                max_months = min(max_months, (RETIREMENT_AGE[employment] - age) * 12)
+
+            columns['ids'].append(row['id'])
+            columns['salary'].append(_float(row['monthly_salary'], 0.0))
+            columns['liabilities'].append(_float(row['monthly_liabilities'], 0.0))
+            columns['loan'].append(_float(row['loan_amount']))
+            columns['property_value'].append(_float(row['estimated_property_value']))
+            columns['employment'].append(EMPLOYMENT_KEYS.index(employment))
+            columns['residency'].append(RESIDENCY_KEYS.index(residency))
+            columns['max_term_months'].append(max_months)
+
+        return cls(transaction=[transaction] * len(rows), **columns)
+
+
+# Client fields ClientFeatures.from_rows needs
+CLIENT_FIELDS = [
+    'id', 'monthly_salary', 'monthly_liabilities', 'loan_amount', 'estimated_property_value',
+    'employment_status', 'residency_status', 'date_of_birth',
+]
+
+
+class MatchResult:
+    """(clients, products) matrices produced by ProductCatalogue.match"""
+
+    def __init__(self, catalogue, clients, reasons, term_months, instalment, dbr, ltv):
+        self.catalogue = catalogue
+        self.clients = clients
+        self.reasons = reasons
+        self.term_months = term_months
+        self.instalment = instalment
+        self.dbr = dbr
+        self.ltv = ltv
+
+    @property
+    def eligible(self):
+        return self.reasons == 0
+
+    def ranked(self, row: int, include_ineligible: bool = False) -> list:
+        """
+        Product indexes for one client, best first: eligible products
+        by monthly instalment, then (optionally) the rest by fewest failed rules.
+        """
+        reasons = self.reasons[row]
+        instalment = np.nan_to_num(self.instalment[row], nan=np.inf)
+        failed_rules = np.unpackbits(reasons[:, None], axis=1).sum(axis=1)
+        order = np.lexsort((self.catalogue.rates, instalment, failed_rules))
+        if not include_ineligible:
+            order = order[reasons[order] == 0]
+        return order.tolist()
+
+    @staticmethod
+    def reason_names(bits: int) -> list:
+        return [name for bit, name in REASON_NAMES.items() if bits & bit]
+
+
+class ProductCatalogue:
+    """Active bank products compiled into NumPy columns"""
+
+    def __init__(self, products: list, eibor: dict = None):
+        """
+        Args:
+            products: Active BankProducts
+            eibor: EIBOR snapshot used to price variable products
+        """
+        self.ids = np.array([product.id for product in products], dtype=np.int64)
+        self.bank_names = [product.bank_name for product in products]
+        self.rates = np.array([initial_rate(product, eibor) for product in products], dtype=float)
+        # 0 means no LTV cap configured
+        self.max_ltv = np.array(
+            [float(product.loan_to_value_ratio) or np.inf for product in products], dtype=float
+        )
+        self.max_term_months = np.array(
+            [product.maximum_length_of_mortgage * 12 for product in products], dtype=float
+        )
+        self.expiry = np.array(
+            [product.expiry_date.toordinal() if product.expiry_date else NO_EXPIRY for product in products],
+            dtype=np.int64,
+        )
+        # (categories, products) lookup tables - indexed by a client's category codes
+        self.employment_ok = np.array(
+            [[product.type_of_employment in EMPLOYMENT_MATCHES[key] for product in products] for key in EMPLOYMENT_KEYS],
+            dtype=bool,
+        ).reshape(len(EMPLOYMENT_KEYS), len(products))
+        self.residency_ok = np.array(
+            [[product.citizen_state in RESIDENCY_MATCHES[key] for product in products] for key in RESIDENCY_KEYS],
+            dtype=bool,
+        ).reshape(len(RESIDENCY_KEYS), len(products))
+        # Extra all-True row so code -1 ("any transaction") indexes a pass
+        self.transaction_ok = np.array(
+            [[product.type_of_transaction in TRANSACTION_MATCHES[key] for product in products] for key in TRANSACTION_KEYS]
+            + [[True] * len(products)],
+            dtype=bool,
+        ).reshape(len(TRANSACTION_KEYS) + 1, len(products))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_products(cls, products, eibor: dict = None) -> 'ProductCatalogue':
+        return cls([product for product in products if product.is_active], eibor=eibor)
+
+    def match(self, clients: ClientFeatures, today: date = None) -> MatchResult:
+        """Evaluate every rule for every (client, product) pair"""
+        today = today or date.today()
+        shape = (len(clients), len(self))
+        reasons = np.zeros(shape, dtype=np.uint8)
+
+        reasons |= np.where(self.expiry < today.toordinal(), REASON_EXPIRED, 0).astype(np.uint8)
+        reasons |= np.where(self.employment_ok[clients.employment], 0, REASON_EMPLOYMENT).astype(np.uint8)
+        reasons |= np.where(self.residency_ok[clients.residency], 0, REASON_RESIDENCY).astype(np.uint8)
+        reasons |= np.where(self.transaction_ok[clients.transaction], 0, REASON_TRANSACTION).astype(np.uint8)
+
+        # Loan-to-value - unknown loan or property value can't fail the rule
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ltv = np.where(clients.property_value > 0, clients.loan / clients.property_value * 100, np.nan)
+        ltv_failed = ltv[:, None] > self.max_ltv[None, :]
+        reasons |= np.where(ltv_failed, REASON_LTV, 0).astype(np.uint8)
+
+        # Term - the product's maximum, capped by the client's retirement age
+        term_months = np.minimum(self.max_term_months[None, :], clients.max_term_months[:, None])
+        reasons |= np.where(term_months < 12, REASON_TERM, 0).astype(np.uint8)
+        term_months = np.maximum(term_months, 12)
+
+        # Debt burden including the new instalment at each product's rate -
+        # unknown salary can't fail the rule, as in Client eligibility
+        loan = np.nan_to_num(clients.loan, nan=0.0)
+        instalment = monthly_instalment(loan[:, None], self.rates[None, :], term_months)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dbr = np.where(
+                clients.salary[:, None] > 0,
+                (clients.liabilities[:, None] + instalment) / clients.salary[:, None] * 100,
+                np.nan,
+            )
+        # Same debt burden cap as Client eligibility (liabilities + new instalment)
+        max_dbr = EligibilityPolicy.from_settings().max_dbr
+        reasons |= np.where(dbr > max_dbr, REASON_DBR, 0).astype(np.uint8)
+
+        return MatchResult(
+            self, clients, reasons, term_months, instalment,
+            dbr, np.broadcast_to(ltv[:, None], shape),
+        )
@@ -0,0 +1,122 @@
+"""
+Performance Middleware
+
+Records per-request query count, DB time, profiled sections (see
+core.profiling) and response size, tagged by view. Emits a Server-Timing
+header and one structured log line per request on the 'rivo.perf' logger,
+and warns when an endpoint exceeds its query budget (PERF_QUERY_BUDGETS).
+
+Streaming responses (exports) run most of their queries while the body is
+sent, so their log line is written once the stream has been consumed and
+covers every chunk. Their Server-Timing header can only describe the work
+done before the first byte.
+"""
+
+import json
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core.profiling import RequestProfile, activate_profile
+
+logger = logging.getLogger('rivo.perf')
+
+
+def get_view_tag(view_func, method: str) -> str:
+    """
+    Stable name for a view: 'LeadViewSet.list' for viewset actions,
+    the function name for @api_view views.
+    """
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', repr(view_func))
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower())
+    # @api_view names its wrapper class after the decorated function
+    return f'{cls.__name__}.{action}' if action else cls.__name__
+
+
+class PerformanceMiddleware:
+    """Instruments every request - enable with PERF_INSTRUMENTATION"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PERF_INSTRUMENTATION', True)
+        self.server_timing = getattr(settings, 'PERF_SERVER_TIMING', settings.DEBUG)
+        self.budgets = getattr(settings, 'PERF_QUERY_BUDGETS', {})
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        with self.instrument(profile):
+            response = self.get_response(request)
+
+        self.add_server_timing(response, profile)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.stream(request, response, profile, response.streaming_content)
+        else:
+            self.report(request, response, profile)
+        return response
+
+    @staticmethod
+    def instrument(profile: RequestProfile) -> ExitStack:
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+        stack.enter_context(activate_profile(profile))
+        return stack
+
+    def stream(self, request, response, profile: RequestProfile, content):
+        """Pass the body through, counting its queries and bytes, and report at the end"""
+        size = 0
+        try:
+            while True:
+                with self.instrument(profile):
+                    chunk = next(content, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.report(request, response, profile, response_size=size)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.perf_view_tag = get_view_tag(view_func, request.method)
+
+    def add_server_timing(self, response, profile: RequestProfile):
+        if not self.server_timing:
+            return
+        metrics = [f'db;dur={profile.db_time * 1000:.1f};desc="{profile.query_count} queries"']
+        metrics += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in profile.sections.items()]
+        metrics.append(f'total;dur={profile.elapsed * 1000:.1f}')
+        response['Server-Timing'] = ', '.join(metrics)
+
+    def report(self, request, response, profile: RequestProfile, response_size: int = None):
+        total_ms = profile.elapsed * 1000
+        db_ms = profile.db_time * 1000
+        view_tag = getattr(request, 'perf_view_tag', None)
+        if response_size is None and not response.streaming:
+            response_size = len(response.content)
+
+        record = {
+            'view': view_tag,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.query_count,
+            'db_ms': round(db_ms, 1),
+            'total_ms': round(total_ms, 1),
+            'sections_ms': {name: round(seconds * 1000, 1) for name, seconds in profile.sections.items()},
+            'response_bytes': response_size,
+        }
+
+        budget = self.budgets.get(view_tag)
+        if budget is not None and profile.query_count > budget:
+            record['query_budget'] = budget
+            logger.warning(json.dumps(record), extra={'perf': record})
+        else:
+            logger.info(json.dumps(record), extra={'perf': record})
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.27 on 2026-10-17 01:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_conversations(apps, schema_editor):
+    """Build one conversation row per existing lead/client thread"""
+    WhatsAppMessage = apps.get_model('core', 'WhatsAppMessage')
+    WhatsAppConversation = apps.get_model('core', 'WhatsAppConversation')
+
+    conversations = []
+    for entity_type, field in (('lead', 'lead_id'), ('client', 'client_id')):
+        last_ids = (
+            WhatsAppMessage.objects.filter(**{f'{field}__isnull': False})
+            .values(field)
+            .annotate(last_id=models.Max('id'))
+            .values_list('last_id', flat=True)
+        )
+        for message in WhatsAppMessage.objects.filter(id__in=list(last_ids)):
+            content = message.content
+            conversations.append(WhatsAppConversation(
+                entity_type=entity_type,
+                lead_id=message.lead_id if entity_type == 'lead' else None,
+                client_id=message.client_id if entity_type == 'client' else None,
+                last_message_preview=content[:50] + ('...' if len(content) > 50 else ''),
+                last_message_direction=message.direction,
+                last_message_at=message.created_at,
+                unread_count=0,
+            ))
+
+    WhatsAppConversation.objects.bulk_create(conversations, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_add_converted_from_lead_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WhatsAppConversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('lead', 'Lead'), ('client', 'Client')], max_length=10)),
+                ('last_message_preview', models.CharField(blank=True, default='', max_length=60)),
+                ('last_message_direction', models.CharField(choices=[('inbound', 'Inbound'), ('outbound', 'Outbound')], max_length=10)),
+                ('last_message_at', models.DateTimeField()),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('client', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='whatsapp_conversation', to='core.client')),
+                ('lead', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='whatsapp_conversation', to='core.lead')),
+            ],
+            options={
+                'db_table': 'whatsapp_conversations',
+                'ordering': ['-last_message_at'],
+                'indexes': [models.Index(fields=['-last_message_at', '-id'], name='whatsapp_co_last_me_d6fab1_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
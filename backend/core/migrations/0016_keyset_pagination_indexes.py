@@ -0,0 +1,37 @@
+# Generated by Django 4.2.27 on 2026-10-17 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_whatsappconversation'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='case',
+            name='cases_created_59494d_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='clients_created_cf1920_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='lead',
+            name='leads_created_f50ac1_idx',
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['-created_at', '-id'], name='cases_created_7fb37c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['-created_at', '-id'], name='clients_created_17160c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['-created_at', '-id'], name='leads_created_8c4673_idx'),
+        ),
+    ]
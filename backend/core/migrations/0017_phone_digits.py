@@ -0,0 +1,47 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:01
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_phone_digits(apps, schema_editor):
+    """Populate phone_digits for existing leads and clients"""
+    for model_name in ('Lead', 'Client'):
+        model = apps.get_model('core', model_name)
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(
+                f"UPDATE {model._meta.db_table} SET phone_digits = regexp_replace(phone, '\\D', '', 'g')"
+            )
+            continue
+
+        batch = []
+        for obj in model.objects.only('id', 'phone').iterator(chunk_size=2000):
+            obj.phone_digits = re.sub(r'\D', '', obj.phone or '')
+            batch.append(obj)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ['phone_digits'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['phone_digits'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(backfill_phone_digits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:05
+
+from django.db import migrations
+
+
+# (index name, table, indexed expression) - icontains compiles to
+# UPPER(col::text) LIKE UPPER(%s), so name/email indexes are on UPPER(col)
+TRIGRAM_INDEXES = [
+    ('leads_first_name_trgm', 'leads', 'UPPER(first_name)'),
+    ('leads_last_name_trgm', 'leads', 'UPPER(last_name)'),
+    ('leads_email_trgm', 'leads', 'UPPER(email)'),
+    ('leads_phone_digits_trgm', 'leads', 'phone_digits'),
+    ('clients_first_name_trgm', 'clients', 'UPPER(first_name)'),
+    ('clients_last_name_trgm', 'clients', 'UPPER(last_name)'),
+    ('clients_email_trgm', 'clients', 'UPPER(email)'),
+    ('clients_phone_digits_trgm', 'clients', 'phone_digits'),
+    ('cases_case_id_trgm', 'cases', 'UPPER(case_id)'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """pg_trgm GIN indexes for search - PostgreSQL only, other backends use plain LIKE"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, expression in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON {table} USING gin (({expression}) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table, _expression in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0017_phone_digits'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
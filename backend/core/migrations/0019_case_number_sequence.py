@@ -0,0 +1,43 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:09
+
+import re
+
+from django.db import migrations, models
+
+from core.sequences import CASE_NUMBER, create_sequence, drop_sequence
+
+
+def seed_case_number_sequence(apps, schema_editor):
+    """Start after the highest existing RV-XXXXX number"""
+    Case = apps.get_model('core', 'Case')
+    highest = 0
+    for case_id in Case.objects.filter(case_id__startswith='RV-').values_list('case_id', flat=True).iterator():
+        match = re.fullmatch(r'RV-(\d+)', case_id)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    create_sequence(schema_editor, CASE_NUMBER, start=highest + 1)
+
+
+def drop_case_number_sequence(apps, schema_editor):
+    drop_sequence(schema_editor, CASE_NUMBER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenceCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'sequence_counters',
+            },
+        ),
+        migrations.RunPython(seed_case_number_sequence, drop_case_number_sequence),
+    ]
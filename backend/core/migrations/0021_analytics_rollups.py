@@ -0,0 +1,85 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DropOffRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outcome', models.CharField(choices=[('lead_dropped', 'Lead Not Eligible'), ('client_not_eligible', 'Client Not Eligible'), ('client_not_proceeding', 'Client Withdrawn'), ('case_declined', 'Case Declined'), ('case_withdrawn', 'Case Withdrawn')], max_length=30)),
+                ('stage', models.CharField(blank=True, default='', max_length=20)),
+                ('reason', models.CharField(blank=True, default='', max_length=200)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'drop_off_rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='FunnelRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('channel', 'Channel'), ('sub_source', 'Sub-Source'), ('campaign', 'Campaign')], max_length=20)),
+                ('key', models.CharField(blank=True, default='', max_length=64)),
+                ('leads', models.IntegerField(default=0)),
+                ('leads_converted', models.IntegerField(default=0)),
+                ('leads_dropped', models.IntegerField(default=0)),
+                ('clients', models.IntegerField(default=0)),
+                ('clients_with_case', models.IntegerField(default=0)),
+                ('clients_not_eligible', models.IntegerField(default=0)),
+                ('clients_not_proceeding', models.IntegerField(default=0)),
+                ('cases', models.IntegerField(default=0)),
+                ('cases_disbursed', models.IntegerField(default=0)),
+                ('cases_declined', models.IntegerField(default=0)),
+                ('cases_withdrawn', models.IntegerField(default=0)),
+                ('disbursed_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'db_table': 'funnel_rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rollup_watermarks',
+            },
+        ),
+        migrations.CreateModel(
+            name='StageDurationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=20)),
+                ('bucket', models.SmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('total_seconds', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'stage_duration_rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stagedurationrollup',
+            constraint=models.UniqueConstraint(fields=('stage', 'bucket'), name='stage_duration_rollups_stage_bucket'),
+        ),
+        migrations.AddConstraint(
+            model_name='funnelrollup',
+            constraint=models.UniqueConstraint(fields=('dimension', 'key'), name='funnel_rollups_dimension_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='dropoffrollup',
+            constraint=models.UniqueConstraint(fields=('outcome', 'stage', 'reason'), name='drop_off_rollups_outcome_stage_reason'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sub_source', models.CharField(blank=True, default='', max_length=64)),
+                ('leads', models.IntegerField(default=0)),
+                ('calls', models.IntegerField(default=0)),
+                ('notes', models.IntegerField(default=0)),
+                ('conversions', models.IntegerField(default=0)),
+                ('cases_opened', models.IntegerField(default=0)),
+                ('cases_disbursed', models.IntegerField(default=0)),
+                ('disbursed_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'db_table': 'daily_metrics',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailymetric',
+            constraint=models.UniqueConstraint(fields=('day', 'sub_source'), name='daily_metrics_day_sub_source'),
+        ),
+    ]
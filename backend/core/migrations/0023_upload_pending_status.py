@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_daily_metric'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bankform',
+            name='status',
+            field=models.CharField(choices=[('missing', 'Missing'), ('pending', 'Uploading'), ('uploaded', 'Uploaded'), ('verified', 'Verified')], default='missing', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='status',
+            field=models.CharField(choices=[('missing', 'Missing'), ('pending', 'Uploading'), ('uploaded', 'Uploaded'), ('verified', 'Verified'), ('notApplicable', 'Not Applicable')], default='missing', max_length=20),
+        ),
+    ]
@@ -5,6 +5,28 @@ Rivo OS - Core Data Models
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
+import re
+
+
+def normalize_phone(value):
+    """Digits-only form of a phone number, used for phone search"""
+    return re.sub(r'\D', '', value or '')
+
+
+class TouchMixin:
+    """
+    Bump updated_at with a single-column UPDATE - no full-row write, no
+    save signals. Used when activity is logged against an entity.
+    """
+
+    @classmethod
+    def touch_pk(cls, pk) -> bool:
+        """Touch by primary key; False if no such row"""
+        return cls.objects.filter(pk=pk).update(updated_at=timezone.now()) > 0
+
+    def touch(self):
+        self.updated_at = timezone.now()
+        type(self).objects.filter(pk=self.pk).update(updated_at=self.updated_at)
 
 
 # =============================================================================
@@ -335,7 +357,7 @@ class EiborRate(models.Model):
 # Lead Model
 # =============================================================================
 
-class Lead(models.Model):
+class Lead(TouchMixin, models.Model):
     """Raw signal from unverified channels (untrusted sources)"""
 
     STATUS_CHOICES = [
@@ -348,6 +370,7 @@ class Lead(models.Model):
     last_name = models.CharField(max_length=100)
     email = models.EmailField(blank=True, null=True)
     phone = models.CharField(max_length=20)
+    phone_digits = models.CharField(max_length=20, blank=True, default='', editable=False)
     source = models.ForeignKey(SubSource, on_delete=models.SET_NULL, null=True, blank=True, related_name='leads')
     intent = models.TextField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
@@ -361,12 +384,19 @@ class Lead(models.Model):
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['source']),
-            models.Index(fields=['-created_at']),
+            models.Index(fields=['-created_at', '-id']),
         ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def save(self, *args, **kwargs):
+        self.phone_digits = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_digits'}
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -383,7 +413,7 @@ class Lead(models.Model):
 # Client Model
 # =============================================================================
 
-class Client(models.Model):
+class Client(TouchMixin, models.Model):
     """Verified prospect with confirmed intent"""
 
     RESIDENCY_CHOICES = [
@@ -414,6 +444,7 @@ class Client(models.Model):
     last_name = models.CharField(max_length=100)
     email = models.EmailField(blank=True, default='')
     phone = models.CharField(max_length=20)
+    phone_digits = models.CharField(max_length=20, blank=True, default='', editable=False)
     residency_status = models.CharField(max_length=20, choices=RESIDENCY_CHOICES, default='resident')
     date_of_birth = models.DateField(null=True, blank=True)
     nationality = models.CharField(max_length=100, blank=True, default='')
@@ -451,12 +482,19 @@ class Client(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['eligibility_status']),
             models.Index(fields=['source']),
-            models.Index(fields=['-created_at']),
+            models.Index(fields=['-created_at', '-id']),
         ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def save(self, *args, **kwargs):
+        self.phone_digits = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_digits'}
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -469,45 +507,9 @@ class Client(models.Model):
         return None
 
     def calculate_eligibility(self):
-        """Calculate DBR, LTV, and eligibility status"""
-        from decimal import Decimal
-
-        # Calculate DBR (capped at 999.99 to fit in database field)
-        if self.monthly_salary and self.monthly_salary > 0 and self.monthly_liabilities:
-            dbr = (self.monthly_liabilities / self.monthly_salary) * 100
-            self.estimated_dbr = min(dbr, Decimal('999.99'))
-        else:
-            self.estimated_dbr = None
-
-        # Calculate LTV (capped at 999.99 to fit in database field)
-        if self.loan_amount and self.estimated_property_value and self.estimated_property_value > 0:
-            ltv = (self.loan_amount / self.estimated_property_value) * 100
-            self.estimated_ltv = min(ltv, Decimal('999.99'))
-        else:
-            self.estimated_ltv = None
-
-        # Calculate max loan amount
-        if self.monthly_salary and self.monthly_salary > 0:
-            max_emi = self.monthly_salary * Decimal('0.5')
-            if self.monthly_liabilities:
-                max_emi -= self.monthly_liabilities
-            if max_emi > 0:
-                self.max_loan_amount = max_emi * 240
-            else:
-                self.max_loan_amount = Decimal('0')
-
-        # Determine eligibility
-        # DBR threshold: 50% for all
-        dbr_ok = self.estimated_dbr is None or self.estimated_dbr <= 50
-
-        # LTV threshold: 85% for UAE Nationals (citizen), 80% for others
-        ltv_limit = 85 if self.residency_status == 'citizen' else 80
-        ltv_ok = self.estimated_ltv is None or self.estimated_ltv <= ltv_limit
-
-        if dbr_ok and ltv_ok:
-            self.eligibility_status = 'eligible'
-        else:
-            self.eligibility_status = 'notEligible'
+        """Calculate DBR, LTV, max loan and eligibility status (see core.eligibility)"""
+        from core.eligibility import EligibilityPolicy
+        EligibilityPolicy.from_settings().apply(self)
 
 
 class Document(models.Model):
@@ -533,6 +535,7 @@ class Document(models.Model):
 
     STATUS_CHOICES = [
         ('missing', 'Missing'),
+        ('pending', 'Uploading'),
         ('uploaded', 'Uploaded'),
         ('verified', 'Verified'),
         ('notApplicable', 'Not Applicable'),
@@ -556,7 +559,7 @@ class Document(models.Model):
 # Case Model
 # =============================================================================
 
-class Case(models.Model):
+class Case(TouchMixin, models.Model):
     """Bank application"""
 
     CASE_TYPE_CHOICES = [
@@ -658,7 +661,7 @@ class Case(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['stage']),
-            models.Index(fields=['-created_at']),
+            models.Index(fields=['-created_at', '-id']),
         ]
 
     def __str__(self):
@@ -666,10 +669,9 @@ class Case(models.Model):
 
     @classmethod
     def generate_case_id(cls):
-        """Generate next case ID in RV-XXXXX format"""
-        last_case = cls.objects.order_by('-id').first()
-        next_num = (last_case.id + 1) if last_case else 1
-        return f'RV-{next_num:05d}'
+        """Allocate the next case ID in RV-XXXXX format from the case number sequence"""
+        from core.sequences import CASE_NUMBER, next_value
+        return f'RV-{next_value(CASE_NUMBER):05d}'
 
     def get_next_stage(self):
         """Get the next stage in the pipeline"""
@@ -707,6 +709,7 @@ class BankForm(models.Model):
 
     STATUS_CHOICES = [
         ('missing', 'Missing'),
+        ('pending', 'Uploading'),
         ('uploaded', 'Uploaded'),
         ('verified', 'Verified'),
     ]
@@ -891,3 +894,235 @@ class WhatsAppMessage(models.Model):
 
     def __str__(self):
         return f"{self.direction}: {self.content[:50]}"
+
+
+class WhatsAppConversation(models.Model):
+    """Denormalized inbox summary - one row per lead/client WhatsApp thread"""
+
+    ENTITY_TYPE_CHOICES = [
+        ('lead', 'Lead'),
+        ('client', 'Client'),
+    ]
+
+    PREVIEW_LENGTH = 50
+
+    entity_type = models.CharField(max_length=10, choices=ENTITY_TYPE_CHOICES)
+    lead = models.OneToOneField(Lead, null=True, blank=True, on_delete=models.CASCADE, related_name='whatsapp_conversation')
+    client = models.OneToOneField(Client, null=True, blank=True, on_delete=models.CASCADE, related_name='whatsapp_conversation')
+    last_message_preview = models.CharField(max_length=60, blank=True, default='')
+    last_message_direction = models.CharField(max_length=10, choices=WhatsAppMessage.DIRECTION_CHOICES)
+    last_message_at = models.DateTimeField()
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'whatsapp_conversations'
+        ordering = ['-last_message_at']
+        indexes = [
+            models.Index(fields=['-last_message_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type}:{self.lead_id or self.client_id} ({self.unread_count} unread)"
+
+    @classmethod
+    def build_preview(cls, content: str) -> str:
+        """Truncate message content for the inbox list"""
+        if len(content) > cls.PREVIEW_LENGTH:
+            return content[:cls.PREVIEW_LENGTH] + '...'
+        return content
+
+
+# =============================================================================
+# Sequences
+# =============================================================================
+
+class SequenceCounter(models.Model):
+    """
+    Counter row backing core.sequences on databases without native
+    sequences (SQLite in dev). PostgreSQL uses a real sequence instead.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'sequence_counters'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+# =============================================================================
+# Background Jobs
+# =============================================================================
+
+class Job(models.Model):
+    """
+    Queued unit of background work, run by `manage.py run_jobs` workers
+    (see core.jobs). A running job whose locked_until has passed is
+    considered abandoned and is claimed again.
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    # Jobs with the same key are deduplicated while one of them is queued
+    idempotency_key = models.CharField(max_length=200, null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField()
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['idempotency_key'],
+                condition=models.Q(status='queued'),
+                name='jobs_queued_idempotency_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+
+# =============================================================================
+# Analytics Rollups
+# =============================================================================
+
+class RollupWatermark(models.Model):
+    """
+    Id of the last source row folded into the rollup tables, per source
+    (see api.services.analytics). Refreshers lock these rows, so only one
+    refresh runs at a time.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'rollup_watermarks'
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+class FunnelRollup(models.Model):
+    """Lead -> client -> case -> disbursed counters per channel, sub-source or campaign"""
+
+    DIMENSION_CHOICES = [
+        ('channel', 'Channel'),
+        ('sub_source', 'Sub-Source'),
+        ('campaign', 'Campaign'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=64, blank=True, default='')  # '' when unattributed
+
+    leads = models.IntegerField(default=0)
+    leads_converted = models.IntegerField(default=0)
+    leads_dropped = models.IntegerField(default=0)
+    clients = models.IntegerField(default=0)
+    clients_with_case = models.IntegerField(default=0)
+    clients_not_eligible = models.IntegerField(default=0)
+    clients_not_proceeding = models.IntegerField(default=0)
+    cases = models.IntegerField(default=0)
+    cases_disbursed = models.IntegerField(default=0)
+    cases_declined = models.IntegerField(default=0)
+    cases_withdrawn = models.IntegerField(default=0)
+    disbursed_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'funnel_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key'], name='funnel_rollups_dimension_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.key or '-'}"
+
+
+class StageDurationRollup(models.Model):
+    """Histogram of completed stays in a case stage (bucket index into analytics.DURATION_BUCKETS)"""
+
+    stage = models.CharField(max_length=20)
+    bucket = models.SmallIntegerField()
+    count = models.IntegerField(default=0)
+    total_seconds = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'stage_duration_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['stage', 'bucket'], name='stage_duration_rollups_stage_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.stage}[{self.bucket}] = {self.count}"
+
+
+class DropOffRollup(models.Model):
+    """Leads, clients and cases leaving the funnel, by outcome, stage left and reason"""
+
+    OUTCOME_CHOICES = [
+        ('lead_dropped', 'Lead Not Eligible'),
+        ('client_not_eligible', 'Client Not Eligible'),
+        ('client_not_proceeding', 'Client Withdrawn'),
+        ('case_declined', 'Case Declined'),
+        ('case_withdrawn', 'Case Withdrawn'),
+    ]
+
+    outcome = models.CharField(max_length=30, choices=OUTCOME_CHOICES)
+    stage = models.CharField(max_length=20, blank=True, default='')  # Case stage left, '' for leads/clients
+    reason = models.CharField(max_length=200, blank=True, default='')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'drop_off_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['outcome', 'stage', 'reason'], name='drop_off_rollups_outcome_stage_reason'),
+        ]
+
+    def __str__(self):
+        return f"{self.outcome} ({self.reason or '-'}) = {self.count}"
+
+
+class DailyMetric(models.Model):
+    """Activity counters per day (in TIME_ZONE) and sub-source, for dashboard time series"""
+
+    day = models.DateField()
+    sub_source = models.CharField(max_length=64, blank=True, default='')  # SubSource id, '' when unattributed
+
+    leads = models.IntegerField(default=0)
+    calls = models.IntegerField(default=0)
+    notes = models.IntegerField(default=0)
+    conversions = models.IntegerField(default=0)  # Leads converted to clients
+    cases_opened = models.IntegerField(default=0)
+    cases_disbursed = models.IntegerField(default=0)
+    disbursed_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'daily_metrics'
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'sub_source'], name='daily_metrics_day_sub_source'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.sub_source or '-'}"
@@ -0,0 +1,293 @@
+"""
+Mortgage Computation
+
+Monthly payments, total cost and amortization schedules for bank products,
+vectorized across products: every product is a row of (products, months)
+NumPy matrices, so comparing the whole catalogue costs one pass over the
+term instead of one per product.
+
+Rates follow the product structure:
+- an initial period at fixed_rate for fixed_until years (fixed products),
+- then the follow-on rate: EIBOR (of the product's eibor_type, from the
+  latest snapshot) + variable_rate_addition floored at minimum_rate, or a
+  fixed follow_on_rate.
+
+The payment is re-amortized over the remaining term whenever the rate
+changes. Results are memoized per (product version, amount, term,
+property value, EIBOR snapshot).
+"""
+
+import threading
+
+import numpy as np
+from cachetools import LRUCache
+
+# BankProduct.eibor_type -> EiborRate.term
+EIBOR_TERMS = {
+    'EIBOR 3 MONTH': '3_months',
+    'EIBOR 6 MONTH': '6_months',
+    'EIBOR 1 YEAR': '1_year',
+}
+
+SUMMARY_CACHE_SIZE = 4096
+SCHEDULE_CACHE_SIZE = 128
+
+_summary_cache = LRUCache(maxsize=SUMMARY_CACHE_SIZE)
+_schedule_cache = LRUCache(maxsize=SCHEDULE_CACHE_SIZE)
+_cache_lock = threading.Lock()
+
+
+def _float(value, default=0.0) -> float:
+    return default if value is None else float(value)
+
+
+class Quote:
+    """Loan parameters shared by every product in a comparison"""
+
+    def __init__(self, loan_amount, term_months: int, property_value=None, eibor: dict = None):
+        """
+        Args:
+            loan_amount: Principal
+            term_months: Number of monthly instalments
+            property_value: Needed for property insurance, optional
+            eibor: EIBOR snapshot {'date': date, 'rates': {term: rate}}, optional
+        """
+        self.loan_amount = float(loan_amount)
+        self.term_months = int(term_months)
+        self.property_value = _float(property_value)
+        self.eibor = eibor or {'date': None, 'rates': {}}
+
+    def cache_key(self, product) -> tuple:
+        """Memo key: product version + loan parameters + EIBOR snapshot"""
+        rates = tuple(sorted(self.eibor['rates'].items()))
+        return (product.id, product.updated_at, self.loan_amount, self.term_months,
+                self.property_value, self.eibor['date'], rates)
+
+
+def variable_rate(product, eibor: dict = None) -> float:
+    """
+    EIBOR + margin, floored at minimum_rate. EIBOR is the snapshot rate for
+    the product's tenor, else the rate stored on the product; products with
+    neither fall back to their headline interest_rate.
+    """
+    rate = (eibor or {}).get('rates', {}).get(EIBOR_TERMS.get(product.eibor_type))
+    if rate is None:
+        rate = product.eibor_rate
+    if rate is None:
+        variable = _float(product.interest_rate, float(product.variable_rate_addition))
+    else:
+        variable = float(rate) + float(product.variable_rate_addition)
+    return max(variable, float(product.minimum_rate))
+
+
+def is_fixed(product) -> bool:
+    return product.interest_rate_type == 'fixed' or bool(product.fixed_until)
+
+
+def initial_rate(product, eibor: dict = None) -> float:
+    """Annual rate (%) of the first instalment"""
+    if is_fixed(product):
+        return float(product.fixed_rate) or _float(product.interest_rate, variable_rate(product, eibor))
+    return variable_rate(product, eibor)
+
+
+def effective_rates(product, eibor: dict) -> dict:
+    """
+    A product's stored rate fields re-derived from an EIBOR snapshot:
+    eibor_rate, interest_rate (rate of the first instalment) and, unless
+    the follow-on rate is fixed, follow_on_rate. Empty when the snapshot
+    has no fixing for the product's tenor.
+    """
+    rate = eibor['rates'].get(EIBOR_TERMS.get(product.eibor_type))
+    if rate is None:
+        return {}
+    rates = {'eibor_rate': rate, 'interest_rate': initial_rate(product, eibor)}
+    if product.follow_on_rate_type != 'fixed':
+        rates['follow_on_rate'] = variable_rate(product, eibor)
+    return rates
+
+
+def rate_plan(products: list, quote: Quote):
+    """
+    Per-product rate structure.
+
+    Returns:
+        (initial_rate, fixed_months, follow_on_rate) float arrays, rates in %
+    """
+    initial, fixed_months, follow_on = [], [], []
+    for product in products:
+        if product.follow_on_rate_type == 'fixed' and product.follow_on_rate is not None:
+            follow = float(product.follow_on_rate)
+        else:
+            follow = variable_rate(product, quote.eibor)
+
+        if is_fixed(product):
+            # A fixed product without a fixed period is fixed for the whole term
+            months = product.fixed_until * 12 if product.fixed_until else quote.term_months
+        else:
+            months = 0
+
+        initial.append(initial_rate(product, quote.eibor))
+        fixed_months.append(months)
+        follow_on.append(follow)
+    return np.array(initial, dtype=float), np.array(fixed_months, dtype=float), np.array(follow_on, dtype=float)
+
+
+def amortize(principal: float, initial_rate, fixed_months, follow_on_rate, term_months: int) -> dict:
+    """
+    Amortization schedules for P rate plans at once.
+
+    Returns:
+        Dict of (P, term_months) arrays: 'rate' (%), 'payment', 'interest',
+        'principal' and 'balance' (outstanding at the start of each month)
+    """
+    count = len(initial_rate)
+    shape = (count, term_months)
+    schedule = {name: np.zeros(shape) for name in ('rate', 'payment', 'interest', 'principal', 'balance')}
+
+    balance = np.full(count, float(principal))
+    for month in range(term_months):
+        rate = np.where(month < fixed_months, initial_rate, follow_on_rate)
+        monthly = rate / 1200.0
+        remaining = term_months - month
+        # Annuity over the remaining term - equals the original instalment
+        # while the rate is unchanged, re-amortizes when it changes
+        with np.errstate(divide='ignore', invalid='ignore'):
+            payment = np.where(
+                monthly > 0,
+                balance * monthly / (1.0 - (1.0 + monthly) ** -remaining),
+                balance / remaining,
+            )
+        interest = balance * monthly
+
+        schedule['rate'][:, month] = rate
+        schedule['balance'][:, month] = balance
+        schedule['payment'][:, month] = payment
+        schedule['interest'][:, month] = interest
+        schedule['principal'][:, month] = payment - interest
+        balance = balance - (payment - interest)
+    return schedule
+
+
+def insurance_costs(products: list, quote: Quote, balance) -> np.ndarray:
+    """(P, months) life insurance on the outstanding balance plus property insurance on the property value"""
+    costs = np.zeros_like(balance)
+    months = np.arange(balance.shape[1])
+    for row, product in enumerate(products):
+        for rate, period, base in (
+            (product.life_insurance, product.life_insurance_payment_period, balance[row]),
+            (product.property_insurance, product.property_insurance_payment_period, quote.property_value),
+        ):
+            rate = float(rate) / 100
+            if not rate:
+                continue
+            if period == 'monthly':
+                costs[row] += base * rate
+            elif period == 'annually':
+                costs[row] += np.where(months % 12 == 0, base * rate, 0.0)
+            else:  # one_time
+                costs[row, 0] += (base[0] if np.ndim(base) else base) * rate
+    return costs
+
+
+def upfront_fees(product, quote: Quote) -> float:
+    """Processing (flat amount, or % of the loan with a minimum), valuation and pre-approval fees"""
+    if product.mortgage_processing_fee_as_amount is not None:
+        processing = float(product.mortgage_processing_fee_as_amount)
+    else:
+        processing = max(
+            quote.loan_amount * float(product.mortgage_processing_fee) / 100,
+            float(product.minimum_mortgage_processing_fee),
+        )
+    return processing + float(product.home_valuation_fee) + float(product.pre_approval_fee)
+
+
+def _compute(products: list, quote: Quote):
+    """Vectorized schedules, insurance and summaries for the given products"""
+    initial, fixed_months, follow_on = rate_plan(products, quote)
+    schedule = amortize(quote.loan_amount, initial, fixed_months, follow_on, quote.term_months)
+    schedule['insurance'] = insurance_costs(products, quote, schedule['balance'])
+
+    total_interest = schedule['interest'].sum(axis=1)
+    total_insurance = schedule['insurance'].sum(axis=1)
+    summaries = []
+    for row, product in enumerate(products):
+        fees = upfront_fees(product, quote)
+        switch = int(fixed_months[row])
+        follow_on_payment = schedule['payment'][row, switch] if switch < quote.term_months else None
+        summaries.append({
+            'productId': product.id,
+            'bankName': product.bank_name,
+            'mortgageType': product.type_of_mortgage,
+            'initialRate': round(float(initial[row]), 3),
+            'fixedMonths': min(switch, quote.term_months),
+            'followOnRate': round(float(follow_on[row]), 3) if switch < quote.term_months else None,
+            'initialPayment': round(float(schedule['payment'][row, 0]), 2),
+            'followOnPayment': round(float(follow_on_payment), 2) if follow_on_payment is not None else None,
+            'totalInterest': round(float(total_interest[row]), 2),
+            'totalInsurance': round(float(total_insurance[row]), 2),
+            'upfrontFees': round(fees, 2),
+            'totalCost': round(float(quote.loan_amount + total_interest[row] + total_insurance[row] + fees), 2),
+        })
+    return schedule, summaries
+
+
+def compare_products(products: list, quote: Quote) -> list:
+    """
+    Cost summaries for every product, cheapest total cost first.
+    Only products missing from the memo are computed, in one vectorized pass.
+    """
+    keys = [quote.cache_key(product) for product in products]
+    with _cache_lock:
+        cached = {key: _summary_cache.get(key) for key in keys}
+
+    missing = [product for product, key in zip(products, keys) if cached[key] is None]
+    if missing:
+        _, summaries = _compute(missing, quote)
+        with _cache_lock:
+            for product, summary in zip(missing, summaries):
+                key = quote.cache_key(product)
+                _summary_cache[key] = cached[key] = summary
+
+    return sorted((cached[key] for key in keys), key=lambda summary: summary['totalCost'])
+
+
+def product_schedule(product, quote: Quote) -> dict:
+    """
+    Summary plus month-by-month schedule for one product.
+
+    Returns:
+        {'summary': {...}, 'months': [{'month', 'rate', 'payment', 'interest',
+        'principal', 'insurance', 'balance'}, ...]}
+    """
+    key = quote.cache_key(product)
+    with _cache_lock:
+        result = _schedule_cache.get(key)
+    if result is not None:
+        return result
+
+    schedule, (summary,) = _compute([product], quote)
+    closing = schedule['balance'][0] - schedule['principal'][0]
+    months = [
+        {
+            'month': month + 1,
+            'rate': round(float(schedule['rate'][0, month]), 3),
+            'payment': round(float(schedule['payment'][0, month]), 2),
+            'interest': round(float(schedule['interest'][0, month]), 2),
+            'principal': round(float(schedule['principal'][0, month]), 2),
+            'insurance': round(float(schedule['insurance'][0, month]), 2),
+            'balance': round(max(float(closing[month]), 0.0), 2),
+        }
+        for month in range(quote.term_months)
+    ]
+    result = {'summary': summary, 'months': months}
+    with _cache_lock:
+        _schedule_cache[key] = result
+        _summary_cache.setdefault(key, summary)
+    return result
+
+
+def clear_memo():
+    with _cache_lock:
+        _summary_cache.clear()
+        _schedule_cache.clear()
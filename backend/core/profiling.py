@@ -0,0 +1,73 @@
+"""
+Request Profiling
+
+Per-request counters for SQL round trips, DB time and named code sections.
+PerformanceMiddleware opens a RequestProfile for every request; code can
+time a section of work with:
+
+    with profile_section('serialize'):
+        data = serializer.data
+
+Sections may overlap with DB time (queries made while serializing count
+towards both 'db' and 'serialize').
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_profile = ContextVar('rivo_request_profile', default=None)
+
+
+class RequestProfile:
+    """Counters for a single request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.sections = {}
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add_section(self, name: str, seconds: float):
+        self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook - counts and times every query"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.db_time += time.perf_counter() - start
+
+
+def get_current_profile():
+    """The RequestProfile of the current request, or None outside a request"""
+    return _current_profile.get()
+
+
+@contextmanager
+def activate_profile(profile: RequestProfile):
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+@contextmanager
+def profile_section(name: str):
+    """Time a block of work under the given name (no-op outside a profiled request)"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_section(name, time.perf_counter() - start)
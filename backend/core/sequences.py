@@ -0,0 +1,57 @@
+"""
+Sequence allocator
+
+Hands out monotonically increasing numbers without scanning the table
+they are used in and without retries under concurrent callers:
+
+- PostgreSQL: nextval() on a native sequence named '<name>_seq'
+- Other databases: a single UPDATE ... SET value = value + 1 on a
+  SequenceCounter row, which serializes concurrent writers on that row
+
+Sequences are created and seeded by migrations (see 0019). Numbers taken
+by a rolled-back transaction are not reused on PostgreSQL, so gaps are
+possible but duplicates are not.
+"""
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+CASE_NUMBER = 'case_number'
+
+
+def next_value(name: str) -> int:
+    """Allocate the next number of a sequence"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s)', [f'{name}_seq'])
+            return cursor.fetchone()[0]
+
+    from core.models import SequenceCounter
+
+    with transaction.atomic():
+        if not SequenceCounter.objects.filter(name=name).update(value=F('value') + 1):
+            # First use of an unseeded sequence
+            try:
+                with transaction.atomic():
+                    SequenceCounter.objects.create(name=name, value=0)
+            except IntegrityError:
+                pass
+            SequenceCounter.objects.filter(name=name).update(value=F('value') + 1)
+        return SequenceCounter.objects.values_list('value', flat=True).get(name=name)
+
+
+def create_sequence(schema_editor, name: str, start: int = 1):
+    """Create a sequence whose first next_value() returns start (for migrations)"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS {name}_seq START WITH {int(start)}')
+        schema_editor.execute(f"SELECT setval('{name}_seq', {int(start)}, false)")
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO sequence_counters (name, value) VALUES (%s, %s)', [name, int(start) - 1]
+        )
+
+
+def drop_sequence(schema_editor, name: str):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS {name}_seq')
@@ -1,14 +1,37 @@
 """
-Supabase Storage Service for document uploads
+Document storage backends
+
+Backends share one interface: object_path() reserves a unique key,
+public_url() maps it to the URL stored on Document/BankForm, upload_path()
+streams a local file to that key and delete_file() removes it by URL.
+
+- SupabaseStorage: Supabase Storage bucket (production)
+- LocalStorage: files under LOCAL_STORAGE_ROOT, served by core.views.serve_local_file
+- MemoryStorage: process-local dict, for tests and benchmarks
+
+The backend is chosen by settings.STORAGE_BACKEND and created on first
+use, so importing views needs no credentials and makes no network client:
+
+    from core.storage import get_storage
+    get_storage().delete_file(url)
 """
 import os
+import shutil
+import threading
 import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+
 from django.conf import settings
-from supabase import create_client, Client
+from django.utils._os import safe_join
 
 
-def get_supabase_client() -> Client:
+def get_supabase_client():
     """Get Supabase client instance"""
+    # Imported here - the client library is slow to import and only needed
+    # when the Supabase backend is actually used
+    from supabase import create_client
+
     url = settings.SUPABASE_URL
     key = settings.SUPABASE_KEY
     if not url or not key:
@@ -16,13 +39,91 @@ def get_supabase_client() -> Client:
     return create_client(url, key)
 
 
-class SupabaseStorage:
+class StorageBackend(ABC):
+    """Base class - subclasses implement the object-key methods"""
+
+    @staticmethod
+    def object_path(filename: str, folder: str = "") -> str:
+        """Unique object key - folder with a UUID to avoid collisions"""
+        unique_folder = f"{folder}/{uuid.uuid4()}" if folder else str(uuid.uuid4())
+        return f"{unique_folder}/{filename}"
+
+    @abstractmethod
+    def public_url(self, file_path: str) -> str:
+        """Public URL of an object key"""
+
+    @abstractmethod
+    def path_from_url(self, file_url: str):
+        """Object key of a public URL, None if the URL isn't in this storage"""
+
+    @abstractmethod
+    def upload_path(self, file_path: str, source: str, content_type: str):
+        """
+        Stream a local file to storage.
+
+        Args:
+            file_path: Object key from object_path()
+            source: Local file to upload
+            content_type: MIME type of the file
+        """
+
+    @abstractmethod
+    def upload_bytes(self, file_path: str, file_data: bytes, content_type: str):
+        """Store in-memory content under an object key"""
+
+    @abstractmethod
+    def delete_path(self, file_path: str):
+        """Remove an object by key"""
+
+    def upload_file(self, file_data: bytes, filename: str, content_type: str, folder: str = "") -> str:
+        """
+        Upload in-memory file content.
+
+        Args:
+            file_data: File content as bytes
+            filename: Original filename
+            content_type: MIME type of the file
+            folder: Optional folder path (e.g., 'clients/123')
+
+        Returns:
+            Public URL of the uploaded file
+        """
+        file_path = self.object_path(filename, folder)
+        self.upload_bytes(file_path, file_data, content_type)
+        return self.public_url(file_path)
+
+    def delete_file(self, file_url: str) -> bool:
+        """
+        Delete a file by its public URL.
+
+        Returns:
+            True if the URL belongs to this storage
+        """
+        file_path = self.path_from_url(file_url)
+        if file_path is None:
+            return False
+        self.delete_path(file_path)
+        return True
+
+
+class SupabaseStorage(StorageBackend):
     """Service for handling file uploads to Supabase Storage"""
 
     BUCKET_NAME = "documents"
 
     def __init__(self):
-        self.client = get_supabase_client()
+        self._client = None
+
+    @property
+    def client(self):
+        """Supabase client, created on first use"""
+        if self._client is None:
+            self._client = get_supabase_client()
+        return self._client
+
+    @property
+    def bucket(self):
+        return self.client.storage.from_(self.BUCKET_NAME)
 
     def ensure_bucket_exists(self):
         """Create the documents bucket if it doesn't exist"""
@@ -39,51 +140,25 @@ class SupabaseStorage:
                 }
             )
 
-    def upload_file(self, file_data: bytes, filename: str, content_type: str, folder: str = "") -> str:
-        """
-        Upload a file to Supabase Storage
+    def public_url(self, file_path: str) -> str:
+        return self.bucket.get_public_url(file_path)
 
-        Args:
-            file_data: File content as bytes
-            filename: Original filename
-            content_type: MIME type of the file
-            folder: Optional folder path (e.g., 'clients/123')
-
-        Returns:
-            Public URL of the uploaded file
-        """
-        # Build file path - use folder with UUID to avoid collisions
-        unique_folder = f"{folder}/{uuid.uuid4()}" if folder else str(uuid.uuid4())
-        file_path = f"{unique_folder}/{filename}"
-
-        # Upload to Supabase
-        self.client.storage.from_(self.BUCKET_NAME).upload(
-            path=file_path,
-            file=file_data,
-            file_options={"content-type": content_type}
-        )
+    def path_from_url(self, file_url: str):
+        base_url = f"{settings.SUPABASE_URL}/storage/v1/object/public/{self.BUCKET_NAME}/"
+        return file_url[len(base_url):] if file_url.startswith(base_url) else None
 
-        # Get public URL
-        public_url = self.client.storage.from_(self.BUCKET_NAME).get_public_url(file_path)
-        return public_url
+    def upload_path(self, file_path: str, source: str, content_type: str):
+        # Given a path the client opens the file itself and never closes it,
+        # so hand it an open file - streamed in chunks, closed here
+        with open(source, 'rb') as f:
+            self.bucket.upload(path=file_path, file=f,
+                               file_options={"content-type": content_type, "upsert": "true"})
 
-    def delete_file(self, file_url: str) -> bool:
-        """
-        Delete a file from Supabase Storage
+    def upload_bytes(self, file_path: str, file_data: bytes, content_type: str):
+        self.bucket.upload(path=file_path, file=file_data, file_options={"content-type": content_type})
 
-        Args:
-            file_url: The public URL of the file to delete
-
-        Returns:
-            True if deletion was successful
-        """
-        # Extract file path from URL
-        base_url = f"{settings.SUPABASE_URL}/storage/v1/object/public/{self.BUCKET_NAME}/"
-        if file_url.startswith(base_url):
-            file_path = file_url[len(base_url):]
-            self.client.storage.from_(self.BUCKET_NAME).remove([file_path])
-            return True
-        return False
+    def delete_path(self, file_path: str):
+        self.bucket.remove([file_path])
 
     def get_signed_url(self, file_path: str, expires_in: int = 3600) -> str:
         """
@@ -96,12 +171,106 @@ class SupabaseStorage:
         Returns:
             Signed URL for temporary access
         """
-        result = self.client.storage.from_(self.BUCKET_NAME).create_signed_url(
+        result = self.bucket.create_signed_url(
             path=file_path,
             expires_in=expires_in
         )
         return result.get("signedURL", "")
 
 
-# Singleton instance
-storage_service = SupabaseStorage()
+class LocalStorage(StorageBackend):
+    """Files under a local directory, served at LOCAL_STORAGE_URL"""
+
+    def __init__(self, root=None, base_url: str = None):
+        self.root = Path(root or settings.LOCAL_STORAGE_ROOT)
+        self.base_url = (base_url or settings.LOCAL_STORAGE_URL).rstrip("/")
+
+    def local_path(self, file_path: str) -> Path:
+        """Filesystem path of an object key (raises SuspiciousFileOperation outside root)"""
+        return Path(safe_join(self.root, file_path))
+
+    def public_url(self, file_path: str) -> str:
+        return f"{self.base_url}/{file_path}"
+
+    def path_from_url(self, file_url: str):
+        prefix = f"{self.base_url}/"
+        return file_url[len(prefix):] if file_url.startswith(prefix) else None
+
+    def upload_path(self, file_path: str, source: str, content_type: str):
+        target = self.local_path(file_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # copyfile uses os.sendfile on Linux - no copy through userspace
+        shutil.copyfile(source, target)
+
+    def upload_bytes(self, file_path: str, file_data: bytes, content_type: str):
+        target = self.local_path(file_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(file_data)
+
+    def delete_path(self, file_path: str):
+        try:
+            os.remove(self.local_path(file_path))
+        except FileNotFoundError:
+            pass
+
+
+class MemoryStorage(StorageBackend):
+    """Files kept in a dict - nothing touches disk or network"""
+
+    BASE_URL = "memory://documents"
+
+    def __init__(self):
+        self.files = {}  # object key -> (content, content type)
+        self._lock = threading.Lock()
+
+    def public_url(self, file_path: str) -> str:
+        return f"{self.BASE_URL}/{file_path}"
+
+    def path_from_url(self, file_url: str):
+        prefix = f"{self.BASE_URL}/"
+        return file_url[len(prefix):] if file_url.startswith(prefix) else None
+
+    def upload_path(self, file_path: str, source: str, content_type: str):
+        with open(source, "rb") as f:
+            self.upload_bytes(file_path, f.read(), content_type)
+
+    def upload_bytes(self, file_path: str, file_data: bytes, content_type: str):
+        with self._lock:
+            self.files[file_path] = (bytes(file_data), content_type)
+
+    def delete_path(self, file_path: str):
+        with self._lock:
+            self.files.pop(file_path, None)
+
+
+STORAGE_BACKENDS = {
+    'supabase': SupabaseStorage,
+    'local': LocalStorage,
+    'memory': MemoryStorage,
+}
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    """Process-wide backend selected by settings.STORAGE_BACKEND, created on first use"""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            try:
+                backend = STORAGE_BACKENDS[settings.STORAGE_BACKEND]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r} "
+                    f"(expected one of: {', '.join(STORAGE_BACKENDS)})"
+                )
+            _storage = backend()
+        return _storage
+
+
+def reset_storage():
+    """Drop the process-wide backend (after settings change in tests)"""
+    global _storage
+    with _storage_lock:
+        _storage = None
@@ -0,0 +1,57 @@
+"""
+Test helpers
+"""
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.cache import reference_cache
+from core.models import User
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting that a block stays within a query budget.
+
+    Budgets default to PERF_QUERY_BUDGETS, keyed by view tag
+    ('LeadViewSet.list'), so tests and the production warnings share one
+    source of truth.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, view_tag: str = None, budget: int = None):
+        if budget is None:
+            budget = settings.PERF_QUERY_BUDGETS[view_tag]
+        with CaptureQueriesContext(connection) as ctx:
+            yield ctx
+        count = len(ctx.captured_queries)
+        if count > budget:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(ctx.captured_queries, start=1)
+            )
+            self.fail(f'{view_tag or "block"} made {count} queries, budget is {budget}:\n{queries}')
+
+
+class APIClientMixin:
+    """
+    Authenticated APIClient (self.client, as self.user) for a test case.
+
+    Reference caches are emptied first so no dataset cached by an earlier,
+    rolled-back test is served - create fixtures after calling super().setUp().
+    """
+
+    def setUp(self):
+        super().setUp()
+        reference_cache.invalidate_all()
+        self.user = User.objects.create(username='agent')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class APIClientTestCase(APIClientMixin, TestCase):
+    """TestCase with an authenticated APIClient"""
@@ -0,0 +1,293 @@
+"""
+Document Upload Pipeline
+
+Uploads are taken off the request thread:
+
+1. submit() streams the request file in chunks into a spool directory
+   (or hard-links Django's temporary upload file) and writes a manifest
+   with fsync + rename - from then on the upload survives a restart.
+2. The object key and public URL are reserved up front, so the view
+   saves the Document/BankForm as 'pending' and responds immediately.
+3. Once the view's transaction commits, a small thread pool streams the
+   spooled file to the storage backend, retrying with exponential
+   backoff. On success the row is marked 'uploaded', the file it replaced
+   is queued for deletion ('storage.delete_file' job) and the spool entry
+   is removed. A file no row points at any more (the document was deleted
+   meanwhile) is deleted instead.
+4. If the transaction rolls back instead, Django drops the commit
+   callback and the spool entry is discarded with it.
+
+While a process owns a spool entry it holds an exclusive flock on its
+manifest. Entries whose lock is free - their process died, or gave up
+after max_attempts - are claimed by the next pipeline created in any
+process (each gunicorn worker resumes on first use).
+
+    pipeline = get_upload_pipeline()
+    file_url = pipeline.submit(
+        request.FILES['file'], folder=f'clients/{client.id}',
+        record='core.Document', replaces=document.file_url,
+    )
+    document.file_url, document.status = file_url, 'pending'
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.jobs import enqueue
+from core.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE = 0.5   # Seconds before the first retry, doubled per attempt
+BACKOFF_MAX = 30.0
+
+
+class UploadPipeline:
+    """Spooled, retried background uploads to a storage backend"""
+
+    def __init__(self, storage, spool_dir, workers: int = 2, max_attempts: int = 5):
+        """
+        Args:
+            storage: Backend with object_path/public_url/upload_path/delete_file
+            spool_dir: Directory for spooled files and their manifests
+            workers: Background upload threads
+            max_attempts: Tries per upload or delete before giving up
+        """
+        self.storage = storage
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Request path
+    # -------------------------------------------------------------------------
+
+    def submit(self, file, folder: str = '', record: str = None, replaces: str = None) -> str:
+        """
+        Spool an uploaded file and queue it for upload after the current
+        transaction commits.
+
+        Args:
+            file: Django UploadedFile
+            folder: Folder path in storage (e.g. 'clients/123')
+            record: Label of the model whose row is saved with the returned
+                URL and status 'pending' ('core.Document', 'core.BankForm') -
+                marked 'uploaded' once the file is stored
+            replaces: URL of the file this one replaces, deleted only after
+                the upload succeeded
+
+        Returns:
+            Public URL the file will be available at
+        """
+        entry_id = uuid.uuid4().hex
+        data_path = self.spool_dir / f'{entry_id}.data'
+        self._spool(file, data_path)
+
+        object_path = self.storage.object_path(file.name, folder)
+        manifest = {
+            'id': entry_id,
+            'object_path': object_path,
+            'content_type': file.content_type or 'application/octet-stream',
+            'size': file.size,
+            'record': record,
+            'replaces': replaces or None,
+        }
+        lock = self._write_manifest(manifest)
+        committed = []
+
+        def queue_upload():
+            committed.append(True)
+            self._queue(self._upload, manifest, lock)
+
+        # Django has no rollback hook, but a rollback (of the transaction or
+        # an enclosing savepoint) drops the callback without running it
+        weakref.finalize(queue_upload, self._abandon, manifest, lock, committed)
+        transaction.on_commit(queue_upload)
+        return self.storage.public_url(object_path)
+
+    def delete(self, file_url: str):
+        """Queue deletion of a stored file by its public URL (run by a job worker)"""
+        if file_url:
+            enqueue('storage.delete_file', {'file_url': file_url})
+
+    def _spool(self, file, data_path: Path):
+        temporary_path = getattr(file, 'temporary_file_path', None)
+        if temporary_path:
+            # Large uploads are already on disk - a hard link avoids the copy
+            try:
+                os.link(temporary_path(), data_path)
+                return
+            except OSError:
+                pass
+        with open(data_path, 'wb') as spooled:
+            for chunk in file.chunks():
+                spooled.write(chunk)
+            spooled.flush()
+            os.fsync(spooled.fileno())
+
+    def _abandon(self, manifest: dict, lock, committed: list):
+        """Remove the spool entry of an upload whose transaction rolled back"""
+        if committed:
+            return
+        # Still locked, so no other process can claim it while it goes
+        for suffix in ('.json', '.data'):
+            try:
+                os.remove(self.spool_dir / f'{manifest["id"]}{suffix}')
+            except FileNotFoundError:
+                pass
+        lock.close()
+
+    def _write_manifest(self, manifest: dict):
+        """Write the manifest atomically; returns the open file holding its lock"""
+        path = self.spool_dir / f'{manifest["id"]}.json'
+        partial = path.with_suffix('.json.tmp')
+        f = open(partial, 'w')
+        # Locked before the rename, so no other process can claim it in between
+        fcntl.flock(f, fcntl.LOCK_EX)
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+        os.replace(partial, path)
+        return f
+
+    # -------------------------------------------------------------------------
+    # Background work
+    # -------------------------------------------------------------------------
+
+    def _queue(self, fn, *args):
+        future = self._executor.submit(self._with_retries, fn, *args)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _with_retries(self, fn, manifest: dict, lock):
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    return fn(manifest)
+                except Exception:
+                    if attempt == self.max_attempts:
+                        logger.exception('Upload pipeline: %s failed after %d attempts', fn.__name__, attempt)
+                        return None
+                    delay = min(BACKOFF_BASE * 2 ** (attempt - 1), BACKOFF_MAX)
+                    logger.warning('Upload pipeline: %s failed (attempt %d), retrying in %.1fs',
+                                   fn.__name__, attempt, delay, exc_info=True)
+                    time.sleep(delay)
+        finally:
+            # Releases the claim - an entry still spooled is resumed by the next pipeline
+            lock.close()
+            connection.close()
+
+    def _upload(self, manifest: dict):
+        data_path = self.spool_dir / f'{manifest["id"]}.data'
+        self.storage.upload_path(manifest['object_path'], str(data_path), manifest['content_type'])
+        self._complete(manifest)
+        # Manifest first - a data file without one is never re-uploaded
+        os.remove(self.spool_dir / f'{manifest["id"]}.json')
+        os.remove(data_path)
+
+    def _complete(self, manifest: dict):
+        """Mark the row uploaded and queue the delete of whichever file is no longer referenced"""
+        file_url = self.storage.public_url(manifest['object_path'])
+        if manifest.get('record'):
+            rows = apps.get_model(manifest['record']).objects.filter(file_url=file_url)
+            if not rows.exists():
+                self.delete(file_url)
+                return
+            rows.filter(status='pending').update(status='uploaded', uploaded_at=timezone.now())
+        self.delete(manifest.get('replaces'))
+
+    def resume(self) -> int:
+        """Claim and re-queue spool entries no live process owns; returns how many"""
+        count = 0
+        for path in sorted(self.spool_dir.glob('*.json')):
+            lock = self._claim(path)
+            if lock is None:
+                continue
+            try:
+                manifest = json.load(lock)
+            except ValueError:
+                logger.warning('Upload pipeline: unreadable manifest %s', path)
+                lock.close()
+                continue
+            if not (self.spool_dir / f'{manifest["id"]}.data').exists():
+                lock.close()
+                continue
+            self._queue(self._upload, manifest, lock)
+            count += 1
+        return count
+
+    @staticmethod
+    def _claim(path: Path):
+        """Open and lock a manifest, or None when another process owns it or it's gone"""
+        try:
+            f = open(path)
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return None
+        # The owner may have finished and removed it while we waited for the lock
+        if not path.exists():
+            f.close()
+            return None
+        return f
+
+    def drain(self, timeout: float = None) -> bool:
+        """Wait for queued work (tests, shutdown); True when everything finished"""
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_upload_pipeline() -> UploadPipeline:
+    """Process-wide pipeline, created (and resumed) on first use"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = UploadPipeline(
+                get_storage(),
+                settings.UPLOAD_SPOOL_DIR,
+                workers=settings.UPLOAD_WORKERS,
+                max_attempts=settings.UPLOAD_MAX_ATTEMPTS,
+            )
+            resumed = _pipeline.resume()
+            if resumed:
+                logger.info('Upload pipeline: resumed %d spooled uploads', resumed)
+        return _pipeline
+
+
+def reset_upload_pipeline():
+    """Drop the process-wide pipeline (after settings change in tests)"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None:
+            _pipeline.drain()
+        _pipeline = None
@@ -1,3 +1,31 @@
-from django.shortcuts import render
+"""
+Core Views
+"""
 
-# Create your views here.
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+
+from core.storage import LocalStorage, get_storage
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def serve_local_file(request, path):
+    """
+    Serve a LocalStorage document to an authenticated user. FileResponse
+    hands the open file to the server's wsgi.file_wrapper, which gunicorn
+    sends with sendfile().
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise Http404('Local storage is not enabled')
+    try:
+        file_path = storage.local_path(path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    try:
+        return FileResponse(open(file_path, 'rb'))
+    except (FileNotFoundError, IsADirectoryError):
+        raise Http404('File not found')
@@ -1,4 +1,11 @@
 # Gunicorn configuration for Supabase PostgreSQL
+#
+# The web workers only enqueue background jobs (storage deletes, re-pricing,
+# analytics refreshes - see core.jobs). Run a job worker alongside gunicorn,
+# or those jobs sit in the jobs table:
+#
+#   gunicorn rivo.wsgi -c gunicorn.conf.py
+#   python manage.py run_jobs --processes 2
 import os
 
 # Use 2 workers for dev - keeps connections warm while allowing concurrency
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -122,6 +123,105 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 50,
 }
 
+# ===================
+# Caching
+# ===================
+# Set REDIS_URL (requires the redis package) to share cached reference data
+# across workers; otherwise each process only uses its local LRU tier.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+REFERENCE_CACHE = {
+    'LOCAL_MAXSIZE': 128,
+    'LOCAL_TTL': config('REFERENCE_CACHE_LOCAL_TTL', default=30, cast=int),
+    'SHARED_CACHE': 'default' if REDIS_URL else None,
+    'SHARED_TTL': 3600,
+}
+
+# ===================
+# Performance instrumentation
+# ===================
+PERF_INSTRUMENTATION = config('PERF_INSTRUMENTATION', default=True, cast=bool)
+# Server-Timing exposes DB and section timings to any client - opt in outside development
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=DEBUG, cast=bool)
+
+# Max SQL queries per request, keyed by view tag (includes token auth).
+# Exceeding a budget logs a warning; api/tests.py fails on it.
+PERF_QUERY_BUDGETS = {
+    'LeadViewSet.list': 6,
+    'LeadViewSet.ingest': 6,
+    'ClientViewSet.list': 8,
+    'CaseViewSet.list': 6,
+    'CaseViewSet.board': 5,
+    'whatsapp_conversations': 3,
+}
+
+# ===================
+# Eligibility policy (core.eligibility) - recalculate existing clients with
+# `manage.py recalculate_eligibility` after changing these
+# ===================
+ELIGIBILITY_POLICY = {
+    'MAX_DBR': config('ELIGIBILITY_MAX_DBR', default=50, cast=float),
+    'MAX_LTV_CITIZEN': config('ELIGIBILITY_MAX_LTV_CITIZEN', default=85, cast=float),
+    'MAX_LTV_RESIDENT': config('ELIGIBILITY_MAX_LTV_RESIDENT', default=80, cast=float),
+    'MAX_LOAN_DBR': config('ELIGIBILITY_MAX_LOAN_DBR', default=50, cast=float),
+    'MAX_LOAN_MONTHS': config('ELIGIBILITY_MAX_LOAN_MONTHS', default=240, cast=int),
+}
+
+# ===================
+# Background jobs (core.jobs) - run workers with `manage.py run_jobs`
+# ===================
+JOBS = {
+    'VISIBILITY_TIMEOUT': config('JOBS_VISIBILITY_TIMEOUT', default=300, cast=int),
+    'MAX_ATTEMPTS': config('JOBS_MAX_ATTEMPTS', default=5, cast=int),
+    'BACKOFF_BASE': 10,
+    'BACKOFF_MAX': 3600,
+    'POLL_INTERVAL': config('JOBS_POLL_INTERVAL', default=1.0, cast=float),
+    'RETENTION_DAYS': 7,
+}
+
+# ===================
+# Analytics rollups (api.services.analytics) - refresh with `manage.py refresh_analytics`
+# ===================
+ANALYTICS = {
+    'SETTLE_SECONDS': config('ANALYTICS_SETTLE_SECONDS', default=60, cast=int),
+    'BATCH_SIZE': config('ANALYTICS_BATCH_SIZE', default=5000, cast=int),
+}
+
+# ===================
+# Bulk ingest
+# ===================
+LEAD_INGEST_MAX_ROWS = config('LEAD_INGEST_MAX_ROWS', default=10000, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # WARNING logs only requests over their query budget - set
+        # PERF_LOG_LEVEL=INFO for one line per request
+        'rivo.perf': {
+            'handlers': ['console'],
+            'level': config('PERF_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # ===================
 # CORS
 # ===================
@@ -136,3 +236,14 @@ CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL', default=False, cast=bool)
 # Supabase Storage
 SUPABASE_URL = config('SUPABASE_URL', default='')
 SUPABASE_KEY = config('SUPABASE_KEY', default='')
+# Document storage (core.storage): 'supabase', 'local' (files under
+# LOCAL_STORAGE_ROOT, served at LOCAL_STORAGE_URL) or 'memory' (tests)
+STORAGE_BACKEND = config('STORAGE_BACKEND', default='supabase')
+LOCAL_STORAGE_ROOT = config('LOCAL_STORAGE_ROOT', default=str(BASE_DIR / 'media'))
+LOCAL_STORAGE_URL = config('LOCAL_STORAGE_URL', default='/media')
+
+# Upload pipeline (core.uploads) - files are spooled to disk and uploaded
+# by background threads; entries no live process owns are resumed on restart
+UPLOAD_SPOOL_DIR = config('UPLOAD_SPOOL_DIR', default=str(BASE_DIR / 'upload_spool'))
+UPLOAD_WORKERS = config('UPLOAD_WORKERS', default=2, cast=int)
+UPLOAD_MAX_ATTEMPTS = config('UPLOAD_MAX_ATTEMPTS', default=5, cast=int)
@@ -1,11 +1,16 @@
 """
 URL configuration for Rivo OS.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import serve_local_file
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     path('api/auth/', include('authentication.urls')),
+    # Documents of the 'local' storage backend (404 with any other backend)
+    path(f'{settings.LOCAL_STORAGE_URL.strip("/")}/<path:path>', serve_local_file),
 ]
@@ -22,6 +22,14 @@ export const whatsappApi = {
     return response.data
   },
 
+  // Clear the unread badge for a lead or client thread
+  async markRead(params: { leadId?: number; clientId?: number }): Promise<void> {
+    await api.post('/whatsapp/mark-read/', {
+      lead_id: params.leadId,
+      client_id: params.clientId,
+    })
+  },
+
   // Send a message
   async sendMessage(payload: SendMessagePayload): Promise<WhatsAppMessage> {
     const response = await api.post<WhatsAppMessage>('/whatsapp/send/', {
@@ -6,7 +6,7 @@
 import { useState, useEffect, useRef } from 'react'
 import { Send, Check, CheckCheck, AlertCircle, MessageCircle } from 'lucide-react'
 import { format, isToday, isYesterday } from 'date-fns'
-import { useWhatsAppMessages, useSendWhatsAppMessage } from '@/hooks/useWhatsApp'
+import { useWhatsAppMessages, useSendWhatsAppMessage, useMarkWhatsAppRead } from '@/hooks/useWhatsApp'
 import type { WhatsAppMessage, MessageStatus } from '@/types/whatsapp'
 
 interface WhatsAppChatProps {
@@ -67,12 +67,18 @@ export function WhatsAppChat({ entityType, entityId, phone, contactName, showHea
 
   const { data: messages = [], isLoading, error } = useWhatsAppMessages(entityType, entityId)
   const sendMessage = useSendWhatsAppMessage()
+  const { mutate: markRead } = useMarkWhatsAppRead()
 
   // Auto-scroll to bottom when new messages arrive
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
   }, [messages])
 
+  // Viewing the thread clears its unread badge, again whenever new messages arrive
+  useEffect(() => {
+    if (!isLoading) markRead({ entityType, entityId })
+  }, [entityType, entityId, messages.length, isLoading, markRead])
+
   // Focus input on mount
   useEffect(() => {
     inputRef.current?.focus()
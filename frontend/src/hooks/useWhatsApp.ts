@@ -34,6 +34,19 @@ export function useWhatsAppMessages(entityType: 'lead' | 'client', entityId: num
   })
 }
 
+// Mark a lead or client thread as read
+export function useMarkWhatsAppRead() {
+  const queryClient = useQueryClient()
+
+  return useMutation({
+    mutationFn: ({ entityType, entityId }: { entityType: 'lead' | 'client'; entityId: number }) =>
+      whatsappApi.markRead(entityType === 'lead' ? { leadId: entityId } : { clientId: entityId }),
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: WHATSAPP_KEYS.conversations })
+    },
+  })
+}
+
 // Send a message
 export function useSendWhatsAppMessage() {
   const queryClient = useQueryClient()
@@ -36,7 +36,7 @@ export const ACTIVE_STAGES: CaseStage[] = [
 export const TERMINAL_STAGES: CaseStage[] = ['disbursed', 'declined', 'withdrawn']
 
 export type BankFormType = 'accountOpeningForm' | 'fts' | 'kfs' | 'undertakings' | 'bankChecklist' | 'other'
-export type BankFormStatus = 'missing' | 'uploaded' | 'verified'
+export type BankFormStatus = 'missing' | 'pending' | 'uploaded' | 'verified'
 
 export type RateType = 'fixed' | 'variable'
 export type RateTerm = 1 | 2 | 3 | 4 | 5  // Years
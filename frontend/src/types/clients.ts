@@ -25,7 +25,7 @@ export type DocumentType =
   | 'loanStatements'
   | 'other'
 
-export type DocumentStatus = 'missing' | 'uploaded' | 'verified' | 'notApplicable'
+export type DocumentStatus = 'missing' | 'pending' | 'uploaded' | 'verified' | 'notApplicable'
 
 export interface Document {
   id: number